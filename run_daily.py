@@ -19,6 +19,7 @@ Usage:
 """
 
 import argparse
+import asyncio
 import sys
 import logging
 from datetime import datetime
@@ -183,35 +184,44 @@ def run_daily_workflow(dry_run: bool = False):
         logger.info(f"✓ Ranked and bucketed stories ({bucket_summary})")
         
         # =============================
-        # PHASE 3.5: MARKET DATA
+        # PHASE 3.5 + 4: MARKET DATA & COMPOSITION
         # =============================
-        logger.info("PHASE 3.5: Fetching real-time market data...")
-        market_snapshot_html = ""
-        if settings.market_data.use_real_data:
+        # Independent network calls: the snapshot is fetched while OpenAI composes
+        def fetch_market_snapshot() -> str:
+            if not settings.market_data.use_real_data:
+                logger.info("Market data disabled in config, skipping")
+                return ""
             try:
                 # format_snapshot_html both fetches and formats
-                market_snapshot_html = market_data.format_snapshot_html()
+                snapshot_html = market_data.format_snapshot_html()
                 logger.info("✓ Generated market data snapshot")
+                return snapshot_html
             except Exception as e:
                 logger.warning(f"⚠️  Market data fetch failed: {e}")
-        else:
-            logger.info("Market data disabled in config, skipping")
+                return ""
         
-        # =============================
-        # PHASE 4: COMPOSITION
-        # =============================
-        logger.info("PHASE 4: Composing analytical brief with OpenAI...")
-        report_raw = composer.compose_daily_brief(buckets, market_snapshot_html=market_snapshot_html)
-        
-        # Transform Markdown sections to styled HTML
+        logger.info("PHASE 3.5 + 4: Fetching market data and composing analytical brief with OpenAI...")
+        report_raw = asyncio.run(
+            composer.compose_daily_brief_async(buckets, fetch_snapshot=fetch_market_snapshot)
+        )
+        market_snapshot_html = report_raw.get("snapshot_html", "")
+        
+        # Transform Markdown sections to styled HTML (one batched conversion)
+        top5_html, macro_html, watchlist_html, what_to_watch_html, snapshot_md_html = formatter.md_to_html_many([
+            report_raw["top5_md"],
+            report_raw["macro_md"],
+            report_raw["watchlist_md"],
+            report_raw.get("what_to_watch_md", ""),
+            "" if report_raw.get("snapshot_html") else report_raw.get("snapshot_md", ""),
+        ])
         report_data = {
             "headline_title": report_raw["headline"],
             "intro_paragraph": report_raw["intro"],
-            "top5_html": formatter.md_to_html(report_raw["top5_md"]),
-            "macro_html": formatter.md_to_html(report_raw["macro_md"]),
-            "watchlist_html": formatter.md_to_html(report_raw["watchlist_md"]),
-            "snapshot_html": report_raw.get("snapshot_html") or formatter.md_to_html(report_raw.get("snapshot_md", "")),
-            "what_to_watch_html": formatter.md_to_html(report_raw.get("what_to_watch_md", "")),
+            "top5_html": top5_html,
+            "macro_html": macro_html,
+            "watchlist_html": watchlist_html,
+            "snapshot_html": report_raw.get("snapshot_html") or snapshot_md_html,
+            "what_to_watch_html": what_to_watch_html,
             "preheader": report_raw["preheader"]
         }
         
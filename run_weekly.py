@@ -92,10 +92,7 @@ def run_weekly_workflow(dry_run: bool = False):
     
     logger.info(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    fact_cards = db.get_fact_cards_between(
-        start_date=start_date.strftime('%Y-%m-%d'),
-        end_date=end_date.strftime('%Y-%m-%d')
-    )
+    fact_cards = db.get_fact_cards_between(start_date=start_date, end_date=end_date)
     
     logger.info(f"Retrieved {len(fact_cards)} fact cards from database")
     
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Lazy Import Check
+
+Verifies that importing the pipeline modules does not pull in NLTK.
+NLTK/VADER must only load once sentiment analysis is actually used.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+HEAVY_MODULES = ["nltk"]
+
+
+def main():
+    import src.sentiment  # noqa: F401
+    import src.rank  # noqa: F401
+
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    if loaded:
+        print(f"❌ Eagerly imported: {', '.join(loaded)}")
+        return 1
+
+    print("✅ No heavy modules imported at import time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,7 @@ import hashlib
 import re
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from src.dedup import canonicalize_url, get_title_similarity
+from src.dedup import canonicalize_url, normalize_title, normalized_title_similarity
 
 logger = logging.getLogger(__name__)
 
@@ -38,21 +38,21 @@ def tokenize(text: str) -> set:
     tokens = {w for w in clean.split() if len(w) > 2 or w in {'ai', 'us', 'eu', 'fed'}}
     return tokens
 
-def jaccard_similarity(a: str, b: str) -> float:
+def jaccard_similarity_sets(set_a: frozenset, set_b: frozenset) -> float:
     """
-    Returns Jaccard similarity between two strings based on tokens.
-    Intersection over Union.
+    Jaccard similarity (Intersection over Union) of two pre-tokenized sets.
     """
-    set_a = tokenize(a)
-    set_b = tokenize(b)
-    
     if not set_a or not set_b:
         return 0.0
-        
-    intersection = len(set_a.intersection(set_b))
-    union = len(set_a.union(set_b))
     
-    return intersection / union
+    return len(set_a & set_b) / len(set_a | set_b)
+
+def jaccard_similarity(a: str, b: str) -> float:
+    """
+    Returns Jaccard similarity between two strings based on tokens.
+    Intersection over Union.
+    """
+    return jaccard_similarity_sets(frozenset(tokenize(a)), frozenset(tokenize(b)))
 
 def cluster_items(
     items: List[Any], 
@@ -67,11 +67,11 @@ def cluster_items(
     clusters: List[StoryCluster] = []
     
     # Pre-calculate canonical URLs for exact match speed if requested
-    canon_map = {}
-    if url_dedup:
-        for item in items:
-            canon = canonicalize_url(item.url)
-            canon_map[item.url] = canon
+    canon_map = {item.url: canonicalize_url(item.url) for item in items} if url_dedup else {}
+
+    # Tokenize and normalize each title once (keyed by identity: primaries can swap in add_item)
+    title_tokens = {id(item): frozenset(tokenize(item.title)) for item in items}
+    norm_titles = {id(item): normalize_title(item.title) for item in items}
 
     for item in items:
         found_cluster = False
@@ -80,21 +80,22 @@ def cluster_items(
         for cluster in clusters:
             # Match 1: Canonical URL Match
             if url_dedup:
-                cluster_urls = [canon_map.get(cluster.primary_item.url)] + \
-                              [canon_map.get(s.url) for s in cluster.supporting_items]
+                cluster_urls = [canon_map.get(m.url) for m in (cluster.primary_item, *cluster.supporting_items)]
                 if item_canon_url in cluster_urls:
                     cluster.add_item(item, max_supporting)
                     found_cluster = True
                     break
             
             # Match 2: SequenceMatcher Title Match (High precision for variants)
-            if get_title_similarity(item.title, cluster.primary_item.title) > title_threshold:
+            if normalized_title_similarity(
+                norm_titles[id(item)], norm_titles[id(cluster.primary_item)], score_cutoff=title_threshold
+            ) > title_threshold:
                 cluster.add_item(item, max_supporting)
                 found_cluster = True
                 break
                 
             # Match 3: Jaccard Similarity (Better for "same story, different source" phrasing)
-            if jaccard_similarity(item.title, cluster.primary_item.title) > jaccard_threshold:
+            if jaccard_similarity_sets(title_tokens[id(item)], title_tokens[id(cluster.primary_item)]) > jaccard_threshold:
                 cluster.add_item(item, max_supporting)
                 found_cluster = True
                 break
@@ -1,13 +1,140 @@
+import asyncio
 import logging
 import json
-from typing import List, Dict, Any, Optional, Set
+from typing import Callable, List, Dict, Any, Optional, Set
 from collections import defaultdict
 from src.config import Settings
 from src.openai_client import OpenAIClient
 from src.extract import FactCard
+from src.llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
+# orjson parses composition replies (several KB of JSON) in C when available;
+# both raise a ValueError subclass on malformed input.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Static instructions live in the system message and the per-run data in the
+# user message, so every request shares a byte-identical prefix that OpenAI's
+# automatic prompt caching can reuse. Keep run-specific values out of these.
+DAILY_SYSTEM_PROMPT = """You are a senior financial macro editor at Bloomberg. Synthesize the markets data you are given into a premium daily brief. Output valid JSON only. Always include Markdown links for sources.
+
+WRITING REQUIREMENTS:
+1. **STRUCTURE FOR EACH STORY**: Use this format:
+   - **What happened**: The factual news (1-2 sentences)
+   - **Why it matters**: Analysis of investor implications (1-2 sentences)
+   - Include key numbers (%, $, basis points) when available
+
+2. **CITATIONS**: 
+   - EVERY bullet point MUST have a clickable source link in Markdown format: [Source Name](URL)
+   - Use the exact source links provided in the data
+   - Format: "...the Fed signaled patience [Reuters](https://reuters.com/...)."
+
+3. **STYLE**: 
+   - Strictly analytical, professional, and dense
+   - No boilerplate intro like "Welcome to today's news"
+   - Bloomberg/FT tone - assume reader is a professional investor
+
+4. **DEPTH**: 
+   - Top 5 stories: 3-4 sentences each with analysis
+   - Macro section: 2-3 meaty paragraphs connecting themes
+   - Watchlist: Cover ALL 10 tickers, even if just "No major updates"
+
+5. **SENTIMENT**: Reference the sentiment analysis in your intro if meaningful
+
+OUTPUT FORMAT - Return ONLY a JSON object with these fields:
+- 'headline': Specific, punchy (e.g., "Yields Pivot on Unexpected ISM Cool, Tech Gains")
+- 'preheader': 1-sentence teaser for email preview
+- 'intro': 3-sentence executive summary. Set the analytical tone.
+- 'top5_md': Markdown with exactly 5 stories. Use the "What happened / Why it matters" structure. Include [Source](URL) links.
+- 'macro_md': 2-3 Markdown paragraphs on central banks, rates, and macro themes. Include source links.
+- 'watchlist_md': Markdown list covering ALL 10 watchlist tickers. Group by ticker symbol. Include source links where available.
+- 'what_to_watch_md': 2-3 bullets on what to monitor tomorrow/this week based on today's news.
+
+CRITICAL RULES:
+- Never hallucinate numbers - use "not disclosed" or "---" if missing
+- ALL 10 watchlist tickers MUST appear in watchlist_md
+- Include clickable [Source](URL) citations in every section
+- If no China news today, include the China note in the macro section
+"""
+
+WEEKLY_SYSTEM_PROMPT = """You are a senior financial macro editor at Bloomberg preparing the Sunday Weekly Markets Recap from the past 7 days of data you are given. Output valid JSON only.
+
+CORE REQUIREMENTS:
+1. STYLE: Authoritative, thematic, "big picture" analysis. Connect dots across the week.
+2. SOURCES: Reference sources in brackets [Source Name] where appropriate.
+3. LENGTH: Aim for 10-15 minute read depth (~2000-3000 words equivalent). Token limit: 3500.
+4. STRUCTURE: Output ONLY a JSON object with these fields:
+   - 'headline': Capture the week's dominant theme (e.g., "Markets Digest Fed Hawkishness Amid Tech Rotation").
+   - 'preheader': 1-sentence hook for the week.
+   - 'intro': 3-4 sentence executive summary of the week's narrative.
+   - 'top5_md': Markdown list of the **Top 10 Developments** of the week. Each bullet should synthesize related stories.
+   - 'macro_md': 2-4 detailed Markdown paragraphs on **Theme of the Week** and **Biggest Market Drivers** (rates, policy, macro).
+   - 'watchlist_md': Markdown list for **Watchlist Weekly Wrap** - key corporate/sector moves.
+   - 'snapshot_md': A Markdown section titled **Next Week to Watch** with 3-5 bullets on upcoming events, data releases, or themes.
+
+ANALYSIS DEPTH:
+- Identify recurring themes (e.g., "dovish pivot continued all week").
+- Highlight turning points or surprises.
+- Connect micro (earnings, M&A) to macro (Fed, geopolitics).
+- Use "not disclosed" or "---" for missing data.
+"""
+
+COMBINED_SYSTEM_PROMPT = f"""{DAILY_SYSTEM_PROMPT}
+=== WEEKLY RECAP ===
+{WEEKLY_SYSTEM_PROMPT}
+=== COMBINED OUTPUT ===
+You will receive DAILY BRIEF DATA and WEEKLY RECAP DATA. Return ONLY a JSON object with two keys:
+- 'daily': the daily brief JSON object described above
+- 'weekly': the weekly recap JSON object described above
+"""
+
+
+def _markdown_document_schema(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Strict object schema whose fields are all required strings."""
+    return {
+        "type": "object",
+        "properties": {name: {"type": "string", "description": desc} for name, desc in fields.items()},
+        "required": list(fields),
+        "additionalProperties": False
+    }
+
+
+# Strict JSON Schemas for OpenAI structured outputs (same fields the prompts describe)
+DAILY_BRIEF_SCHEMA = _markdown_document_schema({
+    "headline": "Specific, punchy headline",
+    "preheader": "1-sentence teaser for email preview",
+    "intro": "3-sentence executive summary",
+    "top5_md": "Markdown with exactly 5 stories and [Source](URL) links",
+    "macro_md": "2-3 Markdown paragraphs on central banks, rates and macro themes",
+    "watchlist_md": "Markdown list covering ALL watchlist tickers",
+    "what_to_watch_md": "2-3 Markdown bullets on what to monitor next",
+})
+
+WEEKLY_RECAP_SCHEMA = _markdown_document_schema({
+    "headline": "The week's dominant theme",
+    "preheader": "1-sentence hook for the week",
+    "intro": "3-4 sentence executive summary of the week",
+    "top5_md": "Markdown list of the Top 10 Developments of the week",
+    "macro_md": "2-4 Markdown paragraphs on Theme of the Week and Biggest Market Drivers",
+    "watchlist_md": "Markdown list for the Watchlist Weekly Wrap",
+    "snapshot_md": "Markdown section titled Next Week to Watch",
+})
+
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {"daily": DAILY_BRIEF_SCHEMA, "weekly": WEEKLY_RECAP_SCHEMA},
+    "required": ["daily", "weekly"],
+    "additionalProperties": False
+}
+
+DAILY_MAX_OUTPUT_TOKENS = 3000
+DEFAULT_TEMPERATURE = 0.5
+WEEKLY_MAX_OUTPUT_TOKENS = 4000
+
 
 def _group_watchlist_by_ticker(cards: List[FactCard], watchlist: Set[str], max_per_ticker: int = 2) -> Dict[str, List[FactCard]]:
     """
@@ -16,19 +143,15 @@ def _group_watchlist_by_ticker(cards: List[FactCard], watchlist: Set[str], max_p
     """
     ticker_cards: Dict[str, List[FactCard]] = defaultdict(list)
     
-    for card in cards:
-        card_tickers = [t.upper() for t in card.tickers]
-        for ticker in card_tickers:
-            if ticker in watchlist:
+    # One stable sort up front (highest confidence first), then a single pass
+    # that stops filling a ticker once it has max_per_ticker cards
+    for card in sorted(cards, key=lambda c: c.confidence, reverse=True):
+        for ticker in card.tickers:
+            ticker = ticker.upper()
+            if ticker in watchlist and len(ticker_cards[ticker]) < max_per_ticker:
                 ticker_cards[ticker].append(card)
     
-    # Sort each ticker's cards by confidence (highest first) and take top N
-    result = {}
-    for ticker, ticker_card_list in ticker_cards.items():
-        sorted_cards = sorted(ticker_card_list, key=lambda c: c.confidence, reverse=True)
-        result[ticker] = sorted_cards[:max_per_ticker]
-    
-    return result
+    return dict(ticker_cards)
 
 
 def _format_watchlist_context_by_ticker(
@@ -39,25 +162,27 @@ def _format_watchlist_context_by_ticker(
     Format watchlist context organized by ticker. 
     Shows all 10 watchlist tickers, even if no news.
     """
-    lines = []
+    lines: List[str] = []
+    append = lines.append
     
     # Sort tickers alphabetically for consistent ordering
-    all_tickers = sorted(watchlist)
-    
-    for ticker in all_tickers:
-        cards = grouped_cards.get(ticker, [])
-        lines.append(f"\n**{ticker}:**")
+    for ticker in sorted(watchlist):
+        cards = grouped_cards.get(ticker)
+        append(f"\n**{ticker}:**")
         
         if not cards:
-            lines.append("  - No major updates today")
-        else:
-            for card in cards:
-                source_links = ", ".join([f"[{s}]({card.url})" if card.url else f"[{s}]" for s in card.sources[:2]])
-                lines.append(f"  - {card.trend}")
-                lines.append(f"    Insight: {card.why_it_matters}")
-                if card.data_point:
-                    lines.append(f"    Data: {card.data_point}")
-                lines.append(f"    Sources: {source_links}")
+            append("  - No major updates today")
+            continue
+        for card in cards:
+            source_links = ", ".join(f"[{s}]({card.url})" if card.url else f"[{s}]" for s in card.sources[:2])
+            data_line = f"    Data: {card.data_point}\n" if card.data_point else ""
+            # One multi-line entry per card; the final join separates entries
+            append(
+                f"  - {card.trend}\n"
+                f"    Insight: {card.why_it_matters}\n"
+                f"{data_line}"
+                f"    Sources: {source_links}"
+            )
     
     return "\n".join(lines)
 
@@ -67,9 +192,79 @@ class DailyBriefComposer:
     Composes the daily market brief using OpenAI, focused on an analytical Bloomberg-style report.
     Integrates sentiment analysis for market mood indicator.
     """
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        cache: Optional[LLMCache] = None,
+        temperature: float = DEFAULT_TEMPERATURE
+    ):
+        """
+        Args:
+            settings: Application settings
+            cache: Optional response cache; only consulted when temperature == 0
+            temperature: Sampling temperature for composition calls
+        """
         self.settings = settings
         self.ai = OpenAIClient(settings)
+        self.cache = cache
+        self.temperature = temperature
+        self.use_strict_schema = getattr(settings.models, 'use_strict_schema', True)
+
+    def _request_json(
+        self,
+        system_prompt: str,
+        prompt: str,
+        max_output_tokens: int,
+        purpose: str,
+        schema_name: str,
+        schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Sends one JSON composition request and parses the reply.
+        
+        With use_strict_schema (the default) the request uses OpenAI
+        structured outputs, so the reply always matches schema; otherwise
+        plain JSON mode. Parsing can still fail on a reply cut off at
+        max_output_tokens, which callers handle with their fallback.
+        
+        Deterministic requests (temperature == 0) go through self.cache when
+        set: identical prompts return the stored reply without an API call.
+        Only replies that parse as JSON are cached.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        if self.use_strict_schema:
+            format_kwargs = {"json_schema": {"name": schema_name, "schema": schema}}
+        else:
+            format_kwargs = {"response_format": {"type": "json_object"}}
+        
+        key = None
+        if self.cache is not None and self.temperature == 0:
+            key = LLMCache.cache_key(
+                self.ai.write_model, messages, self.temperature,
+                max_output_tokens=max_output_tokens, **format_kwargs
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {purpose}")
+                return _json_loads(cached)
+        
+        response = self.ai.responses_create(
+            model_type="write",
+            messages=messages,
+            max_output_tokens=max_output_tokens,
+            temperature=self.temperature,
+            purpose=purpose,
+            **format_kwargs
+        )
+        content = response.choices[0].message.content
+        report = _json_loads(content)
+        
+        if key is not None:
+            self.cache.set(key, content)
+        return report
 
     def compose_daily_brief(self, buckets: Dict[str, Any], market_snapshot_html: str = "") -> Dict[str, Any]:
         """
@@ -82,6 +277,159 @@ class DailyBriefComposer:
             market_snapshot_html: Pre-rendered market data HTML from yfinance
         """
         
+        prompt, china_note_needed, watchlist = self._build_daily_prompt(buckets)
+
+        logger.info("Requesting synthesis from OpenAI...")
+        
+        try:
+            report = self._request_json(
+                DAILY_SYSTEM_PROMPT, prompt,
+                max_output_tokens=DAILY_MAX_OUTPUT_TOKENS,  # Increased for better depth
+                purpose="daily_composition",
+                schema_name="daily_brief",
+                schema=DAILY_BRIEF_SCHEMA
+            )
+            return self._finalize_daily_report(report, market_snapshot_html, china_note_needed, watchlist)
+            
+        except Exception as e:
+            logger.error(f"Failed to compose daily brief: {e}")
+            return self._daily_fallback(market_snapshot_html)
+
+    async def compose_daily_brief_async(
+        self,
+        buckets: Dict[str, Any],
+        fetch_snapshot: Optional[Callable[[], str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Same as compose_daily_brief, but fetches the market snapshot while the
+        OpenAI request is in flight.
+        
+        The snapshot is only used when post-processing the reply, not in the
+        prompt, so the two network calls are independent: wall time becomes
+        max(compose, fetch) instead of their sum. Both blocking calls run on
+        worker threads via asyncio.to_thread.
+        
+        Args:
+            buckets: Ranked fact card buckets from ranker
+            fetch_snapshot: Returns pre-rendered market data HTML ("" if unavailable)
+        """
+        prompt, china_note_needed, watchlist = self._build_daily_prompt(buckets)
+
+        logger.info("Requesting synthesis from OpenAI (market snapshot fetched concurrently)...")
+        
+        report, market_snapshot_html = await asyncio.gather(
+            asyncio.to_thread(
+                self._request_json,
+                DAILY_SYSTEM_PROMPT, prompt,
+                max_output_tokens=DAILY_MAX_OUTPUT_TOKENS,
+                purpose="daily_composition",
+                schema_name="daily_brief",
+                schema=DAILY_BRIEF_SCHEMA
+            ),
+            asyncio.to_thread(fetch_snapshot) if fetch_snapshot else asyncio.sleep(0, ""),
+            return_exceptions=True
+        )
+        
+        if isinstance(market_snapshot_html, BaseException):
+            logger.warning(f"Market snapshot fetch failed: {market_snapshot_html}")
+            market_snapshot_html = ""
+        if isinstance(report, BaseException):
+            logger.error(f"Failed to compose daily brief: {report}")
+            return self._daily_fallback(market_snapshot_html)
+        
+        try:
+            return self._finalize_daily_report(report, market_snapshot_html, china_note_needed, watchlist)
+        except Exception as e:
+            logger.error(f"Failed to compose daily brief: {e}")
+            return self._daily_fallback(market_snapshot_html)
+
+    def compose_weekly_recap(self, fact_cards: List[FactCard]) -> Dict[str, Any]:
+        """
+        Generates a weekly market recap using fact cards stored in the database.
+        Returns a dictionary with headline, intro, and markdown sections optimized for weekly synthesis.
+        """
+        
+        prompt = self._build_weekly_prompt(fact_cards)
+
+        logger.info("Requesting weekly recap synthesis from OpenAI...")
+        
+        try:
+            report = self._request_json(
+                WEEKLY_SYSTEM_PROMPT, prompt,
+                max_output_tokens=WEEKLY_MAX_OUTPUT_TOKENS,  # Weekly recap can be longer
+                purpose="weekly_composition",  # For budget tracking
+                schema_name="weekly_recap",
+                schema=WEEKLY_RECAP_SCHEMA
+            )
+            return self._finalize_weekly_report(report)
+            
+        except Exception as e:
+            logger.error(f"Failed to compose weekly recap: {e}")
+            return self._weekly_fallback()
+
+    def compose_both(
+        self,
+        buckets: Dict[str, Any],
+        weekly_cards: List[FactCard],
+        market_snapshot_html: str = ""
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Composes the daily brief and the weekly recap in a single OpenAI request.
+        
+        For runs that need both documents (e.g. a Sunday run or a backfill):
+        one round-trip instead of two, sharing the system prompt. Each
+        document is post-processed exactly as in compose_daily_brief /
+        compose_weekly_recap, and falls back independently if missing.
+        
+        Returns:
+            {"daily": <daily brief dict>, "weekly": <weekly recap dict>}
+        """
+        daily_prompt, china_note_needed, watchlist = self._build_daily_prompt(buckets)
+        weekly_prompt = self._build_weekly_prompt(weekly_cards)
+        
+        prompt = f"""
+=== DAILY BRIEF DATA ===
+{daily_prompt}
+
+=== WEEKLY RECAP DATA ===
+{weekly_prompt}
+"""
+
+        logger.info("Requesting combined daily + weekly synthesis from OpenAI...")
+        
+        try:
+            combined = self._request_json(
+                COMBINED_SYSTEM_PROMPT, prompt,
+                max_output_tokens=DAILY_MAX_OUTPUT_TOKENS + WEEKLY_MAX_OUTPUT_TOKENS,
+                purpose="daily+weekly_composition",
+                schema_name="daily_and_weekly",
+                schema=COMBINED_SCHEMA
+            )
+        except Exception as e:
+            logger.error(f"Failed to compose combined daily + weekly brief: {e}")
+            combined = {}
+        if not isinstance(combined, dict):
+            # Valid JSON that isn't an object: treat as both documents missing
+            combined = {}
+        
+        daily = combined.get("daily")
+        weekly = combined.get("weekly")
+        return {
+            "daily": (
+                self._finalize_daily_report(daily, market_snapshot_html, china_note_needed, watchlist)
+                if isinstance(daily, dict) else self._daily_fallback(market_snapshot_html)
+            ),
+            "weekly": self._finalize_weekly_report(weekly) if isinstance(weekly, dict) else self._weekly_fallback(),
+        }
+
+    def _build_daily_prompt(self, buckets: Dict[str, Any]):
+        """
+        Builds the daily brief user prompt from ranked buckets.
+        Pops the metadata keys off buckets (as compose_daily_brief always has).
+        
+        Returns:
+            Tuple of (prompt, china_note_needed, watchlist)
+        """
         # Extract metadata
         sentiment_summary = buckets.pop("sentiment_summary", None)
         china_news_available = buckets.pop("china_news_available", True)
@@ -175,8 +523,6 @@ MARKET SENTIMENT ANALYSIS:
 """
 
         prompt = f"""
-You are a senior financial editor at Bloomberg. Synthesize the following markets data into a premium daily brief.
-
 DATA FOR TODAY:
 {top5_context}
 {macro_context}
@@ -185,103 +531,56 @@ WATCHLIST (User's 10 tracked tickers - MUST include ALL of them):
 {watchlist_context}
 {company_context}
 {sentiment_context}
-
-WRITING REQUIREMENTS:
-1. **STRUCTURE FOR EACH STORY**: Use this format:
-   - **What happened**: The factual news (1-2 sentences)
-   - **Why it matters**: Analysis of investor implications (1-2 sentences)
-   - Include key numbers (%, $, basis points) when available
-
-2. **CITATIONS**: 
-   - EVERY bullet point MUST have a clickable source link in Markdown format: [Source Name](URL)
-   - Use the exact source links provided in the data above
-   - Format: "...the Fed signaled patience [Reuters](https://reuters.com/...)."
-
-3. **STYLE**: 
-   - Strictly analytical, professional, and dense
-   - No boilerplate intro like "Welcome to today's news"
-   - Bloomberg/FT tone - assume reader is a professional investor
-
-4. **DEPTH**: 
-   - Top 5 stories: 3-4 sentences each with analysis
-   - Macro section: 2-3 meaty paragraphs connecting themes
-   - Watchlist: Cover ALL 10 tickers, even if just "No major updates"
-
-5. **SENTIMENT**: Reference the sentiment analysis in your intro if meaningful
-
-OUTPUT FORMAT - Return ONLY a JSON object with these fields:
-- 'headline': Specific, punchy (e.g., "Yields Pivot on Unexpected ISM Cool, Tech Gains")
-- 'preheader': 1-sentence teaser for email preview
-- 'intro': 3-sentence executive summary. Set the analytical tone.
-- 'top5_md': Markdown with exactly 5 stories. Use the "What happened / Why it matters" structure. Include [Source](URL) links.
-- 'macro_md': 2-3 Markdown paragraphs on central banks, rates, and macro themes. Include source links.
-- 'watchlist_md': Markdown list covering ALL 10 watchlist tickers. Group by ticker symbol. Include source links where available.
-- 'what_to_watch_md': 2-3 bullets on what to monitor tomorrow/this week based on today's news.
-
-CRITICAL RULES:
-- Never hallucinate numbers - use "not disclosed" or "---" if missing
-- ALL 10 watchlist tickers MUST appear in watchlist_md
-- Include clickable [Source](URL) citations in every section
-- If no China news today, include the China note in the macro section
 """
 
-        logger.info("Requesting synthesis from OpenAI...")
-        
-        try:
-            response = self.ai.responses_create(
-                model_type="write",
-                messages=[
-                    {"role": "system", "content": "You are a senior financial macro editor. Output valid JSON only. Always include Markdown links for sources."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                max_output_tokens=3000,  # Increased for better depth
-                purpose="daily_composition"
-            )
-            
-            content = response.choices[0].message.content
-            report = json.loads(content)
-            
-            # Post-process: ensure markdown fields are strings
-            md_fields = ['top5_md', 'macro_md', 'watchlist_md', 'what_to_watch_md']
-            for field in md_fields:
-                if field in report and isinstance(report[field], list):
-                    report[field] = "\n".join([str(item) for item in report[field]])
-            
-            # Use real market data for snapshot instead of AI-generated
-            if market_snapshot_html:
-                report["snapshot_md"] = ""  # Clear - we'll use HTML directly
-                report["snapshot_html"] = market_snapshot_html
-            else:
-                report["snapshot_md"] = "| Asset | Status |\n|---|---|\n| Market Data | Unavailable |"
-                report["snapshot_html"] = ""
-            
-            # Add metadata for downstream processing
-            report["china_note_needed"] = china_note_needed
-            report["watchlist_tickers_expected"] = list(watchlist)
-            
-            return report
-            
-        except Exception as e:
-            logger.error(f"Failed to compose daily brief: {e}")
-            return {
-                "headline": "Morning Markets Update",
-                "preheader": "Macro shifts and equity movers.",
-                "intro": "The markets are processing recent developments across key regions.",
-                "top5_md": "* Data processing error. Please refer to underlying sources.",
-                "macro_md": "Macro analysis is currently unavailable.",
-                "watchlist_md": "Watchlist updates unavailable.",
-                "what_to_watch_md": "* Check back for updates.",
-                "snapshot_md": "| Asset | Status |\n|---|---|\n| Market Data | Unavailable |",
-                "snapshot_html": market_snapshot_html or ""
-            }
+        return prompt, china_note_needed, watchlist
 
-    def compose_weekly_recap(self, fact_cards: List[FactCard]) -> Dict[str, Any]:
-        """
-        Generates a weekly market recap using fact cards stored in the database.
-        Returns a dictionary with headline, intro, and markdown sections optimized for weekly synthesis.
-        """
+    @staticmethod
+    def _finalize_daily_report(
+        report: Dict[str, Any],
+        market_snapshot_html: str,
+        china_note_needed: bool,
+        watchlist: Set[str]
+    ) -> Dict[str, Any]:
+        """Post-processes a parsed daily brief for rendering."""
+        # Post-process: ensure markdown fields are strings
+        md_fields = ['top5_md', 'macro_md', 'watchlist_md', 'what_to_watch_md']
+        for field in md_fields:
+            if field in report and isinstance(report[field], list):
+                report[field] = "\n".join([str(item) for item in report[field]])
+        
+        # Use real market data for snapshot instead of AI-generated
+        if market_snapshot_html:
+            report["snapshot_md"] = ""  # Clear - we'll use HTML directly
+            report["snapshot_html"] = market_snapshot_html
+        else:
+            report["snapshot_md"] = "| Asset | Status |\n|---|---|\n| Market Data | Unavailable |"
+            report["snapshot_html"] = ""
         
+        # Add metadata for downstream processing
+        report["china_note_needed"] = china_note_needed
+        report["watchlist_tickers_expected"] = list(watchlist)
+        
+        return report
+
+    @staticmethod
+    def _daily_fallback(market_snapshot_html: str = "") -> Dict[str, Any]:
+        """Static daily brief used when composition fails."""
+        return {
+            "headline": "Morning Markets Update",
+            "preheader": "Macro shifts and equity movers.",
+            "intro": "The markets are processing recent developments across key regions.",
+            "top5_md": "* Data processing error. Please refer to underlying sources.",
+            "macro_md": "Macro analysis is currently unavailable.",
+            "watchlist_md": "Watchlist updates unavailable.",
+            "what_to_watch_md": "* Check back for updates.",
+            "snapshot_md": "| Asset | Status |\n|---|---|\n| Market Data | Unavailable |",
+            "snapshot_html": market_snapshot_html or ""
+        }
+
+    @staticmethod
+    def _build_weekly_prompt(fact_cards: List[FactCard]) -> str:
+        """Builds the weekly recap user prompt from the week's fact cards."""
         # Prepare weekly context from fact cards
         context_str = ""
         for card in fact_cards:
@@ -296,66 +595,32 @@ CRITICAL RULES:
             )
 
         prompt = f"""
-        You are a senior financial editor at Bloomberg preparing the Sunday Weekly Markets Recap.
-        
-        DATA FROM THE PAST 7 DAYS:
-        {context_str}
-        
-        CORE REQUIREMENTS:
-        1. STYLE: Authoritative, thematic, "big picture" analysis. Connect dots across the week.
-        2. SOURCES: Reference sources in brackets [Source Name] where appropriate.
-        3. LENGTH: Aim for 10-15 minute read depth (~2000-3000 words equivalent). Token limit: 3500.
-        4. STRUCTURE: Output ONLY a JSON object with these fields:
-           - 'headline': Capture the week's dominant theme (e.g., "Markets Digest Fed Hawkishness Amid Tech Rotation").
-           - 'preheader': 1-sentence hook for the week.
-           - 'intro': 3-4 sentence executive summary of the week's narrative.
-           - 'top5_md': Markdown list of the **Top 10 Developments** of the week. Each bullet should synthesize related stories.
-           - 'macro_md': 2-4 detailed Markdown paragraphs on **Theme of the Week** and **Biggest Market Drivers** (rates, policy, macro).
-           - 'watchlist_md': Markdown list for **Watchlist Weekly Wrap** - key corporate/sector moves.
-           - 'snapshot_md': A Markdown section titled **Next Week to Watch** with 3-5 bullets on upcoming events, data releases, or themes.
-        
-        ANALYSIS DEPTH:
-        - Identify recurring themes (e.g., "dovish pivot continued all week").
-        - Highlight turning points or surprises.
-        - Connect micro (earnings, M&A) to macro (Fed, geopolitics).
-        - Use "not disclosed" or "---" for missing data.
-        
-        Output valid JSON only.
-        """
+DATA FROM THE PAST 7 DAYS:
+{context_str}
+"""
 
-        logger.info("Requesting weekly recap synthesis from OpenAI...")
-        
-        try:
-            response = self.ai.responses_create(
-                model_type="write",
-                messages=[
-                    {"role": "system", "content": "You are a senior financial macro editor. Output valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                max_output_tokens=4000,  # Weekly recap can be longer
-                purpose="weekly_composition"  # For budget tracking
-            )
-            
-            content = response.choices[0].message.content
-            report = json.loads(content)
-            
-            # Post-process: ensure markdown fields are strings (OpenAI sometimes returns lists)
-            md_fields = ['top5_md', 'macro_md', 'watchlist_md', 'snapshot_md']
-            for field in md_fields:
-                if field in report and isinstance(report[field], list):
-                    report[field] = "\n".join([str(item) for item in report[field]])
-            
-            return report
-            
-        except Exception as e:
-            logger.error(f"Failed to compose weekly recap: {e}")
-            return {
-                "headline": "Weekly Markets Recap",
-                "preheader": "A review of the week's key developments.",
-                "intro": "Markets processed several key themes this week across equities, rates, and policy.",
-                "top5_md": "* Data processing error. Please refer to underlying sources.",
-                "macro_md": "Weekly macro analysis is currently unavailable.",
-                "watchlist_md": "Watchlist updates unavailable.",
-                "snapshot_md": "**Next Week to Watch**\n* Check back for upcoming events."
-            }
+        return prompt
+
+    @staticmethod
+    def _finalize_weekly_report(report: Dict[str, Any]) -> Dict[str, Any]:
+        """Post-processes a parsed weekly recap for rendering."""
+        # Post-process: ensure markdown fields are strings (OpenAI sometimes returns lists)
+        md_fields = ['top5_md', 'macro_md', 'watchlist_md', 'snapshot_md']
+        for field in md_fields:
+            if field in report and isinstance(report[field], list):
+                report[field] = "\n".join([str(item) for item in report[field]])
+
+        return report
+
+    @staticmethod
+    def _weekly_fallback() -> Dict[str, Any]:
+        """Static weekly recap used when composition fails."""
+        return {
+            "headline": "Weekly Markets Recap",
+            "preheader": "A review of the week's key developments.",
+            "intro": "Markets processed several key themes this week across equities, rates, and policy.",
+            "top5_md": "* Data processing error. Please refer to underlying sources.",
+            "macro_md": "Weekly macro analysis is currently unavailable.",
+            "watchlist_md": "Watchlist updates unavailable.",
+            "snapshot_md": "**Next Week to Watch**\n* Check back for upcoming events."
+        }
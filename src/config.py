@@ -1,11 +1,18 @@
+import functools
 import os
 import yaml
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel, Field, SecretStr, field_validator, model_validator, ConfigDict
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, SettingsConfigDict
 from dotenv import load_dotenv
 
+# libyaml-backed loader when PyYAML was built with it (same safe subset, C parser)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # Load env vars before defining settings to allow env-based overrides
 load_dotenv()
 
@@ -73,6 +80,8 @@ class MarketDataConfig(BaseModel):
 class RetrievalConfig(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
     allowed_domains: List[str] = Field(default_factory=list)  # Empty = allow all
+    max_concurrent_queries: int = 6  # Perplexity queries in flight at once
+    circuit_breaker_window: int = 2  # Consecutive failed queries that stop retrieval
 
 class EmailConfig(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -84,6 +93,8 @@ class EmailConfig(BaseModel):
     to_email: str = Field(..., validation_alias="EMAIL_TO")
     # Chart embedding method: "base64" (inline) or "cid" (attachment, more reliable)
     chart_embed_method: str = "cid"
+    # SendGrid send retries after the first attempt (429/5xx/network errors)
+    max_retries: int = 3
 
     @model_validator(mode="before")
     @classmethod
@@ -97,11 +108,9 @@ class EmailConfig(BaseModel):
         return data
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(
-        env_file=".env", 
-        env_file_encoding="utf-8", 
-        extra="ignore"
-    )
+    # Only init kwargs are read (see settings_customise_sources); .env is
+    # loaded into os.environ by load_dotenv() at import and read in _from_yaml
+    model_config = SettingsConfigDict(extra="ignore")
 
     app: AppConfig = Field(default_factory=AppConfig)
     models: ModelConfig = Field(default_factory=ModelConfig)
@@ -118,20 +127,53 @@ class Settings(BaseSettings):
     watchlist_tickers: List[str] = []
     coverage: Dict[str, float] = {}
 
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        """
+        Init kwargs only.
+
+        _from_yaml passes every field explicitly (env lookups included, and
+        load_dotenv() already ran at import), and init kwargs always won
+        anyway - so the env scan and .env re-parse were pure overhead.
+        """
+        return (init_settings,)
+
     @classmethod
     def load(cls) -> "Settings":
+        """
+        Loads settings from config.yaml and the environment.
+        
+        Parsing is memoized on (environment, config.yaml contents); each call
+        returns its own deep copy, so callers may mutate the result freely.
+        """
         # 1. Determine config path
         config_path_str = os.getenv("CONFIG_YAML_PATH", "config.yaml")
         config_path = Path(config_path_str)
         
-        yaml_config = {}
+        raw_yaml = None
         if config_path.exists():
             with open(config_path, "r") as f:
-                yaml_config = yaml.safe_load(f) or {}
+                raw_yaml = f.read()
+        
+        return _load_settings(cls, tuple(sorted(os.environ.items())), raw_yaml).model_copy(deep=True)
+
+    @classmethod
+    def _from_yaml(cls, raw_yaml: Optional[str]) -> "Settings":
+        """Parses config.yaml text and builds Settings (uncached)."""
+        yaml_config = {}
+        if raw_yaml is not None:
+            yaml_config = yaml.load(raw_yaml, Loader=_YamlLoader) or {}
         
         # 2. Extract nested configs from YAML if present
-        # We merge YAML data into the constructor
-        # Env vars will override these due to Pydantic Settings behavior
+        # We merge YAML data into the constructor; env-backed fields are read
+        # explicitly below (Settings reads no env vars by itself)
         
         # Flatten watchlist for easier mapping if needed, 
         # but here we'll just pull from YAML mapping
@@ -160,9 +202,8 @@ class Settings(BaseSettings):
         market_data_yaml = yaml_config.get("market_data", {})
         market_data_config = MarketDataConfig(**market_data_yaml)
         
-        # Initialize Settings. 
-        # Note: Pydantic BaseSettings automatically pulls from environment variables 
-        # for fields defined with validation_alias or matching field names.
+        # Initialize Settings. Every env-backed value is passed explicitly:
+        # settings_customise_sources disables BaseSettings' own env/.env lookup.
         try:
             return cls(
                 app=AppConfig(**yaml_config.get("app", {})),
@@ -173,7 +214,7 @@ class Settings(BaseSettings):
                 market_data=market_data_config,
                 email=EmailConfig(
                     **yaml_config.get("email", {}),
-                    # These will be overridden by env vars anyway if present
+                    # Secrets and addresses come from the environment only
                     api_key=os.getenv("SENDGRID_API_KEY"),
                     from_email=os.getenv("EMAIL_FROM") or os.getenv("SENDGRID_FROM_EMAIL"),
                     to_email=os.getenv("EMAIL_TO") or os.getenv("RECIPIENT_EMAIL")
@@ -188,6 +229,11 @@ class Settings(BaseSettings):
             # Raise a clear error as requested
             raise RuntimeError(f"Failed to load settings: {e}")
 
+@functools.lru_cache(maxsize=4)
+def _load_settings(settings_cls, env_items: tuple, raw_yaml: Optional[str]) -> Settings:
+    """Cache behind Settings.load; the key covers everything load() reads."""
+    return settings_cls._from_yaml(raw_yaml)
+
 # Export a function to get settings for better testability
 def get_settings() -> Settings:
     return Settings.load()
@@ -1,17 +1,38 @@
+import functools
 import logging
-import re
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 from difflib import SequenceMatcher
-from typing import List, Any
+from typing import List, Any, Optional
+
+# RapidFuzz computes the same 2*M/T similarity ratio in C++ (bit-parallel
+# LCS), so title comparisons skip difflib's pure-Python matching. Its M is
+# the longest common subsequence, so scores can be marginally higher than
+# SequenceMatcher's on reordered titles. Without it, python-Levenshtein's
+# C ratio() (the same Indel ratio) is used, then difflib. Edit-distance
+# ratios (1 - d/max, e.g. polyleven) are a different scale and would shift
+# every title threshold, so they aren't used.
+try:
+    from rapidfuzz import fuzz as _fuzz, process as _process
+except ImportError:
+    _fuzz = _process = None
+
+try:
+    from Levenshtein import ratio as _c_ratio
+except ImportError:
+    _c_ratio = None
 
 logger = logging.getLogger(__name__)
 
 # Common tracking parameters to strip
-TRACKING_PARAMS = {
+TRACKING_PARAMS = frozenset({
     'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
     'gclid', 'fbclid', 'mc_cid', 'mc_eid', '_hsenc', '_hsmi', 'mkt_tok'
-}
+})
 
+# Schemes (lowercased) eligible for the no-query fast path in canonicalize_url
+_FAST_PATH_SCHEMES = frozenset({'http', 'https'})
+
+@functools.lru_cache(maxsize=8192)
 def canonicalize_url(url: str) -> str:
     """
     Normalizes a URL by:
@@ -20,10 +41,28 @@ def canonicalize_url(url: str) -> str:
     3. Removing URL fragments.
     4. Sorting remaining query parameters.
     5. Ensuring a trailing slash for empty paths if host is present.
+    
+    Memoized: the same URLs are canonicalized by retrieval validation,
+    dedup and clustering within one run.
     """
     if not url:
         return ""
     
+    # Fast path: without a query or fragment only the scheme/host need
+    # normalizing, so skip urlparse/parse_qsl/urlencode. Anything unusual
+    # (IPv6 brackets, whitespace/control chars, other schemes) falls through.
+    if '?' not in url and '#' not in url and '[' not in url and url.isprintable():
+        scheme, sep, rest = url.partition('://')
+        if sep and scheme.lower() in _FAST_PATH_SCHEMES:
+            netloc, slash, path = rest.partition('/')
+            netloc = netloc.lower()
+            if netloc.startswith('www.'):
+                netloc = netloc[4:]
+            path = slash + path
+            if not path and netloc:
+                path = '/'
+            return f"{scheme.lower()}://{netloc}{path}"
+    
     try:
         parsed = urlparse(url)
         # Normalize scheme and netloc (domain)
@@ -55,49 +94,93 @@ def canonicalize_url(url: str) -> str:
         logger.warning(f"Failed to canonicalize URL '{url}': {e}")
         return url
 
-def get_title_similarity(a: str, b: str) -> float:
+def normalize_title(title: str) -> str:
     """
-    Returns a similarity ratio between two titles (case-insensitive).
+    Case-folds and strips a title for similarity comparison.
+    Callers comparing many pairs normalize each title once up front.
+    """
+    return title.casefold().strip() if title else ""
+
+def normalized_title_similarity(a: str, b: str, score_cutoff: float = 0.0) -> float:
+    """
+    Similarity ratio of two titles already passed through normalize_title.
+    
+    The ratio is 2*M / (len(a) + len(b)) with M <= min(len(a), len(b)), so
+    pairs whose lengths alone cap it at or below score_cutoff return 0.0
+    without running the comparison. On the difflib fallback, quick_ratio()
+    (a character-multiset upper bound on ratio()) screens pairs the same way.
     """
     if not a or not b:
         return 0.0
-    return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio()
+    len_a, len_b = len(a), len(b)
+    if score_cutoff and 2 * min(len_a, len_b) <= score_cutoff * (len_a + len_b):
+        return 0.0
+    if _fuzz is not None:
+        return _fuzz.ratio(a, b, score_cutoff=score_cutoff * 100) / 100.0
+    if _c_ratio is not None:
+        return _c_ratio(a, b)
+    matcher = SequenceMatcher(None, a, b)
+    if score_cutoff and matcher.quick_ratio() <= score_cutoff:
+        return 0.0
+    return matcher.ratio()
+
+def get_title_similarity(a: str, b: str) -> float:
+    """
+    Returns a similarity ratio between two titles (case-insensitive).
+    """
+    return normalized_title_similarity(normalize_title(a), normalize_title(b))
+
+def _find_similar_title(title: str, candidates: List[str], threshold: float) -> Optional[int]:
+    """
+    Index of the first candidate whose similarity to title exceeds threshold.
+
+    Both title and candidates must already be normalized (normalize_title).
+    With RapidFuzz the whole scan is one C++ call; score_cutoff lets it skip
+    the full comparison for pairs whose length difference alone rules them out.
+    """
+    if not title:
+        return None
+    if _process is not None:
+        cutoff = threshold * 100
+        matches = _process.extract(title, candidates, scorer=_fuzz.ratio, score_cutoff=cutoff, limit=None)
+        return min((idx for _, score, idx in matches if score > cutoff), default=None)
+    for idx, candidate in enumerate(candidates):
+        if normalized_title_similarity(title, candidate, score_cutoff=threshold) > threshold:
+            return idx
+    return None
 
 def deduplicate_items(items: List[Any], title_threshold: float = 0.85) -> List[Any]:
     """
     Deduplicates a list of news items based on canonical URL and title similarity.
     Preserves the item with the longest snippet when a duplicate is found.
     
+    Runs in two phases: a dict keyed on canonical URL collapses URL variants
+    first (cheap), so title similarity only compares one representative
+    per URL.
+    
     Expects items to have at least: .url, .title, .snippet
     """
-    unique_items = []
-    seen_canonical_urls = {} # canonical_url -> index in unique_items
-    
+    # 1. Exact canonical URL match (first occurrence order, longest snippet wins)
+    by_url = {}  # canonical_url -> representative item
     for item in items:
-        canon_url = canonicalize_url(item.url)
-        is_duplicate = False
-        
-        # 1. Exact canonical URL match
-        if canon_url in seen_canonical_urls:
-            idx = seen_canonical_urls[canon_url]
-            # Keep the one with the longer snippet
-            if len(item.snippet) > len(unique_items[idx].snippet):
-                unique_items[idx] = item
-            is_duplicate = True
-            
-        # 2. Fuzzy title match against already added unique items
-        if not is_duplicate:
-            for idx, existing in enumerate(unique_items):
-                if get_title_similarity(item.title, existing.title) > title_threshold:
-                    # Duplicate found via title
-                    # Keep the one with the longer snippet
-                    if len(item.snippet) > len(unique_items[idx].snippet):
-                        unique_items[idx] = item
-                    is_duplicate = True
-                    break
-        
-        if not is_duplicate:
-            seen_canonical_urls[canon_url] = len(unique_items)
+        # MarketNewsItem carries its canonical URL from validation
+        canon_url = getattr(item, 'canonical_url', None) or canonicalize_url(item.url)
+        existing = by_url.get(canon_url)
+        if existing is None or len(item.snippet) > len(existing.snippet):
+            by_url[canon_url] = item
+    
+    # 2. Fuzzy title match among the URL representatives
+    unique_items = []
+    unique_titles = [] # normalized titles, parallel to unique_items
+    for item in by_url.values():
+        title = normalize_title(item.title)
+        idx = _find_similar_title(title, unique_titles, title_threshold)
+        if idx is None:
             unique_items.append(item)
+            unique_titles.append(title)
+        elif len(item.snippet) > len(unique_items[idx].snippet):
+            # Duplicate found via title; keep the one with the longer snippet
+            unique_items[idx] = item
+            unique_titles[idx] = title
             
     return unique_items
@@ -8,6 +8,13 @@ from src.openai_client import OpenAIClient
 
 logger = logging.getLogger(__name__)
 
+# orjson parses the extraction reply in C when available; its JSONDecodeError
+# subclasses json.JSONDecodeError, so the retry handling below is unchanged.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Strict JSON Schema for OpenAI structured outputs
 FACT_CARD_SCHEMA = {
     "type": "object",
@@ -120,7 +127,7 @@ class FactCardExtractor:
                 raw_content = response.choices[0].message.content
                 
                 try:
-                    result = json.loads(raw_content)
+                    result = _json_loads(raw_content)
                 except json.JSONDecodeError as je:
                     logger.warning(f"Attempt {attempt + 1}: JSON parse error: {je}")
                     last_error = je
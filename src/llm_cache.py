@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+
+
+class LLMCache:
+    """
+    File-backed cache of LLM response content, keyed on the full request.
+
+    Meant for deterministic (temperature=0) calls: re-running a composition
+    over the same fact cards (dev iteration, retries) returns the stored
+    content instead of paying for another round-trip. One JSON file per key
+    under cache_dir; entries older than ttl_seconds are treated as misses.
+    """
+    def __init__(self, cache_dir: str = "data/llm_cache", ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        **params: Any
+    ) -> str:
+        """
+        SHA256 of the canonical JSON of everything that shapes the response
+        (model, messages, temperature, response_format, token cap, ...).
+        """
+        payload = {"model": model, "messages": messages, "temperature": temperature, **params}
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns cached content, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.get("content")
+
+    def set(self, key: str, content: str) -> None:
+        """Stores content under key (written atomically via rename)."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "content": content}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {key[:12]}: {e}")
+
+    def clear(self) -> None:
+        """Removes all cached entries."""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -2,8 +2,8 @@ import logging
 import time
 import random
 import base64
-from typing import Dict, Any, Optional, List, Tuple
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from typing import Callable, Dict, Any, Optional, List, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment, FileContent, FileName, FileType, Disposition, ContentId
 from src.config import Settings
@@ -15,18 +15,24 @@ class NewsMailer:
     Handles rendering news briefs via Jinja2 and sending them via SendGrid.
     Supports both base64 inline images and CID attachments for charts.
     """
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, sleep_fn: Optional[Callable[[float], None]] = None):
         self.settings = settings
         self.email_config = settings.email
+        # Waits between send retries; tests inject a no-op or recorder
+        self.sleep_fn = sleep_fn or time.sleep
         
         # Chart embedding method: "base64" (inline) or "cid" (attachment, more reliable)
         self.chart_embed_method = getattr(self.email_config, 'chart_embed_method', 'cid')
         
         # Initialize Jinja2 environment
-        # Assuming templates are in src/templates relative to the project root
+        # Assuming templates are in src/templates relative to the project root.
+        # Templates don't change while a run is in progress: skip the per-render
+        # mtime check, and keep compiled bytecode in the temp dir across runs.
         self.jinja_env = Environment(
             loader=FileSystemLoader("src/templates"),
-            autoescape=select_autoescape(['html', 'xml'])
+            autoescape=select_autoescape(['html', 'xml']),
+            bytecode_cache=FileSystemBytecodeCache(),
+            auto_reload=False
         )
         
         # Initialize SendGrid client
@@ -113,7 +119,7 @@ class NewsMailer:
     ) -> bool:
         """
         Sends an email using SendGrid with retry logic.
-        Retries up to 3 times with exponential backoff and jitter.
+        Retries up to email.max_retries times (default 3) with exponential backoff and jitter.
         
         Args:
             subject: Email subject
@@ -140,7 +146,7 @@ class NewsMailer:
                 message.add_attachment(attachment)
             logger.info(f"Added {len(attachments)} CID attachments to email")
 
-        max_retries = 3
+        max_retries = getattr(self.email_config, 'max_retries', 3)
         retries = 0
         backoff = 2.0  # Start with 2 seconds
 
@@ -166,7 +172,7 @@ class NewsMailer:
                         delay = backoff * jitter
                         
                         logger.warning(f"Email send returned {response.status_code}. Retrying in {delay:.1f}s... ({retries + 1}/{max_retries})")
-                        time.sleep(delay)
+                        self.sleep_fn(delay)
                         retries += 1
                         backoff *= 2
                     else:
@@ -185,7 +191,7 @@ class NewsMailer:
                 delay = backoff * jitter
                 
                 logger.warning(f"Exception while sending email: {e}. Retrying in {delay:.1f}s... ({retries + 1}/{max_retries})")
-                time.sleep(delay)
+                self.sleep_fn(delay)
                 retries += 1
                 backoff *= 2
 
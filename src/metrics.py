@@ -11,15 +11,20 @@ Tracks counts at each stage of the pipeline:
 
 import json
 import logging
+import re
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Compiled once; the quality report scans the full rendered email
+_HREF_RE = re.compile(r'<a\s+[^>]*href\s*=\s*["\'][^"\']+["\']', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
 
-@dataclass
+
+@dataclass(slots=True)
 class RetrievalMetrics:
     """Metrics from the retrieval phase."""
     total_items: int = 0
@@ -34,7 +39,7 @@ class RetrievalMetrics:
     failed_queries: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ClusteringMetrics:
     """Metrics from clustering/deduplication."""
     items_before_dedup: int = 0
@@ -42,7 +47,7 @@ class ClusteringMetrics:
     dedup_ratio: float = 0.0  # items_before / clusters_after
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractionMetrics:
     """Metrics from fact card extraction."""
     clusters_input: int = 0
@@ -50,7 +55,7 @@ class ExtractionMetrics:
     extraction_rate: float = 0.0  # cards / clusters
 
 
-@dataclass
+@dataclass(slots=True)
 class RankingMetrics:
     """Metrics from ranking and selection."""
     fact_cards_input: int = 0
@@ -68,7 +73,7 @@ class RankingMetrics:
     china_note_added: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class WatchlistMetrics:
     """Metrics for watchlist coverage."""
     total_tickers_configured: int = 0
@@ -79,7 +84,7 @@ class WatchlistMetrics:
     items_per_ticker: Dict[str, int] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class OutputMetrics:
     """Metrics for output quality."""
     total_clickable_links: int = 0
@@ -89,7 +94,7 @@ class OutputMetrics:
     read_time_minutes: float = 0.0
 
 
-@dataclass 
+@dataclass(slots=True)
 class PipelineMetrics:
     """Complete metrics for a pipeline run."""
     run_id: str = ""
@@ -107,6 +112,34 @@ class PipelineMetrics:
     quality_passed: bool = True
     quality_issues: List[str] = field(default_factory=list)
     
+    # (failed?, message) rule table; both callables take (metrics, total_tickers)
+    _QUALITY_RULES: ClassVar[Tuple[Tuple[Callable[..., bool], Callable[..., str]], ...]] = (
+        (
+            lambda m, n: m.ranking.top5_selected != 5,
+            lambda m, n: f"Top 5 has {m.ranking.top5_selected} items (expected exactly 5)",
+        ),
+        (
+            lambda m, n: m.ranking.top5_eu_count == 0 and m.retrieval.by_region.get('eu', 0) > 0,
+            lambda m, n: "No EU story in Top 5 despite EU news being available",
+        ),
+        (
+            lambda m, n: not m.ranking.china_news_available and not m.ranking.china_note_added,
+            lambda m, n: "No China news and no 'no China news' note added",
+        ),
+        (
+            lambda m, n: m.watchlist.tickers_with_news < min(5, n),
+            lambda m, n: f"Only {m.watchlist.tickers_with_news}/{n} watchlist tickers covered",
+        ),
+        (
+            lambda m, n: m.output.total_clickable_links < 10,
+            lambda m, n: f"Only {m.output.total_clickable_links} clickable links (expected at least 10)",
+        ),
+        (
+            lambda m, n: m.output.snapshot_status == "ai_generated",
+            lambda m, n: "Snapshot uses AI-generated data instead of real market data",
+        ),
+    )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return asdict(self)
@@ -120,39 +153,12 @@ class PipelineMetrics:
     
     def validate_quality(self, watchlist_tickers: List[str]) -> None:
         """Run quality checks and populate quality_issues."""
-        self.quality_issues = []
-        
-        # Check Top 5 count
-        if self.ranking.top5_selected != 5:
-            self.quality_issues.append(
-                f"Top 5 has {self.ranking.top5_selected} items (expected exactly 5)"
-            )
-        
-        # Check EU coverage
-        if self.ranking.top5_eu_count == 0 and self.retrieval.by_region.get('eu', 0) > 0:
-            self.quality_issues.append("No EU story in Top 5 despite EU news being available")
-        
-        # Check China coverage
-        if not self.ranking.china_news_available and not self.ranking.china_note_added:
-            self.quality_issues.append("No China news and no 'no China news' note added")
-        
-        # Check watchlist coverage
         total_tickers = len(watchlist_tickers)
-        if self.watchlist.tickers_with_news < min(5, total_tickers):
-            self.quality_issues.append(
-                f"Only {self.watchlist.tickers_with_news}/{total_tickers} watchlist tickers covered"
-            )
-        
-        # Check clickable links
-        if self.output.total_clickable_links < 10:
-            self.quality_issues.append(
-                f"Only {self.output.total_clickable_links} clickable links (expected at least 10)"
-            )
-        
-        # Check snapshot
-        if self.output.snapshot_status == "ai_generated":
-            self.quality_issues.append("Snapshot uses AI-generated data instead of real market data")
-        
+        self.quality_issues = [
+            message(self, total_tickers)
+            for failed, message in self._QUALITY_RULES
+            if failed(self, total_tickers)
+        ]
         self.quality_passed = len(self.quality_issues) == 0
     
     def print_quality_report(self) -> None:
@@ -209,17 +215,13 @@ class PipelineMetrics:
 
 def count_clickable_links(html_content: str) -> int:
     """Count the number of <a href= links in HTML content."""
-    import re
-    pattern = r'<a\s+[^>]*href\s*=\s*["\'][^"\']+["\']'
-    matches = re.findall(pattern, html_content, re.IGNORECASE)
-    return len(matches)
+    return sum(1 for _ in _HREF_RE.finditer(html_content))
 
 
 def estimate_read_time(html_content: str) -> float:
     """Estimate reading time in minutes based on word count."""
-    import re
     # Strip HTML tags
-    text = re.sub(r'<[^>]+>', ' ', html_content)
+    text = _TAG_RE.sub(' ', html_content)
     # Count words
     words = len(text.split())
     # Average reading speed: 200 words per minute
@@ -1,3 +1,4 @@
+import functools
 import time
 import random
 import logging
@@ -7,6 +8,17 @@ from src.config import Settings
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=4)
+def shared_openai_client(api_key: str, base_url: Optional[str] = None) -> openai.OpenAI:
+    """
+    One openai.OpenAI per (API key, base URL) for the process.
+
+    Every OpenAIClient/PerplexityClient built with the same credentials shares
+    one keep-alive connection pool instead of each paying its own TLS
+    handshake. Tests clear it with shared_openai_client.cache_clear().
+    """
+    return openai.OpenAI(api_key=api_key, base_url=base_url)
+
 class OpenAIClient:
     """
     OpenAI client wrapper providing robust retry logic, 
@@ -15,7 +27,7 @@ class OpenAIClient:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.api_key = settings.openai_api_key.get_secret_value()
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.client = shared_openai_client(self.api_key)
         self.extract_model = settings.models.extract_model
         self.write_model = settings.models.write_model
         self.fallback = settings.models.fallback_model
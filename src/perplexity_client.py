@@ -4,22 +4,37 @@ import logging
 import openai
 from typing import List, Dict, Optional, Any
 from src.config import Settings
+from src.openai_client import shared_openai_client
 
 logger = logging.getLogger(__name__)
 
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+
+def _decorrelated_jitter(rng: random.Random, base: float, prev_sleep: float, cap: float) -> float:
+    """
+    Next retry delay with AWS-style decorrelated jitter.
+    
+    Unlike a fixed 2s/4s/8s ladder (± jitter), each delay is drawn from
+    [base, prev_sleep * 3], so callers that failed together (e.g. the
+    concurrent retrieval queries) don't retry in lockstep.
+    """
+    return min(cap, rng.uniform(base, prev_sleep * 3))
+
+
 class PerplexityClient:
     """
     Specialized client for Perplexity AI providing robust retry logic for 
-    reliable news retrieval. Features exponential backoff for 429 and 5xx.
+    reliable news retrieval. Features decorrelated-jitter backoff for 429 and 5xx.
     """
     def __init__(self, settings: Settings):
         self.settings = settings
         self.api_key = settings.perplexity_api_key.get_secret_value()
-        self.client = openai.OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.perplexity.ai"
-        )
+        # Shared per process, so concurrent queries and retries reuse warm connections
+        self.client = shared_openai_client(self.api_key, PERPLEXITY_BASE_URL)
         self.default_model = settings.models.retrieval
+        # Private RNG for backoff jitter (tests seed it without touching global random)
+        self._rng = random.Random()
 
     def chat(
         self, 
@@ -27,15 +42,18 @@ class PerplexityClient:
         model: Optional[str] = None,
         max_retries: int = 3,
         initial_backoff: float = 2.0,
+        max_backoff: float = 30.0,
         temperature: float = 0.2,
         timeout: float = 60.0
     ) -> str:
         """
-        Sends a chat completion request to Perplexity with exponential backoff on 429 and 5xx.
+        Sends a chat completion request to Perplexity with backoff on 429 and 5xx.
+        Delays use decorrelated jitter between initial_backoff and max_backoff;
+        a Retry-After header overrides the computed delay.
         """
         model = model or self.default_model
         retries = 0
-        backoff = initial_backoff
+        prev_sleep = initial_backoff
 
         while retries <= max_retries:
             try:
@@ -70,12 +88,10 @@ class PerplexityClient:
                         except (ValueError, TypeError):
                             retry_after = None
                 
-                # Calculate backoff with jitter (±25%)
                 if retry_after:
                     delay = retry_after
                 else:
-                    jitter = random.uniform(0.75, 1.25)
-                    delay = backoff * jitter
+                    delay = prev_sleep = _decorrelated_jitter(self._rng, initial_backoff, prev_sleep, max_backoff)
                 
                 logger.warning(
                     f"Perplexity API error {status_code}. "
@@ -83,21 +99,17 @@ class PerplexityClient:
                 )
                 time.sleep(delay)
                 retries += 1
-                backoff *= 2  # Exponential backoff
 
             except openai.APITimeoutError as e:
                 if retries == max_retries:
                     logger.error(f"Perplexity Timeout error after {max_retries} retries: {e}")
                     raise
                 
-                # Apply jitter to timeout backoff too
-                jitter = random.uniform(0.75, 1.25)
-                delay = backoff * jitter
+                delay = prev_sleep = _decorrelated_jitter(self._rng, initial_backoff, prev_sleep, max_backoff)
                 
                 logger.warning(f"Perplexity Timeout error. Retrying in {delay:.1f}s... ({retries + 1}/{max_retries})")
                 time.sleep(delay)
                 retries += 1
-                backoff *= 2
 
             except Exception as e:
                 logger.error(f"Unexpected error in PerplexityClient: {e}")
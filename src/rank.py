@@ -1,4 +1,5 @@
 import logging
+import re
 from typing import List, Dict, Set, Optional
 from src.config import Settings
 from src.extract import FactCard
@@ -6,6 +7,33 @@ from src.clustering import StoryCluster
 
 logger = logging.getLogger(__name__)
 
+# Refined macro keywords for heuristic categorization
+MACRO_KEYWORDS = frozenset({
+    "fed", "fomc", "central bank", "ecb", "boj", "pboc", "interest rates", 
+    "inflation", "cpi", "pce", "gdp", "growth", "recession", "stimulus", 
+    "monetary policy", "fiscal policy", "treasury", "yield curve", "employment",
+    "unemployment", "payroll", "labor market", "deficit", "debt ceiling",
+    "quantitative easing", "tightening", "hawkish", "dovish", "rate hike", 
+    "rate cut", "trade balance", "retail sales", "consumer spending"
+})
+
+# Key entities that are macro-related (central banks, gov bodies)
+MACRO_ENTITIES = frozenset({"fed", "ecb", "boj", "pboc", "treasury", "biden", "trump", "government"})
+
+
+def _substring_pattern(keywords) -> "re.Pattern[str]":
+    """
+    One case-insensitive alternation matching any keyword as a substring
+    (same semantics as `any(kw in text.lower() ...)`, in a single C-level scan).
+    Longest keywords first so overlapping alternatives don't shadow each other.
+    """
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(kw) for kw in ordered), re.IGNORECASE)
+
+
+_MACRO_KEYWORD_RE = _substring_pattern(MACRO_KEYWORDS)
+_MACRO_ENTITY_RE = _substring_pattern(MACRO_ENTITIES)
+
 # Lazy import sentiment to avoid slow startup if NLTK not installed
 _sentiment_analyzer = None
 
@@ -28,11 +56,26 @@ class FactCardRanker:
     Identifies Watchlist items, Top Stories, Macro updates, and general Market news.
     Enforces coverage constraints: US, EU, China representation in Top 5.
     """
+    __slots__ = (
+        "settings", "watchlist", "coverage_weights",
+        "use_sentiment_boost", "sentiment_boost_min", "sentiment_boost_max",
+        "require_us_in_top5", "require_eu_in_top5", "require_china_in_top5",
+        "deprioritize_analyst_targets", "analyst_target_keywords",
+        "_region_boost",
+    )
+
+    # Score multiplier for regions not listed in _region_boost
+    DEFAULT_REGION_BOOST = 1.10
+
     def __init__(self, settings: Settings):
         self.settings = settings
         self.watchlist = [t.upper() for t in settings.watchlist_tickers]
         self.coverage_weights = settings.coverage or {"US": 0.7, "EU": 0.2, "China": 0.1}
         
+        # Regional balancing: US is the main focus (baseline); every other
+        # region gets a subtle 10% "participation boost" (DEFAULT_REGION_BOOST)
+        self._region_boost = {"US": 1.0}
+        
         # Sentiment boost configuration
         self.use_sentiment_boost = getattr(settings.ranking, 'use_sentiment_boost', True)
         boost_range = getattr(settings.ranking, 'sentiment_boost_range', None)
@@ -53,16 +96,6 @@ class FactCardRanker:
         self.analyst_target_keywords = getattr(settings.ranking, 'analyst_target_keywords', [
             "price target", "analyst rating", "upgraded", "downgraded", "initiated coverage"
         ])
-        
-        # Refined macro keywords for heuristic categorization
-        self.macro_keywords = {
-            "fed", "fomc", "central bank", "ecb", "boj", "pboc", "interest rates", 
-            "inflation", "cpi", "pce", "gdp", "growth", "recession", "stimulus", 
-            "monetary policy", "fiscal policy", "treasury", "yield curve", "employment",
-            "unemployment", "payroll", "labor market", "deficit", "debt ceiling",
-            "quantitative easing", "tightening", "hawkish", "dovish", "rate hike", 
-            "rate cut", "trade balance", "retail sales", "consumer spending"
-        }
     
     def _is_analyst_target_story(self, card: FactCard) -> bool:
         """Check if a card is primarily about analyst price targets."""
@@ -118,7 +151,7 @@ class FactCardRanker:
         card_regions = {id(card): self._get_card_region(card, id_to_cluster) for card in cards}
         
         # Scoring logic with sentiment integration
-        def calculate_score(card: FactCard) -> float:
+        def calculate_score(card: FactCard, is_analyst_target: bool) -> float:
             cluster = id_to_cluster.get(card.story_id)
             if not cluster:
                 return card.confidence
@@ -130,14 +163,12 @@ class FactCardRanker:
             supporting_count = len(cluster.supporting_items)
             score *= (1 + (supporting_count * 0.15))
             
-            # Regional balancing: US is the main focus (baseline).
-            # Other regions get a subtle 10% "participation boost"
+            # Regional balancing (see _region_boost)
             region = card_regions.get(id(card), "US")
-            if region != "US":
-                score *= 1.10
+            score *= self._region_boost.get(region, self.DEFAULT_REGION_BOOST)
             
             # Deprioritize analyst price target stories
-            if self.deprioritize_analyst_targets and self._is_analyst_target_story(card):
+            if self.deprioritize_analyst_targets and is_analyst_target:
                 score *= 0.7  # 30% penalty
             
             # Sentiment boost: extreme sentiment = more newsworthy
@@ -154,11 +185,15 @@ class FactCardRanker:
         # Pre-calculate scores
         scored_cards = []
         for card in cards:
+            # Keyword scan done once per card, shared by scoring and the record
+            is_analyst_target = self._is_analyst_target_story(card)
             scored_cards.append({
                 "card": card,
-                "score": calculate_score(card),
+                "score": calculate_score(card, is_analyst_target),
                 "region": card_regions.get(id(card), "US"),
-                "is_analyst_target": self._is_analyst_target_story(card)
+                # Entity diversity key, normalized once per card (casefold: Unicode-safe)
+                "entity_key": card.entity.casefold().strip(),
+                "is_analyst_target": is_analyst_target
             })
             
         # Sort by score descending
@@ -205,7 +240,7 @@ class FactCardRanker:
         if self.require_eu_in_top5 and cards_by_region.get("EU"):
             for sc in cards_by_region["EU"]:
                 if id(sc["card"]) not in used_card_ids:
-                    entity_norm = sc["card"].entity.lower().strip()
+                    entity_norm = sc["entity_key"]
                     if entity_norm not in used_entities:
                         buckets["top_stories"].append(sc["card"])
                         used_entities.add(entity_norm)
@@ -216,7 +251,7 @@ class FactCardRanker:
         if self.require_china_in_top5 and cards_by_region.get("CHINA"):
             for sc in cards_by_region["CHINA"]:
                 if id(sc["card"]) not in used_card_ids:
-                    entity_norm = sc["card"].entity.lower().strip()
+                    entity_norm = sc["entity_key"]
                     if entity_norm not in used_entities:
                         buckets["top_stories"].append(sc["card"])
                         used_entities.add(entity_norm)
@@ -228,7 +263,7 @@ class FactCardRanker:
         if self.require_us_in_top5:
             for sc in cards_by_region.get("US", []):
                 if id(sc["card"]) not in used_card_ids and self._is_macro(sc["card"]):
-                    entity_norm = sc["card"].entity.lower().strip()
+                    entity_norm = sc["entity_key"]
                     if entity_norm not in used_entities:
                         buckets["top_stories"].append(sc["card"])
                         used_entities.add(entity_norm)
@@ -250,7 +285,7 @@ class FactCardRanker:
             if any(t in self.watchlist for t in card_tickers):
                 continue
             
-            entity_norm = card.entity.lower().strip()
+            entity_norm = sc["entity_key"]
             if entity_norm in used_entities:
                 continue
             
@@ -302,11 +337,8 @@ class FactCardRanker:
             return True
             
         # 2. Key entities that are macro-related (central banks, gov bodies)
-        macro_entities = {"fed", "ecb", "boj", "pboc", "treasury", "biden", "trump", "government"}
-        entity_lower = card.entity.lower()
-        if any(me in entity_lower for me in macro_entities):
+        if _MACRO_ENTITY_RE.search(card.entity):
             return True
             
-        # 3. Keyword matching in text fields
-        combined_text = (card.entity + " " + card.trend + " " + card.why_it_matters).lower()
-        return any(kw in combined_text for kw in self.macro_keywords)
+        # 3. Keyword matching in text fields (one precompiled regex scan)
+        return _MACRO_KEYWORD_RE.search(f"{card.entity} {card.trend} {card.why_it_matters}") is not None
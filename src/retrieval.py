@@ -1,19 +1,34 @@
+import asyncio
 import logging
 import json
 import re
+from collections import deque
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
-from pydantic import BaseModel, Field, HttpUrl, validator
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, validator
 
 from src.config import Settings
 from src.perplexity_client import PerplexityClient
 from src.dedup import canonicalize_url
 from src.clustering import cluster_items, StoryCluster
+from src.token_utils import truncate_to_words
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# orjson parses the retrieval replies in C when available; both raise a
+# ValueError subclass on malformed input.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Markdown code fences (```json ... ```) around Perplexity replies
+_FENCE_RE = re.compile(r'```(?:json)?')
+# Outermost JSON array in a reply that still has preamble/trailing text
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+@dataclass(slots=True)
 class RetrievalResult:
     """
     Tracks retrieval success/failure and provides metadata about the operation.
@@ -34,10 +49,26 @@ class RetrievalResult:
         if self.successful_queries < 3:
             self.is_sufficient = False
 
+@dataclass(slots=True)
+class QueryOutcome:
+    """
+    Result of one retrieval query: the raw reply on success, otherwise the
+    error message. skipped marks queries never sent (circuit breaker open).
+    """
+    ok: bool
+    text: Optional[str] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
 class MarketNewsItem(BaseModel):
     """
     Normalized schema for a single news item.
+    
+    Frozen: items are shared between dedup, clustering and ranking, so they
+    are immutable and hashable (usable in sets / as dict keys).
     """
+    model_config = ConfigDict(frozen=True)
+    
     title: str
     source: str
     url: str
@@ -72,6 +103,13 @@ class RetrievalPlanner:
         # Domain allowlist from config (empty = allow all)
         retrieval_config = getattr(settings, 'retrieval', None)
         self.allowed_domains = getattr(retrieval_config, 'allowed_domains', []) if retrieval_config else []
+        # Queries in flight at once (the plan's queries are independent)
+        self.max_concurrent_queries = getattr(retrieval_config, 'max_concurrent_queries', 6) if retrieval_config else 6
+        # Circuit breaker: stop dispatching after this many consecutive failures
+        self.circuit_breaker_window = getattr(retrieval_config, 'circuit_breaker_window', 2) if retrieval_config else 2
+        
+        # The plan only depends on settings, so it is built once per planner
+        self._query_plan = self._build_query_plan()
         if self.allowed_domains:
             logger.info(f"Domain allowlist enabled: {len(self.allowed_domains)} domains")
 
@@ -114,6 +152,14 @@ You must return a raw JSON array of objects. Each object must have:
 Return ONLY the JSON array. Do not include markdown formatting or preamble."""
 
     def _generate_queries(self) -> Dict[str, str]:
+        """Returns the precomputed query plan (query_name -> query)."""
+        return self._query_plan
+
+    def invalidate_query_plan(self) -> None:
+        """Rebuilds the query plan after settings (e.g. the watchlist) change."""
+        self._query_plan = self._build_query_plan()
+
+    def _build_query_plan(self) -> Dict[str, str]:
         """
         Defines the multi-query daily retrieval plan.
         Updated to request more items per query to ensure regional coverage.
@@ -147,11 +193,70 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
         tickers_str = ", ".join(uncovered_tickers)
         return f"Latest news and developments for these specific tickers: {tickers_str}. Include source URLs for each story. Region tag: 'watchlist'"
 
+    def _run_query(self, query: str) -> QueryOutcome:
+        """
+        Sends one retrieval query to Perplexity.
+        
+        Client errors (after PerplexityClient's own retries) come back as a
+        failed QueryOutcome, so one failing query never aborts the plan.
+        """
+        try:
+            text = self.perplexity.chat(
+                messages=[
+                    {"role": "system", "content": self._get_system_prompt()},
+                    {"role": "user", "content": query}
+                ],
+                temperature=0.1 # Low temperature for consistent JSON
+            )
+        except Exception as e:
+            return QueryOutcome(ok=False, error=str(e))
+        return QueryOutcome(ok=True, text=text)
+
+    async def _fetch_all(self, queries: Dict[str, str]) -> Dict[str, QueryOutcome]:
+        """
+        Runs the queries concurrently (blocking client calls on worker threads
+        via asyncio.to_thread), slow-start style: one query at a time until a
+        query succeeds, then up to max_concurrent_queries at once. Any failure
+        drops back to one at a time, so a failing provider trips the circuit
+        breaker after circuit_breaker_window calls instead of a full batch.
+        
+        Returns query_name -> QueryOutcome; queries not started before the
+        circuit breaker tripped are marked skipped.
+        """
+        max_in_flight = max(1, self.max_concurrent_queries)
+        limit = 1
+        in_flight = 0
+        slot_freed = asyncio.Condition()
+        # Success flags of the most recently completed queries. Only touched on
+        # the event loop thread, so no lock is needed.
+        recent = deque(maxlen=max(1, self.circuit_breaker_window))
+        
+        async def run(key: str, query: str) -> QueryOutcome:
+            nonlocal limit, in_flight
+            async with slot_freed:
+                await slot_freed.wait_for(lambda: in_flight < limit)
+                if len(recent) == recent.maxlen and not any(recent):
+                    return QueryOutcome(ok=False, skipped=True)
+                in_flight += 1
+            logger.info(f"Executing retrieval query for {key}...")
+            outcome = await asyncio.to_thread(self._run_query, query)
+            async with slot_freed:
+                in_flight -= 1
+                recent.append(outcome.ok)
+                limit = max_in_flight if outcome.ok else 1
+                slot_freed.notify_all()
+            return outcome
+        
+        outcomes = await asyncio.gather(*(run(key, query) for key, query in queries.items()))
+        return dict(zip(queries, outcomes))
+
     def fetch_and_normalize(self) -> RetrievalResult:
         """
         Runs the multi-query plan, clusters items about the same story, and enforces regional balance.
         Returns a RetrievalResult with success/failure tracking.
-        Implements circuit breaker: fails fast after 2 consecutive query failures.
+        Queries are dispatched concurrently once the first one succeeds (see _fetch_all).
+        Implements circuit breaker: after circuit_breaker_window consecutive failures, queries
+        not yet started are skipped, and so is the watchlist fallback query.
         Requires minimum 3/6 successful queries.
         Includes fallback mechanism for insufficient watchlist coverage.
         """
@@ -162,8 +267,7 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
         successful_queries = 0
         failed_queries = 0
         query_details = {}
-        consecutive_failures = 0
-        max_consecutive_failures = 2
+        skipped_queries = 0
         domain_filtered_count = 0
         items_dropped_no_url = 0
         
@@ -174,18 +278,20 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
         watchlist_tickers = [t.upper() for t in self.settings.watchlist_tickers]
         tickers_found_in_items = set()
 
-        for key, query in queries.items():
-            logger.info(f"Executing retrieval query for {key}...")
+        outcomes = asyncio.run(self._fetch_all(queries))
+
+        # Results are processed in plan order, so item order doesn't depend on completion order
+        for key, outcome in outcomes.items():
+            if not outcome.ok:
+                failed_queries += 1
+                query_details[key] = False
+                if outcome.skipped:
+                    skipped_queries += 1
+                else:
+                    logger.error(f"Query {key} failed: {outcome.error}")
+                continue
             try:
-                raw_response = self.perplexity.chat(
-                    messages=[
-                        {"role": "system", "content": self._get_system_prompt()},
-                        {"role": "user", "content": query}
-                    ],
-                    temperature=0.1 # Low temperature for consistent JSON
-                )
-                
-                items = self._parse_json_items(raw_response)
+                items = self._parse_json_items(outcome.text)
                 items_by_query[key] = 0
                 
                 # Track snippet truncation
@@ -206,9 +312,9 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
                             continue
                         
                         # Normalize snippet length just in case
-                        words = item.get('snippet', '').split()
-                        if len(words) > self.daily_config.snippet_words:
-                            item['snippet'] = " ".join(words[:self.daily_config.snippet_words]) + "..."
+                        snippet, truncated = truncate_to_words(item.get('snippet', ''), self.daily_config.snippet_words)
+                        if truncated:
+                            item['snippet'] = snippet
                             truncated_count += 1
                         
                         news_item = MarketNewsItem(**item)
@@ -231,27 +337,19 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
                 # Success!
                 successful_queries += 1
                 query_details[key] = True
-                consecutive_failures = 0  # Reset circuit breaker
                 logger.info(f"Query {key} succeeded with {items_by_query.get(key, 0)} valid items")
 
             except Exception as e:
                 failed_queries += 1
                 query_details[key] = False
-                consecutive_failures += 1
                 logger.error(f"Query {key} failed: {e}")
-                
-                # Circuit breaker: fail fast after 2 consecutive failures
-                if consecutive_failures >= max_consecutive_failures:
-                    logger.error(
-                        f"Circuit breaker triggered: {consecutive_failures} consecutive failures. "
-                        f"Stopping further queries to save time/costs."
-                    )
-                    # Mark remaining queries as failed
-                    remaining_keys = [k for k in queries.keys() if k not in query_details]
-                    for remaining_key in remaining_keys:
-                        query_details[remaining_key] = False
-                        failed_queries += 1
-                    break
+        
+        circuit_open = skipped_queries > 0
+        if circuit_open:
+            logger.error(
+                f"Circuit breaker triggered: {self.circuit_breaker_window} consecutive failures. "
+                f"Skipped {skipped_queries} remaining queries to save time/costs."
+            )
 
         # Log domain filtering stats
         if domain_filtered_count > 0:
@@ -263,7 +361,8 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
         uncovered_tickers = [t for t in watchlist_tickers if t not in tickers_found_in_items]
         min_tickers_required = self.daily_config.min_watchlist_tickers_covered
         
-        if len(uncovered_tickers) > (len(watchlist_tickers) - min_tickers_required) and uncovered_tickers:
+        # Skipped when the circuit breaker tripped: don't spend another call on a failing provider
+        if not circuit_open and len(uncovered_tickers) > (len(watchlist_tickers) - min_tickers_required) and uncovered_tickers:
             logger.info(f"Watchlist coverage insufficient: {len(tickers_found_in_items)}/{len(watchlist_tickers)} tickers. Running fallback query for: {uncovered_tickers}")
             try:
                 fallback_query = self._generate_fallback_watchlist_query(uncovered_tickers)
@@ -352,21 +451,27 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
     def _parse_json_items(self, raw_text: str) -> List[Dict[str, Any]]:
         """
         Extracts JSON array from Perplexity response text.
+        Handles clean JSON, markdown-fenced JSON and text preamble; only the
+        final JSON parse can raise.
         """
+        if not raw_text:
+            return []
+        # Clean up potential markdown code blocks
+        clean_text = _FENCE_RE.sub('', raw_text).strip()
+        if not clean_text.startswith('['):
+            # There's still preamble: take the first '[' through the last ']'
+            match = _JSON_ARRAY_RE.search(clean_text)
+            if not match:
+                logger.error("Failed to parse JSON from Perplexity: no JSON array in response")
+                return []
+            clean_text = match.group(0)
+        
         try:
-            # Clean up potential markdown code blocks
-            clean_text = re.sub(r'```json\n?|\n?```', '', raw_text).strip()
-            # If there's still preamble, try to find the first '[' and last ']'
-            start = clean_text.find('[')
-            end = clean_text.rfind(']')
-            if start != -1 and end != -1:
-                clean_text = clean_text[start:end+1]
-            
-            data = json.loads(clean_text)
-            return data if isinstance(data, list) else []
-        except Exception as e:
+            data = _json_loads(clean_text)
+        except ValueError as e:
             logger.error(f"Failed to parse JSON from Perplexity: {e}")
             return []
+        return data if isinstance(data, list) else []
 
     def _merge_and_cap_clusters(self, clusters: List[StoryCluster]) -> List[StoryCluster]:
         """
@@ -374,15 +479,10 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
         """
         max_total = self.daily_config.max_candidates
         
-        # Group clusters by the regional tag of their PRIMARY item
-        by_region = {
-            'us': [c for c in clusters if c.primary_item.region == 'us'],
-            'eu': [c for c in clusters if c.primary_item.region == 'eu'],
-            'china': [c for c in clusters if c.primary_item.region == 'china'],
-            'global': [c for c in clusters if c.primary_item.region == 'global'],
-            'watchlist': [c for c in clusters if c.primary_item.region == 'watchlist'],
-            'other': [c for c in clusters if c.primary_item.region not in ['us', 'eu', 'china', 'watchlist', 'global']]
-        }
+        # Group clusters by the regional tag of their PRIMARY item (one pass, order kept)
+        by_region = {'us': [], 'eu': [], 'china': [], 'global': [], 'watchlist': [], 'other': []}
+        for c in clusters:
+            by_region.get(c.primary_item.region, by_region['other']).append(c)
 
         final_list = []
         
@@ -405,7 +505,8 @@ Return ONLY the JSON array. Do not include markdown formatting or preamble."""
         if remaining_slots > 0:
             # Sort remaining potential by some importance if possible, here just use existing order
             # which is based on query-specific rankings from Perplexity.
-            pool = [c for c in clusters if c not in final_list]
+            selected = {id(c) for c in final_list}
+            pool = [c for c in clusters if id(c) not in selected]
             final_list.extend(pool[:remaining_slots])
             
         return final_list[:max_total]
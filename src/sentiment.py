@@ -11,7 +11,11 @@ Features:
 - Integrates with FactCard ranking for sentiment-weighted scores
 """
 
+import importlib.util
 import logging
+import operator
+import threading
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
@@ -19,31 +23,122 @@ logger = logging.getLogger(__name__)
 
 # Lazy load NLTK/VADER to avoid slow imports
 _vader_analyzer = None
+_vader_lock = threading.Lock()
+# Set once NLTK is found missing, so later calls skip the lookup and the warning
+_vader_unavailable = False
+
+# The lexicon download runs on a background thread; _get_vader waits on this
+_lexicon_ready = threading.Event()
+_lexicon_thread: Optional[threading.Thread] = None
+
+
+def _nltk_available() -> bool:
+    """Check for NLTK without importing it."""
+    return importlib.util.find_spec('nltk') is not None
+
+
+def _ensure_lexicon():
+    """
+    Make vader_lexicon available, downloading it only if no copy exists.
+    
+    An existing copy is used as-is (never re-downloaded or overwritten while
+    VADER may be reading it); only a cold start blocks on the download.
+    """
+    try:
+        import nltk
+        try:
+            nltk.data.find('sentiment/vader_lexicon.zip')
+        except LookupError:
+            logger.info("Downloading VADER lexicon (one-time setup)...")
+            nltk.download('vader_lexicon', quiet=True)
+    except Exception as e:
+        logger.warning(f"VADER lexicon check failed: {e}")
+    finally:
+        _lexicon_ready.set()
+
+
+def _prefetch_lexicon():
+    """Start the VADER lexicon check/download in a daemon thread (idempotent)."""
+    global _lexicon_thread
+    if _lexicon_thread is None and not _vader_unavailable and _nltk_available():
+        with _vader_lock:
+            if _lexicon_thread is None:
+                _lexicon_thread = threading.Thread(
+                    target=_ensure_lexicon, name="vader-lexicon", daemon=True
+                )
+                _lexicon_thread.start()
 
 
 def _get_vader():
-    """Lazy initialization of VADER sentiment analyzer."""
-    global _vader_analyzer
+    """Lazy initialization of VADER sentiment analyzer (None if NLTK is missing)."""
+    global _vader_analyzer, _vader_unavailable
     if _vader_analyzer is None:
-        try:
-            import nltk
-            from nltk.sentiment.vader import SentimentIntensityAnalyzer
-            
-            # Download vader_lexicon if not present (one-time)
-            try:
-                nltk.data.find('sentiment/vader_lexicon.zip')
-            except LookupError:
-                logger.info("Downloading VADER lexicon (one-time setup)...")
-                nltk.download('vader_lexicon', quiet=True)
-            
-            _vader_analyzer = SentimentIntensityAnalyzer()
-            logger.debug("VADER sentiment analyzer initialized")
-        except ImportError:
-            logger.warning("NLTK not installed. Sentiment analysis disabled. Run: pip install nltk")
+        if _vader_unavailable:
+            return None
+        if not _nltk_available():
+            with _vader_lock:
+                if not _vader_unavailable:
+                    _vader_unavailable = True
+                    logger.warning("NLTK not installed. Sentiment analysis disabled. Run: pip install nltk")
             return None
+        
+        # Join the background download before the first polarity_scores call
+        _prefetch_lexicon()
+        _lexicon_ready.wait()
+        
+        # Double-checked so concurrent first callers load VADER only once
+        with _vader_lock:
+            if _vader_analyzer is None:
+                from nltk.sentiment.vader import SentimentIntensityAnalyzer
+                _vader_analyzer = SentimentIntensityAnalyzer()
+                logger.debug("VADER sentiment analyzer initialized")
     return _vader_analyzer
 
 
+@lru_cache(maxsize=4096)
+def _score_cached(text: str) -> Tuple[float, float, float, float]:
+    """
+    Score text with VADER, memoized on the full text.
+    
+    Returns a plain tuple (compound, pos, neg, neu) so cached entries stay small
+    and hashable. Call ``_score_cached.cache_clear()`` to reset between tests.
+    """
+    scores = _get_vader().polarity_scores(text)
+    return scores['compound'], scores['pos'], scores['neg'], scores['neu']
+
+
+# Market mood summary lines, checked in order; first matching predicate wins
+_SUMMARY_TEMPLATES = (
+    (lambda bull, bear: bull > bear * 2, "Headlines skew bullish ({bullish}/{total} positive stories)"),
+    (lambda bull, bear: bear > bull * 2, "Headlines skew bearish ({bearish}/{total} negative stories)"),
+    (lambda bull, bear: bull > bear, "Slightly positive tone ({bullish} bullish vs {bearish} bearish)"),
+    (lambda bull, bear: bear > bull, "Slightly negative tone ({bearish} bearish vs {bullish} bullish)"),
+    (lambda bull, bear: True, "Balanced sentiment ({bullish} bullish, {bearish} bearish, {neutral} neutral)"),
+)
+
+
+# Shared label/signal strings (compare with ==; labels read back from JSON or
+# the database are equal but not the same objects)
+LABEL_POSITIVE = "positive"
+LABEL_NEGATIVE = "negative"
+LABEL_NEUTRAL = "neutral"
+
+SIGNAL_BULLISH = "🟢 Bullish"
+SIGNAL_BEARISH = "🔴 Bearish"
+SIGNAL_SLIGHTLY_BULLISH = "🟡 Slightly Bullish"
+SIGNAL_SLIGHTLY_BEARISH = "🟠 Slightly Bearish"
+SIGNAL_NEUTRAL = "⚪ Neutral"
+
+
+def _label_for(compound: float) -> str:
+    """Map a compound score to a positive/negative/neutral label."""
+    if compound >= 0.05:
+        return LABEL_POSITIVE
+    elif compound <= -0.05:
+        return LABEL_NEGATIVE
+    return LABEL_NEUTRAL
+
+
 @dataclass
 class SentimentScore:
     """
@@ -66,15 +161,15 @@ class SentimentScore:
     def market_signal(self) -> str:
         """Returns market-oriented interpretation."""
         if self.compound >= 0.3:
-            return "🟢 Bullish"
+            return SIGNAL_BULLISH
         elif self.compound <= -0.3:
-            return "🔴 Bearish"
+            return SIGNAL_BEARISH
         elif self.compound >= 0.1:
-            return "🟡 Slightly Bullish"
+            return SIGNAL_SLIGHTLY_BULLISH
         elif self.compound <= -0.1:
-            return "🟠 Slightly Bearish"
+            return SIGNAL_SLIGHTLY_BEARISH
         else:
-            return "⚪ Neutral"
+            return SIGNAL_NEUTRAL
 
 
 class SentimentAnalyzer:
@@ -89,21 +184,35 @@ class SentimentAnalyzer:
     
     # Financial-specific sentiment modifiers
     # VADER's default lexicon is good but we can enhance for finance
-    BULLISH_TERMS = {
+    BULLISH_TERMS: frozenset = frozenset({
         'surge', 'rally', 'soar', 'jump', 'gain', 'beat', 'exceed', 'outperform',
         'upgrade', 'bullish', 'optimistic', 'recovery', 'growth', 'expansion',
         'dovish', 'stimulus', 'easing', 'upside', 'breakout', 'strong'
-    }
+    })
     
-    BEARISH_TERMS = {
+    BEARISH_TERMS: frozenset = frozenset({
         'plunge', 'crash', 'tumble', 'drop', 'fall', 'miss', 'decline', 'slump',
         'downgrade', 'bearish', 'pessimistic', 'recession', 'contraction', 'cut',
         'hawkish', 'tightening', 'downside', 'breakdown', 'weak', 'warning'
-    }
+    })
+    
+    # FactCard fields scored by analyze_fact_card, with their weights
+    FIELD_WEIGHTS = (
+        ('entity', 1.0),
+        ('trend', 2.0),
+        ('why_it_matters', 1.5),
+        ('data_point', 0.5),
+    )
+    _get_fields = staticmethod(operator.attrgetter(*(field for field, _ in FIELD_WEIGHTS)))
     
     def __init__(self):
-        self.vader = _get_vader()
-        self._cache: Dict[str, SentimentScore] = {}
+        # Kick off the lexicon download early; VADER itself loads on first use
+        _prefetch_lexicon()
+    
+    @property
+    def vader(self):
+        """VADER analyzer, initialized on first access (None if NLTK unavailable)."""
+        return _get_vader()
     
     def analyze(self, text: str) -> Optional[SentimentScore]:
         """
@@ -117,58 +226,76 @@ class SentimentAnalyzer:
         """
         if not self.vader or not text:
             return None
-        
-        # Check cache
-        cache_key = text[:200]  # Truncate for cache key
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        # Get VADER scores
-        scores = self.vader.polarity_scores(text)
-        
-        # Determine label
-        compound = scores['compound']
-        if compound >= 0.05:
-            label = "positive"
-        elif compound <= -0.05:
-            label = "negative"
-        else:
-            label = "neutral"
-        
-        result = SentimentScore(
+        return self._score_text(text)
+    
+    @staticmethod
+    def _score_text(text: str) -> SentimentScore:
+        """SentimentScore for non-empty text (bounded LRU cache keyed on the full text)."""
+        compound, pos, neg, neu = _score_cached(text)
+        return SentimentScore(
             compound=compound,
-            positive=scores['pos'],
-            negative=scores['neg'],
-            neutral=scores['neu'],
-            label=label
+            positive=pos,
+            negative=neg,
+            neutral=neu,
+            label=_label_for(compound)
         )
+    
+    def analyze_batch(self, texts: List[str]) -> List[Optional[SentimentScore]]:
+        """
+        Analyze many texts in one call, in order.
+        
+        VADER availability is checked once for the batch and repeated texts
+        are scored once (shared score cache), so callers can join each card's
+        fields into one string and score a whole list at a time.
         
-        self._cache[cache_key] = result
-        return result
+        Returns:
+            One SentimentScore per text (None for empty texts or if VADER unavailable)
+        """
+        if not self.vader:
+            return [None] * len(texts)
+        
+        score_text = self._score_text
+        return [score_text(text) if text else None for text in texts]
     
     def analyze_fact_card(self, card) -> Optional[SentimentScore]:
         """
-        Analyze sentiment of a FactCard by combining its text fields.
+        Analyze sentiment of a FactCard as a weighted average of its fields.
         
-        Weights: entity (1x), trend (2x), why_it_matters (1.5x), data_point (0.5x)
+        Weights: entity (1x), trend (2x), why_it_matters (1.5x), data_point (0.5x).
+        Each field is scored separately, so unchanged fields hit the score cache.
         """
         if not self.vader:
             return None
         
-        # Combine relevant text fields with weights
-        texts = []
-        if hasattr(card, 'entity') and card.entity:
-            texts.append(card.entity)
-        if hasattr(card, 'trend') and card.trend:
-            texts.extend([card.trend] * 2)  # Weight: 2x
-        if hasattr(card, 'why_it_matters') and card.why_it_matters:
-            texts.append(card.why_it_matters)
-            texts.append(card.why_it_matters[:len(card.why_it_matters)//2])  # ~1.5x weight
-        if hasattr(card, 'data_point') and card.data_point:
-            texts.append(card.data_point)
+        try:
+            texts = self._get_fields(card)
+        except AttributeError:
+            # Partial card objects: look fields up one by one
+            texts = [getattr(card, field, None) for field, _ in self.FIELD_WEIGHTS]
         
-        combined_text = " ".join(texts)
-        return self.analyze(combined_text)
+        compound = positive = negative = neutral = 0.0
+        weight_total = 0.0
+        for text, (_, weight) in zip(texts, self.FIELD_WEIGHTS):
+            if not text:
+                continue
+            c, pos, neg, neu = _score_cached(text)
+            compound += weight * c
+            positive += weight * pos
+            negative += weight * neg
+            neutral += weight * neu
+            weight_total += weight
+        
+        if not weight_total:
+            return None
+        
+        compound /= weight_total
+        return SentimentScore(
+            compound=compound,
+            positive=positive / weight_total,
+            negative=negative / weight_total,
+            neutral=neutral / weight_total,
+            label=_label_for(compound)
+        )
     
     def compute_market_mood(self, cards: List) -> Dict[str, any]:
         """
@@ -180,42 +307,42 @@ class SentimentAnalyzer:
         if not self.vader or not cards:
             return {
                 "overall_score": 0.0,
-                "label": "neutral",
-                "signal": "⚪ Neutral",
+                "label": LABEL_NEUTRAL,
+                "signal": SIGNAL_NEUTRAL,
                 "bullish_count": 0,
                 "bearish_count": 0,
                 "neutral_count": 0,
                 "summary": "Sentiment analysis unavailable"
             }
         
-        scores = []
+        # Single pass: running total and counts, no intermediate score list
+        total = 0.0
+        scored = 0
         bullish = 0
         bearish = 0
-        neutral = 0
         
         for card in cards:
             sentiment = self.analyze_fact_card(card)
             if sentiment:
-                scores.append(sentiment.compound)
-                if sentiment.compound >= 0.1:
-                    bullish += 1
-                elif sentiment.compound <= -0.1:
-                    bearish += 1
-                else:
-                    neutral += 1
+                compound = sentiment.compound
+                total += compound
+                scored += 1
+                bullish += compound >= 0.1
+                bearish += compound <= -0.1
+        neutral = scored - bullish - bearish
         
-        if not scores:
+        if not scored:
             return {
                 "overall_score": 0.0,
-                "label": "neutral",
-                "signal": "⚪ Neutral",
+                "label": LABEL_NEUTRAL,
+                "signal": SIGNAL_NEUTRAL,
                 "bullish_count": 0,
                 "bearish_count": 0,
                 "neutral_count": len(cards),
                 "summary": "No sentiment data available"
             }
         
-        avg_score = sum(scores) / len(scores)
+        avg_score = total / scored
         
         # Determine overall label
         if avg_score >= 0.15:
@@ -231,20 +358,12 @@ class SentimentAnalyzer:
             label = "slightly_bearish"
             signal = "🟠 Cautiously Pessimistic"
         else:
-            label = "neutral"
+            label = LABEL_NEUTRAL
             signal = "⚪ Mixed/Neutral"
         
         # Generate summary
-        if bullish > bearish * 2:
-            summary = f"Headlines skew bullish ({bullish}/{len(cards)} positive stories)"
-        elif bearish > bullish * 2:
-            summary = f"Headlines skew bearish ({bearish}/{len(cards)} negative stories)"
-        elif bullish > bearish:
-            summary = f"Slightly positive tone ({bullish} bullish vs {bearish} bearish)"
-        elif bearish > bullish:
-            summary = f"Slightly negative tone ({bearish} bearish vs {bullish} bullish)"
-        else:
-            summary = f"Balanced sentiment ({bullish} bullish, {bearish} bearish, {neutral} neutral)"
+        summary_fmt = next(fmt for matches, fmt in _SUMMARY_TEMPLATES if matches(bullish, bearish))
+        summary = summary_fmt.format(bullish=bullish, bearish=bearish, neutral=neutral, total=len(cards))
         
         return {
             "overall_score": round(avg_score, 3),
@@ -304,13 +423,16 @@ class SentimentAnalyzer:
 
 # Module-level singleton for easy access
 _analyzer_instance = None
+_analyzer_lock = threading.Lock()
 
 
 def get_analyzer() -> SentimentAnalyzer:
-    """Get the singleton SentimentAnalyzer instance."""
+    """Get the singleton SentimentAnalyzer instance (thread-safe)."""
     global _analyzer_instance
     if _analyzer_instance is None:
-        _analyzer_instance = SentimentAnalyzer()
+        with _analyzer_lock:
+            if _analyzer_instance is None:
+                _analyzer_instance = SentimentAnalyzer()
     return _analyzer_instance
 
 
@@ -1,11 +1,53 @@
+import hashlib
 import logging
 import dataset
 import json
+import re
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Applied to every SQLite connection: WAL lets readers proceed during writes,
+# synchronous=NORMAL is durable under WAL with far fewer fsyncs
+SQLITE_PRAGMAS = [
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+]
+
+# How SQLAlchemy stores DateTime columns in SQLite (for raw-SQL comparisons)
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Field names interpolated into raw SQL must be plain identifiers
+_FIELD_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Bumped via PRAGMA user_version when a one-shot data migration is applied
+SCHEMA_VERSION = 1
+
+
+def _fact_card_hash(card: Dict[str, Any]) -> str:
+    """
+    Content hash used as the fact card dedup key.
+    BLAKE2b with a 16-byte digest: faster than MD5, same 32-char hex id.
+    """
+    raw_str = f"{card.get('entity')}{card.get('trend')}{card.get('data_point')}"
+    return hashlib.blake2b(raw_str.encode(), digest_size=16).hexdigest()
+
+
+def _merge_duplicates(rows: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    """
+    Collapse rows sharing the same key, merging their columns in order.
+
+    Later values win, but a field present only on an earlier duplicate is
+    kept - the same end state a sequence of per-row upserts would leave.
+    """
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        merged.setdefault(row.get(key), {}).update(row)
+    return list(merged.values())
+
+
 class NewsStorage:
     """
     Handles SQLite data persistence using the dataset library for 
@@ -13,7 +55,11 @@ class NewsStorage:
     """
     def __init__(self, db_path: str):
         self.db_url = f"sqlite:///{db_path}"
-        self.db = dataset.connect(self.db_url)
+        self.db = dataset.connect(
+            self.db_url,
+            sqlite_wal_mode=True,
+            on_connect_statements=list(SQLITE_PRAGMAS)
+        )
         self.init_db()
 
     def init_db(self):
@@ -34,24 +80,54 @@ class NewsStorage:
             self.fact_cards.insert({'story_id': 'init'})
             self.fact_cards.delete(story_id='init')
         self.fact_cards.create_index(['story_id'])
+        # created_at backs the weekly range query and the retention cleanup
+        if not self.fact_cards.has_column('created_at'):
+            self.fact_cards.create_column('created_at', self.db.types.datetime)
+        self.fact_cards.create_index(['created_at'])
 
         # reports: generated daily/weekly briefs
         self.reports = self.db.get_table('reports')
+        
+        self._migrate()
         logger.info("Database initialized with tables: items, fact_cards, reports.")
 
+    def _migrate(self):
+        """
+        Applies one-shot data migrations, tracked with SQLite's user_version.
+        """
+        version = next(iter(self.db.query("PRAGMA user_version")))['user_version']
+        if version >= SCHEMA_VERSION:
+            return
+        
+        # v1: fact_cards.hash_id switched from MD5 to BLAKE2b
+        if self.fact_cards.has_column('hash_id'):
+            with self.db:
+                for row in list(self.fact_cards.all()):
+                    self.fact_cards.update({'id': row['id'], 'hash_id': _fact_card_hash(row)}, ['id'])
+            logger.info("Migrated fact card hash_ids to BLAKE2b.")
+        
+        self.db.query(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
 
     def insert_items(self, items_list: List[Dict[str, Any]]):
         """
         Inserts or updates news items. Uses 'url' as the unique key.
+        The whole batch is written in a single transaction.
         """
         try:
+            # One timestamp for the whole batch
+            now = datetime.now()
             for item in items_list:
                 # Ensure tickers_json is stored as a string if it's a list/dict
                 if 'tickers_json' in item and not isinstance(item['tickers_json'], str):
                     item['tickers_json'] = json.dumps(item['tickers_json'])
                 
-                item.setdefault('fetched_at', datetime.now())
-                self.items.upsert(item, ['url'])
+                item.setdefault('fetched_at', now)
+            
+            # Collapse duplicate URLs within the batch, merging their columns
+            rows = _merge_duplicates(items_list, 'url')
+            with self.db:
+                self.items.upsert_many(rows, ['url'])
             logger.info(f"Successfully upserted {len(items_list)} items.")
         except Exception as e:
             logger.error(f"Failed to insert items: {e}")
@@ -60,13 +136,14 @@ class NewsStorage:
     def insert_fact_cards(self, cards: List[Dict[str, Any]]):
         """
         Inserts fact cards. Tries to deduplicate by creating a unique 'hash_id'.
+        The whole batch is written in a single transaction.
         """
-        import hashlib
         try:
-            for card in cards:
-                # Create a simple unique identifier based on content
-                raw_str = f"{card.get('entity')}{card.get('trend')}{card.get('data_point')}"
-                hash_id = hashlib.md5(raw_str.encode()).hexdigest()
+            # Create a simple unique identifier based on content
+            hash_ids = [_fact_card_hash(card) for card in cards]
+            # One timestamp for the whole batch
+            now = datetime.now()
+            for card, hash_id in zip(cards, hash_ids):
                 card['hash_id'] = hash_id
                 
                 # SQLite doesn't support lists; convert to JSON strings
@@ -74,9 +151,12 @@ class NewsStorage:
                     if field in card and isinstance(card[field], (list, dict)):
                         card[field] = json.dumps(card[field])
                 
-                card.setdefault('created_at', datetime.now())
-                # Use hash_id to prevent duplicates in the fact_cards table
-                self.fact_cards.upsert(card, ['hash_id'])
+                card.setdefault('created_at', now)
+            
+            # Use hash_id to prevent duplicates in the fact_cards table
+            rows = _merge_duplicates(cards, 'hash_id')
+            with self.db:
+                self.fact_cards.upsert_many(rows, ['hash_id'])
             logger.info(f"Successfully upserted {len(cards)} fact cards.")
         except Exception as e:
             logger.error(f"Failed to insert fact cards: {e}")
@@ -112,32 +192,75 @@ class NewsStorage:
             meta=metadata
         )
 
-    def get_fact_cards_between(self, start_date: datetime, end_date: datetime) -> List[Dict[ Any, Any]]:
+    def iter_fact_cards_between(
+        self,
+        start_date: Union[datetime, str],
+        end_date: Union[datetime, str],
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields fact cards created between two dates.
+        
+        Args:
+            start_date: Inclusive lower bound (datetime or ISO-format string)
+            end_date: Inclusive upper bound (datetime or ISO-format string)
+            fields: Optional subset of fields to return. Fields that are not
+                table columns are read from payload_json with SQLite's json_extract,
+                so the payload is never decoded in Python.
+        
+        Yields:
+            Fact card dicts (full rows with decoded payload_json if no fields given)
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.fromisoformat(start_date)
+        if isinstance(end_date, str):
+            end_date = datetime.fromisoformat(end_date)
+        
+        if not fields:
+            # Filter in SQL (indexed on created_at) rather than scanning the table in Python
+            for card in self.fact_cards.find(created_at={'between': [start_date, end_date]}):
+                if card.get('payload_json'):
+                    try:
+                        card['payload_json'] = json.loads(card['payload_json'])
+                    except (json.JSONDecodeError, TypeError):
+                        pass
+                yield card
+            return
+        
+        columns = ["hash_id", "created_at"]
+        for field in fields:
+            if not _FIELD_NAME_RE.fullmatch(field):
+                raise ValueError(f"Invalid fact card field name: {field!r}")
+            if field in columns:
+                continue
+            if self.fact_cards.has_column(field):
+                columns.append(field)
+            elif self.fact_cards.has_column('payload_json'):
+                columns.append(f"json_extract(payload_json, '$.{field}') AS {field}")
+            else:
+                columns.append(f"NULL AS {field}")
+        
+        query = (
+            f"SELECT {', '.join(columns)} FROM fact_cards "
+            "WHERE created_at BETWEEN :start AND :end"
+        )
+        yield from self.db.query(
+            query,
+            start=start_date.strftime(SQLITE_DATETIME_FORMAT),
+            end=end_date.strftime(SQLITE_DATETIME_FORMAT)
+        )
+
+    def get_fact_cards_between(
+        self,
+        start_date: Union[datetime, str],
+        end_date: Union[datetime, str]
+    ) -> List[Dict[Any, Any]]:
         """
         Retrieves fact cards created between two dates for weekly recaps.
+        Dates may be datetimes or ISO-format strings.
         """
         try:
-            # dataset doesn't handle complex date filters in find() easily,
-            # and raw query string formatting is sensitive. Let's use self.fact_cards.find()
-            # with explicit date comparison if possible, or filtered list comprehension
-            # as a fallback if the DB driver doesn't support the raw string format.
-            all_cards = list(self.fact_cards.all())
-            
-            filtered = []
-            for card in all_cards:
-                # dataset often returns dates as datetime objects for SQLite
-                created_at = card.get('created_at')
-                if isinstance(created_at, str):
-                    created_at = datetime.fromisoformat(created_at)
-                
-                if created_at and start_date <= created_at <= end_date:
-                    if card.get('payload_json'):
-                        try:
-                            card['payload_json'] = json.loads(card['payload_json'])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    filtered.append(card)
-            return filtered
+            return list(self.iter_fact_cards_between(start_date, end_date))
         except Exception as e:
             logger.error(f"Failed to retrieve fact cards between {start_date} and {end_date}: {e}")
             return []
@@ -148,14 +271,14 @@ class NewsStorage:
         Deletes fact cards older than the specified date to keep the DB clean.
         """
         try:
-            # dataset doesn't have a direct delete with condition easily for dates, so use raw SQL
-            query = f"DELETE FROM fact_cards WHERE created_at < '{before_date.isoformat()}'"
-            self.db.query(query)
+            # Bound parameter, compared using the column's DateTime type
+            self.fact_cards.delete(created_at={'<': before_date})
             logger.info(f"Deleted fact cards created before {before_date.isoformat()}.")
         except Exception as e:
             logger.error(f"Failed to delete obsolete fact cards: {e}")
             raise
 
+
 def init_db(db_path: str) -> NewsStorage:
     return NewsStorage(db_path)
 
@@ -1,8 +1,15 @@
 import markdown2
 import re
+from functools import lru_cache
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 from datetime import datetime
+from typing import List
+
+# Markdown links: [text](url)
+_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+# Clickable anchors: <a ... href="...">
+_HREF_RE = re.compile(r'<a\s+[^>]*href\s*=\s*["\'][^"\']+["\'][^>]*>', re.IGNORECASE)
 
 class EmailFormatter:
     """
@@ -10,6 +17,10 @@ class EmailFormatter:
     """
     
     def __init__(self):
+        # One configured markdown2 converter, reused across calls (convert()
+        # resets its per-document state) instead of rebuilding it each time
+        self._markdown = markdown2.Markdown(extras=["tables", "break-on-newline"])
+        
         # Define inline styles for common HTML tags to ensure good rendering in email clients
         self.styles = {
             'ul': 'padding-left: 20px; margin-top: 0; margin-bottom: 15px; color: #374151;',
@@ -23,18 +34,35 @@ class EmailFormatter:
             'td': 'border: 1px solid #e5e7eb; padding: 8px; text-align: left; color: #374151;'
         }
         
+        # Precompute tag rewrites so md_to_html styles the HTML in a single pass.
+        # <ul>/<li> become Outlook/Gmail-friendly <div> bullets.
+        li_style = self.styles.get('li', '')
+        self._tag_rewrites = {
+            f'<{tag}>': f'<{tag} style="{style}">'
+            for tag, style in self.styles.items() if tag != 'a'  # Anchors are styled in _convert_markdown_links
+        }
+        self._tag_rewrites.update({
+            '<li>': f'<div style="{li_style}"><span style="color: #3b82f6; margin-right: 8px;">•</span>',
+            '</li>': '</div>',
+            '<ul>': '<div>',
+            '</ul>': '</div>',
+        })
+        self._tag_re = re.compile('|'.join(re.escape(tag) for tag in self._tag_rewrites))
+        
         # Setup Jinja2 environment for email templates
         template_dir = Path(__file__).parent / 'templates'
         self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
+        self._weekly_template = self.jinja_env.get_template('weekly_email_template.html')
+        
+        # The same sections are often rendered more than once per run (preview,
+        # email, archive); memoize per instance since output depends on self.styles
+        self._md_cache = lru_cache(maxsize=1024)(self._render_markdown)
 
     def _convert_markdown_links(self, text: str) -> str:
         """
         Convert Markdown links [text](url) to HTML anchor tags with styling.
         This runs BEFORE markdown2 processing to ensure proper handling.
         """
-        # Pattern for Markdown links: [text](url)
-        link_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-        
         def replace_link(match):
             link_text = match.group(1)
             url = match.group(2)
@@ -42,38 +70,43 @@ class EmailFormatter:
             style = self.styles.get('a', 'color: #2563eb; text-decoration: underline;')
             return f'<a href="{url}" style="{style}" target="_blank">{link_text}</a>'
         
-        return re.sub(link_pattern, replace_link, text)
+        return _LINK_RE.sub(replace_link, text)
 
     def md_to_html(self, md_text: str) -> str:
         """
         Converts Markdown text to HTML and injects inline styles for email clients.
-        Uses markdown2 extras like tables and implements Outlook-proof bullets.
-        Handles Markdown links [text](url) converting them to clickable <a> tags.
+        Uses markdown2 with extras (tables, break-on-newline).
+        Implements Outlook-proof bullets and converts [text](url) to clickable <a> tags.
         """
         if not md_text:
             return ""
+        return self._md_cache(md_text)
+    
+    def md_to_html_many(self, md_texts: List[str]) -> List[str]:
+        """
+        md_to_html for several documents at once (e.g. all sections of a brief).
         
+        Each document is converted on its own (so reference-style link
+        definitions never resolve across sections) and goes through the
+        md_to_html cache.
+        """
+        return [self.md_to_html(md_text) for md_text in md_texts]
+    
+    def md_cache_info(self):
+        """Hit/miss statistics for the md_to_html cache."""
+        return self._md_cache.cache_info()
+
+    def _render_markdown(self, md_text: str) -> str:
+        """Uncached body of md_to_html."""
         # First, convert Markdown links to HTML anchors (before markdown2 processing)
         # This ensures our links are preserved with proper styling
         text_with_links = self._convert_markdown_links(md_text)
         
         # Convert MD to HTML with extras
-        html = markdown2.markdown(text_with_links, extras=["tables", "break-on-newline"])
+        html = self._markdown.convert(text_with_links)
         
-        # Apply standard inline styles (skip 'a' since we handled it above)
-        for tag, style in self.styles.items():
-            if tag != 'a':  # Skip anchor tags, already styled
-                html = html.replace(f'<{tag}>', f'<{tag} style="{style}">')
-
-        # Outlook/Gmail-friendly bullet replacement for <li>
-        # Replace <li>...</li> with <div>• ...</div> for better consistency
-        li_style = self.styles.get('li', '')
-        html = html.replace('<li style="' + li_style + '">', f'<div style="{li_style}"><span style="color: #3b82f6; margin-right: 8px;">•</span>')
-        html = html.replace('</li>', '</div>')
-        
-        # Remove <ul> tags as they are now redundant with our <div> bullets
-        html = html.replace('<ul style="' + self.styles.get('ul', '') + '">', '<div>')
-        html = html.replace('</ul>', '</div>')
+        # Inject inline styles and swap <ul>/<li> for <div> bullets in one pass
+        html = self._tag_re.sub(lambda m: self._tag_rewrites[m.group(0)], html)
             
         return html
     
@@ -82,9 +115,7 @@ class EmailFormatter:
         Count the number of clickable links (<a href=...>) in HTML content.
         Useful for quality metrics.
         """
-        pattern = r'<a\s+[^>]*href\s*=\s*["\'][^"\']+["\'][^>]*>'
-        matches = re.findall(pattern, html_content, re.IGNORECASE)
-        return len(matches)
+        return sum(1 for _ in _HREF_RE.finditer(html_content))
 
     def render_weekly_email(
         self,
@@ -105,9 +136,7 @@ class EmailFormatter:
         Returns:
             Complete HTML email body
         """
-        template = self.jinja_env.get_template('weekly_email_template.html')
-        
-        return template.render(
+        return self._weekly_template.render(
             date_range=date_range,
             theme_html=theme_html,
             top_developments_html=top_developments_html,
@@ -3,13 +3,19 @@ Token estimation and cost calculation utilities.
 
 Uses tiktoken to count tokens for OpenAI models and provides
 conservative estimates for Perplexity API calls.
+
+Counting contract: one shared encoding per model, and whole strings go
+straight into Encoding.encode / encode_batch. tiktoken's BPE does its own
+pre-tokenization in native code, so texts are never split into lines,
+sentences or words in Python first.
 """
 
-import logging
-import tiktoken
-from typing import List, Dict, Any, Optional
+import functools
+import os
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    import tiktoken
 
 # Pricing per 1M tokens (as of Jan 2026)
 # Source: OpenAI and Perplexity pricing pages
@@ -19,158 +25,235 @@ PRICING = {
     "gpt-4o-mini": {"input": 0.15, "output": 0.60},
     "gpt-5-mini": {"input": 0.15, "output": 0.60},  # Assume same as gpt-4o-mini
     "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
-    
+
     # Perplexity models (conservative estimates)
     "pplx-7b-online": {"input": 0.20, "output": 0.20},  # Per-query pricing converted to token estimate
     "pplx-70b-online": {"input": 1.00, "output": 1.00},
 }
 
 # Default pricing for unknown models
-DEFAULT_PRICING = {"input": 1.00,"""
-Token estimation and cost calculation utilities.
+DEFAULT_PRICING = {"input": 1.00, "output": 1.00}
 
-Uses tiktoken to count tokens for OpenAI moFETo_M
-Uses tiktoken to count tokens for OpenAI modeliktconservative estimates for Perplexity API calls.
-"""
+# Per-token (input, output) prices derived once from the per-1M tables above
+_PRICE_PER_TOKEN: Dict[str, Tuple[float, float]] = {
+    model: (price["input"] * 1e-6, price["output"] * 1e-6)
+    for model, price in PRICING.items()
+}
+_DEFAULT_PER_TOKEN = (DEFAULT_PRICING["input"] * 1e-6, DEFAULT_PRICING["output"] * 1e-6)
 
-impormo"""
+# Perplexity doesn't expose its tokenizer: pad estimates by 20%
+PERPLEXITY_SAFETY_MARGIN = 1.2
 
-import logging
-import tiktoken
-from typinge.
-i, "import tiktok "from typing im)
+# Fallback encoding for models tiktoken doesn't know (e.g. Perplexity, newer OpenAI)
+DEFAULT_ENCODING = "cl100k_base"
 
-logger = logging.getLogger(__name__)
+# Texts longer than this are counted without caching (not worth the memory)
+MAX_CACHED_TEXT_LENGTH = 32_768
 
-# Prdin
-# Pricing per 1M tokens (as of Jan Tr# Source: OpenAI and Perplexity pricingl
-PRICING = {
-    # OpenAI models
-    "gpt-4o"od    # Opence    "gpt-4o": {"in      "gpt-4o-mini": {"input": 0.15, "output": 0-3    "gpt-5-mini": {"input": 0.15, "output": 0.wn mod    "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
+
+@functools.lru_cache(maxsize=16)
+def _get_encoding(model: str) -> Optional["tiktoken.Encoding"]:
+    """
+    Resolve the tiktoken encoding for a model once per process.
+
+    Loading BPE tables is expensive, so each model's encoding is memoized.
+    tiktoken itself is imported here, so importing this module stays cheap
+    for callers that only need pricing. Unknown models fall back to
+    cl100k_base; returns None if tiktoken is not installed.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        import logging
+        logging.getLogger(__name__).warning("tiktoken not installed. Using character-based token estimates. Run: pip install tiktoken")
+        return None
     
-    # Perplexity modcl    
-    # Perplexity models (conservative estimastr =   pt    "pplx-7b-online": {"input": 0.20, "output":a     "pplx-70b-online": {"input": 1.00, "output": 1.00},
-}
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        import logging
+        logging.getLogger(__name__).debug(f"No tiktoken encoding for model '{model}', using {DEFAULT_ENCODING}")
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
 
-# Default pricing for unknown modelsr encodin}
 
-# Default pricing for unknown models
-DEFAULT_PRICINkens
-DEFAULT_PRICING = {"input": 1.00,""tuToken estimation and cost calcucoding
-Uses tiktoken to count tokens for OpenAI moFET
-deUses tiktoken to count tokens for OpenAI modelikst"""
-
-impormo"""
-
-import logging
-import tiktoken
-from typinge.
-i, "import tiktok "from typing im)  
-i   
-import lpenimport tiktokunfrom typinge.
-gyi, "import t//
-logger = logging.getLogger(__nam/bl
-# Prdin
-# Pricing per 1M tokens (as_w# PricktPRICING = {
-    # OpenAI models
-    "gpt-4o"od    # Opence    "gpt-4o": {"in'     # Opennt    "gpt-4o"od    od    
-    # Perplexity modcl    
-    # Perplexity models (conservative estimastr =   pt    "pplx-7b-online": {"input": 0.20, "output":a     "pplx-70b-online": {"input": 1.00, "output": 1.00},
-}
+def count_tokens(text: str, model: str = "gpt-4o-mini", exact: bool = True) -> int:
+    """
+    Count tokens in a text string for the given model.
 
-# De m   ag    # Perplexity models (mo}
+    Perplexity models (pplx-*) and exact=False use the character-based
+    estimate, skipping BPE entirely: Perplexity's tokenizer is unknown
+    anyway, and budget guards only need an upper bound.
 
-# Default pricing for unknown modelsr encodin}
+    Args:
+        text: Text to tokenize
+        model: Model name used to select the encoding
+        exact: Set False for a cheap ~4 chars/token estimate
 
-# Default pricing for unknown models
-DEFAULT_PRICINkens
-DEFAULT_PRICING = {"input": 1.00,""tuToken estimatl.sta
-# Default pricing for unknown models
-DEFAULTe =DEFAULT_PRICINkens
-DEFAULT_PRICING RoDEFAULT_PRICING =edUses tiktoken to count tokens for OpenAI moFET
-deUses tikttimate for unknowdeUses tiktoken to count tokens for OpenAI mo  
-impormo"""
-
-import logging
-import tiktoken
-from typiness
-import lssaimport tiktoknufrom typingetokei, "import tgei   
-import lpenimport tiktokunfromitimp()gyi, "import t//
-logger = logging.getLnglogger = logginue# Prdin
-# Pricing per 1M tokeme":
-  # Pric      # OpenAI models
-    "gpt-4o"od    # Opence Ad    "gpt-4o"od     r    # Perplexity modcl    
-    # Perplexity models (conservative estimastr =   ptnu    # Perplexity models (er}
-
-# De m   ag    # Perplexity models (mo}
-
-# Default pricing for unknown modelsr encodin}
+    Returns:
+        Number of tokens (0 for empty text)
+    """
+    if not text:
+        return 0
+    if not exact or _is_approx_model(model):
+        return _approx_tokens(text)
+    if len(text) > MAX_CACHED_TEXT_LENGTH:
+        return _count_uncached(model, text)
+    return _count_cached(model, text)
 
-# Default pricing for unknown models
-DEFAULT_PRICINk Perplexity API ca
-# Default pricing for unknown modelsrtur
-# Default pricing for unknown models
-DEFAULT    Includes 20% safety margin due to unDEFAULT_PRICING =ct# Default pricing for unknown models
-DEFAULTe =DEFAULTxtDEFAULTe =DEFAULT_PRICINkens
-DEFAULsyDEFAULT_PRICING RoDEFAULT_PPedeUses tikttimate for unknowdeUses tiktoken to count tokens for OpenAI mo  
-impormouimpormo"""
-
-import logging
-import tiktoken
-from typiness
-import lssaimportut
-import l coimport tiktokerfrom typiness
-i"import lssainAimport lpenimport tiktokunfromitimp()gyi, "import t//
-loggenslogger = logging.getLnglogger = logginue# Prdin
-# PrPe# Pricing per 1M tokeme":
-  # Pric      # Open r  # Pric      # Opconserva    "gpt-4o"od    # Opence A o    # Perplexity models (conservative estimastr =   ptnu    # Perplexity m_estimate = int((input_tokens + estimated_output) * PERPLEXITY_SAFETY_MARGIN)
-    
-    l
-# Default pricing for unknown modelsrn e
-# Default pricing for unknown models
-DEFAULTestDEFAULT_PRICINk Perplexity API ca
-# {# Default pricing for unknown mof"# Default pricing for unknown models
-DE1)DEFAULT    Includes 20% safety marg 
-DEFAULTe =DEFAULTxtDEFAULTe =DEFAULT_PRICINkens
-DEFAULsyDEFAULT_PRICING RoDEFAULT_PPedeUses tikttimatenDEFAULsyDEFAULT_PRICING RoDEFAULT_PPedeUses tiosimpormouimpormo"""
-
-import logging
-import tiktoken
-from typiness
-import lssaimportut
-import l coimport tiktokeren
-import logging
-itokimport tiktokf from typiness
-ioimport lssai  import l coimport   i"import lssainAimport lpenimport tiktciloggenslogger = logging.getLnglogger = logginue# Prdin
-# PrPe# PriciLT# PrPe# Pri   
-    # Calculate cost (pricing is per 1M   # Pric      # Open r  # Prict_    
-    l
-# Default pricing for unknown modelsrn e
-# Default pricing for unknown models
-DEFAULTestDEFAULT_PRICINk Perplexity API ca
-# {# Default pricing for unknown mof": str, max_words: int) -> tuple[str, bool]:
-    """
-    Trun  te # De t# Default pricing for unknown models
-DErgDEFAULTestDEFAULT_PRICINk Perplexit  # {# Default pricing for unknown mof"# Def  DE1)DEFAULT    Includes 20% safety marg 
-DEFAULTe =DEFAULTxtDEFAULTe =DE""DEFAULTe =DEFAULTxtDEFAULTe =DEFAULT_PRFaDEFAULsyDEFAULT_PRICING RoDEFAULT_PPedeUses tile
-import logging
-import tiktoken
-from typiness
-import lssaimportut
-import l coimport tiktokeren
-import logging
-itokimport Trimport tiktokatfrom typiness
-(
-import lssai simport l coimport ,
-import logging
-itokimport touitokimport tiinioimport lssai  import l coimpo  # PrPe# PriciLT# PrPe# Pri   
-    # Calculate cost (pricing is per 1M   # Pric      # Open r  # Prict_    
-    l
-# Default pricinam    # Calculate cost (pricint     l
-# Default pricing for unknown modelsrn e
-# Default pricing for unknowed# Det # Default pricing   Returns:
-        FormDEFAULTestDEFAULT_PRICINk Perplexit  # {# Default pricing for unknown mof": strel    """
-    Trun  te # De t# Default pricing for unknown models
-DErgDEFAULTestDok    Tr tDErgDEFAULTestDEFAULT_PRICINk Perplexit  # {# Default ns:,} tokens | "
+
+def _is_approx_model(model: str) -> bool:
+    """Models without a public tokenizer, counted by estimate."""
+    return model.startswith("pplx-")
+
+
+def _approx_tokens(text: str) -> int:
+    """Character-based estimate (~4 characters per token, rounded up)."""
+    return (len(text) + 3) // 4
+
+
+def _count_uncached(model: str, text: str) -> int:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return _approx_tokens(text)
+    return len(encoding.encode(text))
+
+
+@functools.lru_cache(maxsize=4096)
+def _count_cached(model: str, text: str) -> int:
+    """Memoized token count; repeated prompts and snippets skip re-encoding."""
+    return _count_uncached(model, text)
+
+
+def count_tokens_batch(
+    texts: List[str],
+    model: str = "gpt-4o-mini",
+    exact: bool = True
+) -> List[int]:
+    """
+    Count tokens for many texts in one call.
+
+    Uses Encoding.encode_batch, which encodes on tiktoken's native thread
+    pool instead of crossing into it once per string.
+
+    Args:
+        texts: Texts to tokenize
+        model: Model name used to select the encoding
+        exact: Set False for the character-based estimate
+
+    Returns:
+        Token counts, in the same order as texts
+    """
+    if not texts:
+        return []
+    if not exact or _is_approx_model(model):
+        return [_approx_tokens(text) for text in texts]
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return [_approx_tokens(text) for text in texts]
+    encoded = encoding.encode_batch(list(texts), num_threads=os.cpu_count() or 1)
+    return [len(tokens) for tokens in encoded]
+
+
+def clear_token_cache() -> None:
+    """Drop memoized token counts and encodings (e.g. between tests)."""
+    _count_cached.cache_clear()
+    _get_encoding.cache_clear()
+
+
+def count_message_tokens(
+    messages: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    exact: bool = True
+) -> int:
+    """
+    Count tokens for a list of chat messages.
+
+    Adds the per-message overhead used by the chat format (role and
+    separators, ~4 tokens per message plus 3 to prime the reply).
+
+    Args:
+        messages: List of {"role": ..., "content": ...} dicts
+        model: Model name used to select the encoding
+        exact: Set False for the character-based estimate
+
+    Returns:
+        Estimated prompt tokens
+    """
+    contents = [str(message.get("content") or "") for message in messages]
+    # 3 tokens prime the reply (<|start|>assistant<|message|>), 4 per message
+    return 3 + 4 * len(messages) + sum(count_tokens_batch(contents, model, exact))
+
+
+def estimate_perplexity_tokens(
+    messages: List[Dict[str, Any]],
+    estimated_output: int = 1000
+) -> int:
+    """
+    Conservative token estimate for a Perplexity API call.
+
+    Includes 20% safety margin due to unknown tokenizer and search context.
+    Content is counted with the character-based estimate (no BPE).
+
+    Args:
+        messages: Chat messages sent to Perplexity
+        estimated_output: Expected completion tokens
+
+    Returns:
+        Estimated total tokens (input + output, with margin)
+    """
+    input_tokens = count_message_tokens(messages, exact=False)
+    return int((input_tokens + estimated_output) * PERPLEXITY_SAFETY_MARGIN)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int = 0) -> float:
+    """
+    Estimate the USD cost of a call.
+
+    Args:
+        model: Model name (unknown models use DEFAULT_PRICING)
+        input_tokens: Prompt tokens
+        output_tokens: Completion tokens
+
+    Returns:
+        Estimated cost in USD
+    """
+    price_in, price_out = _PRICE_PER_TOKEN.get(model, _DEFAULT_PER_TOKEN)
+    return input_tokens * price_in + output_tokens * price_out
+
+
+def truncate_to_words(text: str, max_words: int) -> tuple[str, bool]:
+    """
+    Truncate text to at most max_words words.
+
+    Splits at most max_words times, so only the kept prefix is tokenized
+    (the remainder stays one string), however long the text is.
+
+    Returns:
+        Tuple of (possibly truncated text, whether truncation happened)
+    """
+    words = text.split(maxsplit=max_words)
+    if len(words) <= max_words:
+        return text, False
+    return " ".join(words[:max_words]) + "...", True
+
+
+def format_usage(
+    label: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int = 0,
+    cost: Optional[float] = None
+) -> str:
+    """
+    Format a one-line token/cost summary for logging.
+
+    Returns:
+        Formatted string like "compose (gpt-4o-mini): 1,234 tokens | Cost: $0.000456"
+    """
+    tokens = input_tokens + output_tokens
+    if cost is None:
+        cost = estimate_cost(model, input_tokens, output_tokens)
+    return (
+        f"{label} ({model}): {tokens:,} tokens | "
         f"Cost: ${cost:.6f}"
     )
@@ -1,17 +1,17 @@
+import warnings
+from functools import cache
+
 from .config import settings
 
+
 def load_config():
-    """Deprecated: Use src.config.settings instead."""
-    return {
-        "app": settings.app.model_dump(),
-        "coverage": settings.coverage,
-        "watchlist": {"tickers": settings.watchlist_tickers},
-        "models": settings.models.model_dump(),
-        "email": settings.email.model_dump()
-    }
+    """Deprecated: Use src.config.settings instead (attribute access, e.g. settings.app.name)."""
+    warnings.warn("load_config is deprecated; use src.config.settings", DeprecationWarning, stacklevel=2)
+    return settings
 
+@cache
 def load_env():
-    """Deprecated: Use src.config.settings instead."""
+    """Deprecated: Use src.config.settings instead. Built once; treat as read-only."""
     return {
         "OPENAI_API_KEY": settings.openai_api_key.get_secret_value(),
         "PERPLEXITY_API_KEY": settings.perplexity_api_key.get_secret_value(),
@@ -5,22 +5,106 @@ Provides reusable fixtures for mock environments, test settings,
 temporary databases, and sample data objects.
 """
 
-import os
 import json
+import shutil
 import tempfile
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
 from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock
 from typing import Dict, List
 
 from src.config import Settings
+from src.openai_client import shared_openai_client
 from src.retrieval import MarketNewsItem
 from src.clustering import StoryCluster
 from src.extract import FactCard
 
 
-@pytest.fixture
+# orjson encodes fixture payloads faster when available; the output is
+# equivalent JSON either way.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_dumps = json.dumps
+
+
+class FakeSendGridClient:
+    """
+    Stand-in for SendGridAPIClient: send() records the Mail message and
+    returns `response` (202 Accepted unless a test replaces it).
+    """
+    def __init__(self, response=None):
+        self.response = response or SimpleNamespace(status_code=202, body="Accepted")
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+        return self.response
+
+
+# Sample news items in Perplexity response format, built once at import.
+# published_at stays an ISO string: MarketNewsItem.published_at is a str and
+# tests JSON-encode these dicts as mock API payloads.
+_SAMPLE_NEWS_RAW: List[Dict] = [
+    {
+        "title": "Fed Signals Rate Pause Amid Cooling Inflation",
+        "source": "Reuters",
+        "url": "https://reuters.com/markets/fed-pause-2026-01",
+        "published_at": "2026-01-31T10:00:00Z",
+        "snippet": "Federal Reserve officials indicated they may pause rate hikes as inflation shows signs of cooling to their 2% target.",
+        "region": "us"
+    },
+    {
+        "title": "Tech Stocks Rally on Strong Earnings",
+        "source": "Bloomberg",
+        "url": "https://bloomberg.com/tech/earnings-rally-2026",
+        "published_at": "2026-01-31T09:30:00Z",
+        "snippet": "Major tech companies reported better-than-expected quarterly earnings, driving a broad market rally.",
+        "region": "us"
+    },
+    {
+        "title": "ECB Maintains Hawkish Stance Despite Slowdown",
+        "source": "Financial Times",
+        "url": "https://ft.com/ecb-policy-2026-01",
+        "published_at": "2026-01-31T08:00:00Z",
+        "snippet": "European Central Bank kept rates unchanged but signaled continued vigilance on inflation risks.",
+        "region": "eu"
+    },
+    {
+        "title": "China Property Sector Shows Signs of Stabilization",
+        "source": "South China Morning Post",
+        "url": "https://scmp.com/china/property-stabilize",
+        "published_at": "2026-01-31T07:00:00Z",
+        "snippet": "Government stimulus measures appear to be supporting property markets in major cities.",
+        "region": "china"
+    },
+    {
+        "title": "NVIDIA Earnings Beat Estimates on AI Demand",
+        "source": "CNBC",
+        "url": "https://cnbc.com/nvda-earnings-2026-q4",
+        "published_at": "2026-01-30T21:00:00Z",
+        "snippet": "NVIDIA reported record revenue driven by strong demand for AI chips from data centers.",
+        "region": "us"
+    }
+]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_shared_openai_client():
+    """
+    Drop the process-wide OpenAI/Perplexity client cache around every test,
+    so a test patching openai.OpenAI never receives a client built earlier.
+    """
+    shared_openai_client.cache_clear()
+    yield
+    shared_openai_client.cache_clear()
+
+
+@pytest.fixture(scope="session")
 def mock_env() -> Dict[str, str]:
     """
     Mock environment variables for testing.
@@ -35,27 +119,64 @@ def mock_env() -> Dict[str, str]:
     }
 
 
+# Variables Settings.load() reads that mock_env doesn't set; unset so a
+# developer's or CI's environment (e.g. CONFIG_YAML_PATH) can't leak in
+UNSET_SETTINGS_ENV = ("CONFIG_YAML_PATH", "SENDGRID_FROM_EMAIL", "RECIPIENT_EMAIL")
+
+
+def _apply_settings_env(mp: pytest.MonkeyPatch, mock_env: Dict[str, str], db_path: Path) -> None:
+    """Point every environment variable Settings.load() reads at test values."""
+    for key, value in mock_env.items():
+        mp.setenv(key, value)
+    for key in UNSET_SETTINGS_ENV:
+        mp.delenv(key, raising=False)
+    mp.setenv("DATABASE_PATH", str(db_path))
+
+
 @pytest.fixture
-def test_settings(mock_env, tmp_path):
+def test_settings(mock_env, tmp_path, monkeypatch):
     """
     Load Settings with mocked environment variables.
     Uses temporary database path.
     """
-    mock_env["DATABASE_PATH"] = str(tmp_path / "test.db")
-    
-    with patch.dict(os.environ, mock_env, clear=True):
-        settings = Settings.load()
+    _apply_settings_env(monkeypatch, mock_env, tmp_path / "test.db")
+    return Settings.load()
+
+
+@pytest.fixture(scope="session")
+def session_settings(mock_env, tmp_path_factory):
+    """
+    Settings loaded once per session, for module/session-scoped fixtures.
+    Treat as read-only; tests that need their own copy use test_settings.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        _apply_settings_env(mp, mock_env, tmp_path_factory.mktemp("settings") / "test.db")
+        return Settings.load()
+
+
+@pytest.fixture(scope="session")
+def db_template(tmp_path_factory) -> Path:
+    """
+    SQLite file with the NewsStorage schema, built once per session.
+    temp_db copies it instead of running the schema DDL for every test.
+    """
+    from src.storage import NewsStorage
     
-    return settings
+    path = tmp_path_factory.mktemp("db_template") / "template.db"
+    storage = NewsStorage(str(path))
+    # Closing the last connection checkpoints the WAL into the main file
+    storage.db.close()
+    return path
 
 
 @pytest.fixture
-def temp_db(tmp_path):
+def temp_db(tmp_path, db_template):
     """
-    Create a temporary SQLite database for testing.
+    Create a temporary SQLite database for testing (schema already applied).
     Returns path to database file.
     """
     db_path = tmp_path / "test_news.db"
+    shutil.copyfile(db_template, db_path)
     return str(db_path)
 
 
@@ -69,57 +190,18 @@ def temp_run_dir(tmp_path):
     return run_dir
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_news_items() -> List[Dict]:
     """
     Sample news items in Perplexity response format.
     Covers multiple regions and sources.
+    
+    Session-scoped like the other sample_* data fixtures: treat as read-only.
     """
-    return [
-        {
-            "title": "Fed Signals Rate Pause Amid Cooling Inflation",
-            "source": "Reuters",
-            "url": "https://reuters.com/markets/fed-pause-2026-01",
-            "published_at": "2026-01-31T10:00:00Z",
-            "snippet": "Federal Reserve officials indicated they may pause rate hikes as inflation shows signs of cooling to their 2% target.",
-            "region": "us"
-        },
-        {
-            "title": "Tech Stocks Rally on Strong Earnings",
-            "source": "Bloomberg",
-            "url": "https://bloomberg.com/tech/earnings-rally-2026",
-            "published_at": "2026-01-31T09:30:00Z",
-            "snippet": "Major tech companies reported better-than-expected quarterly earnings, driving a broad market rally.",
-            "region": "us"
-        },
-        {
-            "title": "ECB Maintains Hawkish Stance Despite Slowdown",
-            "source": "Financial Times",
-            "url": "https://ft.com/ecb-policy-2026-01",
-            "published_at": "2026-01-31T08:00:00Z",
-            "snippet": "European Central Bank kept rates unchanged but signaled continued vigilance on inflation risks.",
-            "region": "eu"
-        },
-        {
-            "title": "China Property Sector Shows Signs of Stabilization",
-            "source": "South China Morning Post",
-            "url": "https://scmp.com/china/property-stabilize",
-            "published_at": "2026-01-31T07:00:00Z",
-            "snippet": "Government stimulus measures appear to be supporting property markets in major cities.",
-            "region": "china"
-        },
-        {
-            "title": "NVIDIA Earnings Beat Estimates on AI Demand",
-            "source": "CNBC",
-            "url": "https://cnbc.com/nvda-earnings-2026-q4",
-            "published_at": "2026-01-30T21:00:00Z",
-            "snippet": "NVIDIA reported record revenue driven by strong demand for AI chips from data centers.",
-            "region": "us"
-        }
-    ]
+    return _SAMPLE_NEWS_RAW
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_market_news_items(sample_news_items) -> List[MarketNewsItem]:
     """
     Convert sample news items to MarketNewsItem objects.
@@ -127,7 +209,7 @@ def sample_market_news_items(sample_news_items) -> List[MarketNewsItem]:
     return [MarketNewsItem(**item) for item in sample_news_items]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_clusters(sample_market_news_items) -> List[StoryCluster]:
     """
     Sample story clusters for testing.
@@ -152,7 +234,7 @@ def sample_clusters(sample_market_news_items) -> List[StoryCluster]:
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fact_cards() -> List[FactCard]:
     """
     Sample fact cards extracted from clusters.
@@ -194,18 +276,20 @@ def sample_fact_cards() -> List[FactCard]:
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_perplexity_response(sample_news_items) -> str:
     """
     Mock Perplexity API response as JSON string.
+    Encoded once per session; the string is immutable.
     """
-    return json.dumps(sample_news_items)
+    return _json_dumps(sample_news_items)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_openai_extraction_response() -> Dict:
     """
     Mock OpenAI extraction response (fact cards).
+    Session-scoped: treat as read-only.
     """
     return {
         "fact_cards": [
@@ -235,10 +319,11 @@ def mock_openai_extraction_response() -> Dict:
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_openai_composition_response() -> Dict:
     """
     Mock OpenAI composition response (daily brief).
+    Session-scoped: treat as read-only.
     """
     return {
         "headline": "Markets Rally on Fed Pause Signal",
@@ -251,26 +336,86 @@ def mock_openai_composition_response() -> Dict:
     }
 
 
+@pytest.fixture(scope="session")
+def openai_extraction_json(mock_openai_extraction_response) -> str:
+    """mock_openai_extraction_response as the JSON content string, encoded once."""
+    return _json_dumps(mock_openai_extraction_response)
+
+
+@pytest.fixture(scope="session")
+def openai_composition_json(mock_openai_composition_response) -> str:
+    """mock_openai_composition_response as the JSON content string, encoded once."""
+    return _json_dumps(mock_openai_composition_response)
+
+
+@pytest.fixture(scope="session")
+def mock_response_factory():
+    """
+    Build mock OpenAI chat responses exposing choices[0].message.content.
+    
+    Returns a callable taking either a dict (JSON-encoded) or a raw string.
+    Plain SimpleNamespace objects: callers only read the content, so
+    MagicMock attribute synthesis isn't needed (patch the client method
+    itself when a test asserts on calls).
+    """
+    def make(content):
+        if not isinstance(content, str):
+            content = _json_dumps(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    return make
+
+
 @pytest.fixture
 def mock_sendgrid_client():
     """
-    Mock SendGrid client for email testing.
+    Fake SendGrid client for email testing; sent messages are in .sent.
+    """
+    return FakeSendGridClient()
+
+
+@pytest.fixture(scope="session")
+def vader_analyzer():
+    """
+    Load the VADER lexicon and analyzer once per session (waits for the
+    background lexicon check/download); later SentimentAnalyzer calls reuse it.
+    None if NLTK is not installed.
     """
-    mock_client = MagicMock()
-    mock_response = MagicMock()
-    mock_response.status_code = 202
-    mock_response.body = "Accepted"
-    mock_client.send.return_value = mock_response
-    return mock_client
+    from src.sentiment import _get_vader
+    return _get_vader()
+
+
+@pytest.fixture(scope="session")
+def sentiment_analyzer(vader_analyzer):
+    """
+    The process-wide SentimentAnalyzer (get_analyzer()), shared by every
+    test and by the module-level convenience functions.
+    """
+    from src.sentiment import get_analyzer
+    return get_analyzer()
+
+
+@pytest.fixture(scope="session")
+def email_formatter():
+    """
+    EmailFormatter shared by the whole session.
+    
+    Building one loads the Jinja environment and templates; tests only
+    call its pure rendering helpers. Imported lazily so conftest doesn't
+    require markdown2.
+    """
+    from src.templates import EmailFormatter
+    return EmailFormatter()
 
 
 @pytest.fixture
 def freezed_time():
     """
     Freeze time to a specific datetime for deterministic tests.
+    
+    Uses freezegun, so every datetime.now()/time.time() caller sees the
+    frozen clock, not just src.logging_utils. Yields the freezegun factory
+    (frozen() -> datetime, tick()/move_to() to advance).
     """
-    frozen = datetime(2026, 1, 31, 12, 0, 0)
-    with patch('src.logging_utils.datetime') as mock_datetime:
-        mock_datetime.now.return_value = frozen
-        mock_datetime.strftime = datetime.strftime
+    freezegun = pytest.importorskip("freezegun")
+    with freezegun.freeze_time("2026-01-31 12:00:00") as frozen:
         yield frozen
@@ -5,21 +5,46 @@ Tests DailyBriefComposer for daily and weekly brief generation,
 OpenAI API error handling, and fallback responses.
 """
 
-import pytest
+import asyncio
 import json
-from unittest.mock import patch, MagicMock
-from src.compose import DailyBriefComposer
+import threading
+import pytest
+from unittest.mock import MagicMock
+from src.compose import DailyBriefComposer, DAILY_BRIEF_SCHEMA
 from src.extract import FactCard
+from src.llm_cache import LLMCache
+
+
+# Minimal valid daily brief payload for tests that only inspect the request
+DUMMY_DAILY_JSON = json.dumps({"headline": "Test", "intro": "Test", "preheader": "Test", "top5_md": "Test", "macro_md": "Test", "watchlist_md": "Test", "snapshot_md": "Test"})
+
+
+@pytest.fixture(scope="session")
+def composition_json(mock_openai_composition_response):
+    """Composition response encoded once per session."""
+    return json.dumps(mock_openai_composition_response)
+
+
+@pytest.fixture
+def composer(test_settings):
+    """DailyBriefComposer built from the mocked test settings."""
+    return DailyBriefComposer(test_settings)
+
+
+@pytest.fixture
+def mock_create(composer, monkeypatch):
+    """MagicMock installed as composer.ai.responses_create; tests set return_value/side_effect."""
+    mock = MagicMock()
+    monkeypatch.setattr(composer.ai, 'responses_create', mock)
+    return mock
 
 
 @pytest.mark.unit
 class TestDailyBriefComposer:
     """Test suite for DailyBriefComposer."""
     
-    def test_compose_daily_brief_success(self, test_settings, sample_fact_cards, mock_openai_composition_response):
+    def test_compose_daily_brief_success(self, composer, mock_create, mock_response_factory, sample_fact_cards, composition_json):
         """Test successful daily brief composition."""
-        composer = DailyBriefComposer(test_settings)
-        
         # Create buckets
         buckets = {
             "top_stories": [sample_fact_cards[0]],
@@ -29,12 +54,10 @@ class TestDailyBriefComposer:
         }
         
         # Mock OpenAI response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps(mock_openai_composition_response)
+        mock_response = mock_response_factory(composition_json)
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response):
-            result = composer.compose_daily_brief(buckets)
+        mock_create.return_value = mock_response
+        result = composer.compose_daily_brief(buckets)
         
         assert result["headline"] == "Markets Rally on Fed Pause Signal"
         assert "preheader" in result
@@ -44,10 +67,8 @@ class TestDailyBriefComposer:
         assert "watchlist_md" in result
         assert "snapshot_md" in result
     
-    def test_compose_daily_brief_empty_buckets(self, test_settings, mock_openai_composition_response):
+    def test_compose_daily_brief_empty_buckets(self, composer, mock_create, mock_response_factory, composition_json):
         """Test composition with empty buckets."""
-        composer = DailyBriefComposer(test_settings)
-        
         buckets = {
             "top_stories": [],
             "macro_policy": [],
@@ -56,21 +77,17 @@ class TestDailyBriefComposer:
         }
         
         # Mock OpenAI response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps(mock_openai_composition_response)
+        mock_response = mock_response_factory(composition_json)
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response):
-            result = composer.compose_daily_brief(buckets)
+        mock_create.return_value = mock_response
+        result = composer.compose_daily_brief(buckets)
         
         # Should still return valid structure
         assert "headline" in result
         assert "intro" in result
     
-    def test_compose_daily_brief_openai_failure(self, test_settings, sample_fact_cards):
+    def test_compose_daily_brief_openai_failure(self, composer, mock_create, sample_fact_cards):
         """Test fallback response when OpenAI fails."""
-        composer = DailyBriefComposer(test_settings)
-        
         buckets = {
             "top_stories": [sample_fact_cards[0]],
             "macro_policy": [],
@@ -79,34 +96,49 @@ class TestDailyBriefComposer:
         }
         
         # Mock OpenAI to raise exception
-        with patch.object(composer.ai, 'responses_create', side_effect=Exception("API Error")):
-            result = composer.compose_daily_brief(buckets)
+        mock_create.side_effect = Exception("API Error")
+        result = composer.compose_daily_brief(buckets)
         
         # Should return fallback response
         assert result["headline"] == "Morning Markets Update"
         assert "Data processing error" in result["top5_md"] or "currently unavailable" in result["macro_md"]
     
-    def test_compose_daily_brief_invalid_json(self, test_settings, sample_fact_cards):
-        """Test handling of invalid JSON from OpenAI."""
-        composer = DailyBriefComposer(test_settings)
-        
+    def test_compose_daily_brief_invalid_json(self, composer, mock_create, mock_response_factory, sample_fact_cards):
+        """Test handling of unparseable JSON (e.g. a reply cut off at the token cap)."""
         buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
         
         # Mock OpenAI to return invalid JSON
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "This is not JSON"
+        mock_response = mock_response_factory("This is not JSON")
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response):
-            result = composer.compose_daily_brief(buckets)
+        mock_create.return_value = mock_response
+        result = composer.compose_daily_brief(buckets)
         
         # Should return fallback response
         assert "headline" in result
     
-    def test_compose_weekly_recap_success(self, test_settings, sample_fact_cards):
-        """Test successful weekly recap composition."""
-        composer = DailyBriefComposer(test_settings)
+    def test_compose_daily_brief_uses_strict_schema(self, composer, mock_create, mock_response_factory, sample_fact_cards):
+        """Test that composition requests OpenAI structured outputs with the daily schema."""
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        mock_create.return_value = mock_response_factory(DUMMY_DAILY_JSON)
+        composer.compose_daily_brief(buckets)
         
+        kwargs = mock_create.call_args[1]
+        assert kwargs['json_schema'] == {"name": "daily_brief", "schema": DAILY_BRIEF_SCHEMA}
+        assert 'response_format' not in kwargs
+    
+    def test_compose_daily_brief_json_mode_when_strict_disabled(self, composer, mock_create, mock_response_factory, sample_fact_cards):
+        """Test that use_strict_schema=False falls back to plain JSON mode."""
+        composer.use_strict_schema = False
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        mock_create.return_value = mock_response_factory(DUMMY_DAILY_JSON)
+        composer.compose_daily_brief(buckets)
+        
+        kwargs = mock_create.call_args[1]
+        assert kwargs['response_format'] == {"type": "json_object"}
+        assert 'json_schema' not in kwargs
+    
+    def test_compose_weekly_recap_success(self, composer, mock_create, mock_response_factory, sample_fact_cards):
+        """Test successful weekly recap composition."""
         # Mock OpenAI response
         weekly_response = {
             "headline": "Weekly Markets Recap: Fed Pivot Dominates",
@@ -122,12 +154,10 @@ class TestDailyBriefComposer:
             "next_week_outlook": "Focus turns to earnings season"
         }
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps(weekly_response)
+        mock_response = mock_response_factory(weekly_response)
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response):
-            result = composer.compose_weekly_recap(sample_fact_cards)
+        mock_create.return_value = mock_response
+        result = composer.compose_weekly_recap(sample_fact_cards)
         
         assert result["headline"] == "Weekly Markets Recap: Fed Pivot Dominates"
         assert "theme_of_week" in result
@@ -135,10 +165,8 @@ class TestDailyBriefComposer:
         assert len(result["top_developments"]) > 0
         assert "next_week_outlook" in result
     
-    def test_compose_weekly_recap_empty_cards(self, test_settings):
+    def test_compose_weekly_recap_empty_cards(self, composer, mock_create, mock_response_factory):
         """Test weekly recap with no fact cards."""
-        composer = DailyBriefComposer(test_settings)
-        
         weekly_response = {
             "headline": "Weekly Recap",
             "preheader": "Market updates",
@@ -148,70 +176,54 @@ class TestDailyBriefComposer:
             "next_week_outlook": "Watch for updates"
         }
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps(weekly_response)
+        mock_response = mock_response_factory(weekly_response)
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response):
-            result = composer.compose_weekly_recap([])
+        mock_create.return_value = mock_response
+        result = composer.compose_weekly_recap([])
         
         assert "headline" in result
         assert "theme_of_week" in result
     
-    def test_compose_weekly_recap_openai_failure(self, test_settings, sample_fact_cards):
+    def test_compose_weekly_recap_openai_failure(self, composer, mock_create, sample_fact_cards):
         """Test fallback response when weekly recap fails."""
-        composer = DailyBriefComposer(test_settings)
-        
-        with patch.object(composer.ai, 'responses_create', side_effect=Exception("API Error")):
-            result = composer.compose_weekly_recap(sample_fact_cards)
+        mock_create.side_effect = Exception("API Error")
+        result = composer.compose_weekly_recap(sample_fact_cards)
         
         # Should return fallback response
         assert result["headline"] == "Weekly Markets Recap"
         assert "currently unavailable" in result.get("top5_md", "") or "currently unavailable" in result.get("macro_md", "")
     
-    def test_compose_daily_brief_with_purpose_tag(self, test_settings, sample_fact_cards):
+    def test_compose_daily_brief_with_purpose_tag(self, composer, mock_create, mock_response_factory, sample_fact_cards):
         """Test that composition calls include purpose tag for budget tracking."""
-        composer = DailyBriefComposer(test_settings)
-        
         buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps({"headline": "Test", "intro": "Test", "preheader": "Test", "top5_md": "Test", "macro_md": "Test", "watchlist_md": "Test", "snapshot_md": "Test"})
+        mock_response = mock_response_factory(DUMMY_DAILY_JSON)
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response) as mock_create:
-            composer.compose_daily_brief(buckets)
+        mock_create.return_value = mock_response
+        composer.compose_daily_brief(buckets)
         
         # Verify purpose tag was passed for budget tracking
         mock_create.assert_called_once()
         assert mock_create.call_args[1]['purpose'] == 'daily_composition'
     
-    def test_compose_weekly_recap_with_purpose_tag(self, test_settings, sample_fact_cards):
+    def test_compose_weekly_recap_with_purpose_tag(self, composer, mock_create, mock_response_factory, sample_fact_cards):
         """Test that weekly recap includes purpose tag."""
-        composer = DailyBriefComposer(test_settings)
+        mock_response = mock_response_factory({"headline": "Test", "preheader": "Test", "intro": "Test", "theme_of_week": "Test", "top_developments": [], "next_week_outlook": "Test"})
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps({"headline": "Test", "preheader": "Test", "intro": "Test", "theme_of_week": "Test", "top_developments": [], "next_week_outlook": "Test"})
-        
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response) as mock_create:
-            composer.compose_weekly_recap(sample_fact_cards)
+        mock_create.return_value = mock_response
+        composer.compose_weekly_recap(sample_fact_cards)
         
         # Verify purpose tag
         assert mock_create.call_args[1]['purpose'] == 'weekly_composition'
     
-    def test_compose_daily_brief_context_formatting(self, test_settings, sample_fact_cards):
+    def test_compose_daily_brief_context_formatting(self, composer, mock_create, mock_response_factory, sample_fact_cards):
         """Test that fact cards are properly formatted in context."""
-        composer = DailyBriefComposer(test_settings)
-        
         buckets = {"top_stories": sample_fact_cards[:2], "macro_policy": [], "company_markets": [], "watchlist": []}
         
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = json.dumps({"headline": "Test", "intro": "Test", "preheader": "Test", "top5_md": "Test", "macro_md": "Test", "watchlist_md": "Test", "snapshot_md": "Test"})
+        mock_response = mock_response_factory(DUMMY_DAILY_JSON)
         
-        with patch.object(composer.ai, 'responses_create', return_value=mock_response) as mock_create:
-            composer.compose_daily_brief(buckets)
+        mock_create.return_value = mock_response
+        composer.compose_daily_brief(buckets)
         
         # Verify prompt includes fact card details
         call_args = mock_create.call_args
@@ -220,3 +232,115 @@ class TestDailyBriefComposer:
         # Should include entity names
         assert "Federal Reserve" in prompt
         assert "NVIDIA" in prompt
+    
+    def test_compose_both_single_request(self, composer, mock_create, mock_response_factory, sample_fact_cards, mock_openai_composition_response):
+        """Test that daily + weekly composition share one OpenAI request."""
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        weekly_response = {"headline": "Weekly Test", "preheader": "Test", "intro": "Test", "top5_md": ["a", "b"], "macro_md": "Test", "watchlist_md": "Test", "snapshot_md": "Test"}
+        mock_response = mock_response_factory({"daily": mock_openai_composition_response, "weekly": weekly_response})
+        
+        mock_create.return_value = mock_response
+        result = composer.compose_both(buckets, sample_fact_cards)
+        
+        mock_create.assert_called_once()
+        assert mock_create.call_args[1]['purpose'] == 'daily+weekly_composition'
+        assert result["daily"]["headline"] == "Markets Rally on Fed Pause Signal"
+        assert "watchlist_tickers_expected" in result["daily"]
+        assert result["weekly"]["headline"] == "Weekly Test"
+        assert result["weekly"]["top5_md"] == "a\nb"
+    
+    def test_compose_both_missing_document_falls_back(self, composer, mock_create, mock_response_factory, sample_fact_cards, composition_json):
+        """Test that a missing document in the combined response uses its fallback."""
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        mock_response = mock_response_factory('{"daily": ' + composition_json + '}')
+        
+        mock_create.return_value = mock_response
+        result = composer.compose_both(buckets, sample_fact_cards)
+        
+        assert result["daily"]["headline"] == "Markets Rally on Fed Pause Signal"
+        assert result["weekly"]["headline"] == "Weekly Markets Recap"
+    
+    def test_compose_both_non_object_json_falls_back(self, composer, mock_create, mock_response_factory, sample_fact_cards):
+        """Test that a valid JSON reply that isn't an object uses both fallbacks."""
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        mock_create.return_value = mock_response_factory('["not", "an", "object"]')
+        
+        result = composer.compose_both(buckets, sample_fact_cards)
+        
+        assert result["daily"]["headline"] == "Morning Markets Update"
+        assert result["weekly"]["headline"] == "Weekly Markets Recap"
+    
+    def test_system_prompt_prefix_stable(self, composer, mock_create, mock_response_factory, sample_fact_cards):
+        """Test that the system message is identical across runs so it can be prompt-cached."""
+        bucket_sets = [
+            {"top_stories": sample_fact_cards[:1], "macro_policy": [], "company_markets": [], "watchlist": []},
+            {"top_stories": sample_fact_cards[1:], "macro_policy": [], "company_markets": [], "watchlist": []},
+        ]
+        
+        mock_create.return_value = mock_response_factory(DUMMY_DAILY_JSON)
+        for buckets in bucket_sets:
+            composer.compose_daily_brief(buckets)
+        
+        first, second = (c[1]['messages'] for c in mock_create.call_args_list)
+        assert first[0]['content'] == second[0]['content']
+        assert first[1]['content'] != second[1]['content']
+        # Dynamic data stays out of the cached prefix
+        assert sample_fact_cards[0].entity not in first[0]['content']
+    
+    def test_cache_hit_skips_openai(self, test_settings, monkeypatch, mock_response_factory, sample_fact_cards, tmp_path):
+        """Test that a repeated deterministic composition is served from the cache."""
+        composer = DailyBriefComposer(test_settings, cache=LLMCache(str(tmp_path)), temperature=0)
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        
+        monkeypatch.setattr(composer.ai, 'responses_create', mock_create := MagicMock(return_value=mock_response_factory(DUMMY_DAILY_JSON)))
+        first = composer.compose_daily_brief(dict(buckets))
+        mock_create.reset_mock()
+        second = composer.compose_daily_brief(dict(buckets))
+        
+        mock_create.assert_not_called()
+        assert second == first
+        assert composer.cache.stats()["hits"] == 1
+    
+    def test_cache_skipped_when_not_deterministic(self, test_settings, monkeypatch, mock_response_factory, sample_fact_cards, tmp_path):
+        """Test that sampled (temperature > 0) compositions always call OpenAI."""
+        composer = DailyBriefComposer(test_settings, cache=LLMCache(str(tmp_path)))
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        
+        monkeypatch.setattr(composer.ai, 'responses_create', mock_create := MagicMock(return_value=mock_response_factory(DUMMY_DAILY_JSON)))
+        composer.compose_daily_brief(dict(buckets))
+        composer.compose_daily_brief(dict(buckets))
+        
+        assert mock_create.call_count == 2
+    
+    def test_compose_daily_brief_async_overlaps_snapshot_fetch(self, composer, mock_create, mock_response_factory, sample_fact_cards, composition_json):
+        """Test that the market snapshot is fetched while the OpenAI request is in flight."""
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        # Both calls must be running at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def slow_create(**kwargs):
+            barrier.wait()
+            return mock_response_factory(composition_json)
+        
+        def fetch_snapshot():
+            barrier.wait()
+            return "<table>snapshot</table>"
+        
+        mock_create.side_effect = slow_create
+        result = asyncio.run(composer.compose_daily_brief_async(buckets, fetch_snapshot=fetch_snapshot))
+        
+        assert result["headline"] == "Markets Rally on Fed Pause Signal"
+        assert result["snapshot_html"] == "<table>snapshot</table>"
+    
+    def test_compose_daily_brief_async_snapshot_failure(self, composer, mock_create, mock_response_factory, sample_fact_cards, composition_json):
+        """Test that a failed snapshot fetch still returns the composed brief."""
+        buckets = {"top_stories": [sample_fact_cards[0]], "macro_policy": [], "company_markets": [], "watchlist": []}
+        
+        def fetch_snapshot():
+            raise ConnectionError("yfinance down")
+        
+        mock_create.return_value = mock_response_factory(composition_json)
+        result = asyncio.run(composer.compose_daily_brief_async(buckets, fetch_snapshot=fetch_snapshot))
+        
+        assert result["headline"] == "Markets Rally on Fed Pause Signal"
+        assert result["snapshot_html"] == ""
@@ -1,7 +1,14 @@
+import io
 import pytest
 import os
-from unittest.mock import patch, mock_open
-from src.config import Settings, AppConfig
+import yaml
+from contextlib import ExitStack
+from unittest.mock import patch
+from src.config import Settings, AppConfig, _load_settings
+
+def _fake_open(data):
+    """open() stand-in returning a real text stream over data."""
+    return lambda *args, **kwargs: io.StringIO(data)
 
 @pytest.fixture
 def mock_env():
@@ -24,27 +31,39 @@ coverage:
   us: 0.5
 """
 
-def test_load_settings_success(mock_env, mock_yaml):
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=mock_yaml)):
-            with patch("pathlib.Path.exists", return_value=True):
-                settings = Settings.load()
-                assert settings.app.name == "Custom Name"
-                assert settings.openai_api_key.get_secret_value() == "sk-test-openai"
-                assert settings.watchlist_tickers == ["BTC", "ETH"]
-                assert settings.coverage["us"] == 0.5
-
-def test_load_settings_missing_env(mock_env):
+@pytest.fixture
+def load_settings(mock_env):
+    """
+    Call Settings.load() under one patch stack.
+
+    yaml: config.yaml contents (None means the file doesn't exist)
+    env: replaces the whole environment (defaults to mock_env)
+    """
+    def load(yaml=None, env=None):
+        with ExitStack() as stack:
+            stack.enter_context(patch.dict(os.environ, mock_env if env is None else env, clear=True))
+            stack.enter_context(patch("pathlib.Path.exists", return_value=yaml is not None))
+            if yaml is not None:
+                stack.enter_context(patch("builtins.open", _fake_open(yaml)))
+            return Settings.load()
+    return load
+
+def test_load_settings_success(load_settings, mock_yaml):
+    settings = load_settings(yaml=mock_yaml)
+    assert settings.app.name == "Custom Name"
+    assert settings.openai_api_key.get_secret_value() == "sk-test-openai"
+    assert settings.watchlist_tickers == ["BTC", "ETH"]
+    assert settings.coverage["us"] == 0.5
+
+def test_load_settings_missing_env(load_settings, mock_env):
     # Settings.load() doesn't enforce required fields, it allows None values
     # Remove an API key
     del mock_env["OPENAI_API_KEY"]
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("pathlib.Path.exists", return_value=False):
-            settings = Settings.load()
-            # It loads successfully, but the key will be None (masked as SecretStr)
-            assert settings.openai_api_key is not None  # SecretStr wraps None
+    settings = load_settings()
+    # It loads successfully, but the key will be None (masked as SecretStr)
+    assert settings.openai_api_key is not None  # SecretStr wraps None
 
-def test_legacy_email_mapping():
+def test_legacy_email_mapping(load_settings):
     legacy_env = {
         "OPENAI_API_KEY": "sk-test",
         "PERPLEXITY_API_KEY": "pplx-test",
@@ -52,36 +71,28 @@ def test_legacy_email_mapping():
         "SENDGRID_FROM_EMAIL": "legacy_from@example.com",
         "RECIPIENT_EMAIL": "legacy_to@example.com",
     }
-    with patch.dict(os.environ, legacy_env, clear=True):
-        with patch("pathlib.Path.exists", return_value=False):
-            settings = Settings.load()
-            assert settings.email.from_email == "legacy_from@example.com"
-            assert settings.email.to_email == "legacy_to@example.com"
+    settings = load_settings(env=legacy_env)
+    assert settings.email.from_email == "legacy_from@example.com"
+    assert settings.email.to_email == "legacy_to@example.com"
 
-def test_config_yaml_path_override(mock_env):
+def test_config_yaml_path_override(load_settings, mock_env):
     mock_env["CONFIG_YAML_PATH"] = "custom_config.yaml"
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("builtins.open", mock_open(read_data="app: {name: 'Overridden'}")) as mock_file:
-                settings = Settings.load()
-                assert settings.app.name == "Overridden"
+    settings = load_settings(yaml="app: {name: 'Overridden'}")
+    assert settings.app.name == "Overridden"
 
 
 # Additional edge case tests
 @pytest.mark.unit
-def test_invalid_email_format(mock_env, mock_yaml):
+def test_invalid_email_format(load_settings, mock_env, mock_yaml):
     """Test that Settings.load accepts any string for email (no validation at load time)."""
     mock_env["EMAIL_FROM"] = "not-an-email"
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=mock_yaml)):
-            with patch("pathlib.Path.exists", return_value=True):
-                # Pydantic BaseSettings doesn't validate email format, it just accepts strings
-                settings = Settings.load()
-                assert settings.email.from_email == "not-an-email"
+    # Pydantic BaseSettings doesn't validate email format, it just accepts strings
+    settings = load_settings(yaml=mock_yaml)
+    assert settings.email.from_email == "not-an-email"
 
 
 @pytest.mark.unit
-def test_empty_watchlist_tickers(mock_env):
+def test_empty_watchlist_tickers(load_settings):
     """Test configuration with empty watchlist."""
     yaml_content = """
 app:
@@ -89,78 +100,86 @@ app:
 watchlist:
   tickers: []
 """
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=yaml_content)):
-            with patch("pathlib.Path.exists", return_value=True):
-                settings = Settings.load()
-                assert settings.watchlist_tickers == []
+    settings = load_settings(yaml=yaml_content)
+    assert settings.watchlist_tickers == []
 
 
 @pytest.mark.unit
-def test_malformed_yaml(mock_env):
+def test_malformed_yaml(load_settings):
     """Test handling of malformed YAML."""
     malformed_yaml = "app:\n  name: Test\n  - invalid: yaml"
     
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=malformed_yaml)):
-            with patch("pathlib.Path.exists", return_value=True):
-                with pytest.raises(Exception):  # YAML parsing error
-                    Settings.load()
+    with pytest.raises(yaml.YAMLError):
+        load_settings(yaml=malformed_yaml)
 
 
 @pytest.mark.unit
-def test_missing_config_file_uses_defaults(mock_env):
+def test_missing_config_file_uses_defaults(load_settings):
     """Test that missing config.yaml falls back to defaults."""
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("pathlib.Path.exists", return_value=False):
-            settings = Settings.load()
-            # Should use default values
-            assert settings.app.name == "Markets News Brief"
-            assert settings.app.log_level == "INFO"
+    settings = load_settings()
+    # Should use default values
+    assert settings.app.name == "Markets News Brief"
+    assert settings.app.log_level == "INFO"
 
 
 @pytest.mark.unit
-def test_partial_yaml_config(mock_env):
+def test_partial_yaml_config(load_settings):
     """Test YAML with only some sections defined."""
     partial_yaml = """
 app:
   name: "Partial Config"
 """
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=partial_yaml)):
-            with patch("pathlib.Path.exists", return_value=True):
-                settings = Settings.load()
-                assert settings.app.name == "Partial Config"
-                assert settings.app.brand_name == "Smart Invest"  # Default
-                # No default tickers - empty list if not in YAML
-                assert settings.watchlist_tickers == []
+    settings = load_settings(yaml=partial_yaml)
+    assert settings.app.name == "Partial Config"
+    assert settings.app.brand_name == "Smart Invest"  # Default
+    # No default tickers - empty list if not in YAML
+    assert settings.watchlist_tickers == []
 
 
 @pytest.mark.unit
-def test_unicode_in_config(mock_env):
+def test_unicode_in_config(load_settings):
     """Test handling of unicode characters in config."""
     unicode_yaml = """
 app:
   name: "Markets Briefing 📈"
   brand_name: "Smart Invest™"
 """
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=unicode_yaml)):
-            with patch("pathlib.Path.exists", return_value=True):
-                settings = Settings.load()
-                assert "📈" in settings.app.name
-                assert "™" in settings.app.brand_name
+    settings = load_settings(yaml=unicode_yaml)
+    assert "📈" in settings.app.name
+    assert "™" in settings.app.brand_name
 
 
 @pytest.mark.unit
-def test_secret_str_masking(mock_env, mock_yaml):
+def test_secret_str_masking(load_settings, mock_yaml):
     """Test that SecretStr properly masks sensitive data."""
-    with patch.dict(os.environ, mock_env, clear=True):
-        with patch("builtins.open", mock_open(read_data=mock_yaml)):
-            with patch("pathlib.Path.exists", return_value=True):
-                settings = Settings.load()
-                # Verify secret is masked in repr
-                assert "sk-test-openai" not in repr(settings.openai_api_key)
-                # But accessible via get_secret_value()
-                assert settings.openai_api_key.get_secret_value() == "sk-test-openai"
+    settings = load_settings(yaml=mock_yaml)
+    # Verify secret is masked in repr
+    assert "sk-test-openai" not in repr(settings.openai_api_key)
+    # But accessible via get_secret_value()
+    assert settings.openai_api_key.get_secret_value() == "sk-test-openai"
+
 
+@pytest.mark.unit
+def test_load_is_memoized(load_settings, mock_env, mock_yaml):
+    """Test that Settings.load reuses the parse until env or YAML change."""
+    _load_settings.cache_clear()
+    with patch.object(Settings, "_from_yaml", wraps=Settings._from_yaml) as mock_parse:
+        first = load_settings(yaml=mock_yaml)
+        assert load_settings(yaml=mock_yaml) == first
+        assert mock_parse.call_count == 1
+    
+    assert load_settings(yaml="app: {name: 'Other'}").app.name == "Other"
+    mock_env["EMAIL_TO"] = "someone-else@example.com"
+    assert load_settings(yaml=mock_yaml).email.to_email == "someone-else@example.com"
+
+
+@pytest.mark.unit
+def test_load_returns_independent_copies(load_settings, mock_yaml):
+    """Test that mutating one loaded Settings doesn't leak into later loads."""
+    first = load_settings(yaml=mock_yaml)
+    first.watchlist_tickers.append("ZZZZ")
+    first.app.name = "Mutated"
+    
+    second = load_settings(yaml=mock_yaml)
+    assert second.watchlist_tickers == ["BTC", "ETH"]
+    assert second.app.name == "Custom Name"
@@ -7,6 +7,7 @@ Tests:
 - Both modes render valid HTML structure
 """
 
+import functools
 import os
 import pytest
 from pathlib import Path
@@ -27,34 +28,57 @@ def setup_test_environment():
     os.environ.setdefault("EMAIL_TO", "test@example.com")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def settings():
     """Create settings instance for testing."""
     return Settings.load()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mailer(settings):
-    """Create NewsMailer instance for testing."""
+    """Create one NewsMailer (and Jinja environment) for the session."""
     return NewsMailer(settings)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def render(mailer):
+    """
+    Render email_template.html for (context, render_mode), once per unique pair.
+    
+    Several tests assert different things about the same render; the
+    output is memoized on the context's items so each render happens once
+    per session.
+    """
+    @functools.lru_cache(maxsize=None)
+    def _render(context_items, render_mode):
+        return mailer.render_content("email_template.html", dict(context_items), render_mode=render_mode)
+    
+    def render(context, render_mode="email"):
+        return _render(frozenset(context.items()), render_mode)
+    return render
+
+
+@pytest.fixture(scope="session")
 def formatter():
     """Create EmailFormatter instance for testing."""
     return EmailFormatter()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_context(formatter):
-    """Create sample email context with HTML content."""
+    """Create sample email context with HTML content (read-only; built once)."""
+    top5_html, macro_html, watchlist_html = formatter.md_to_html_many([
+        "### Test Story\n\nSample content with **bold** text.",
+        "### Macro Analysis\n\nCentral banks maintain policy stance.",
+        "### Watchlist\n\n**AAPL**: Positive outlook",
+    ])
     return {
         "headline_title": "Test Market Brief",
         "intro_paragraph": "Sample introduction paragraph for testing.",
-        "top5_html": formatter.md_to_html("### Test Story\n\nSample content with **bold** text."),
-        "macro_html": formatter.md_to_html("### Macro Analysis\n\nCentral banks maintain policy stance."),
+        "top5_html": top5_html,
+        "macro_html": macro_html,
         "snapshot_html": '<table style="width:100%;"><tr><td><strong>Index</strong></td><td>Value</td></tr></table>',
-        "watchlist_html": formatter.md_to_html("### Watchlist\n\n**AAPL**: Positive outlook"),
+        "watchlist_html": watchlist_html,
         "sentiment_html": '<div style="background-color:#ecfdf5;padding:16px;"><span>🟢 Risk-On</span></div>',
         "preheader": "Test preheader text",
         "date_label": datetime.now().strftime("%A, %b %d, %Y"),
@@ -64,14 +88,14 @@ def sample_context(formatter):
     }
 
 
-def test_html_not_escaped(mailer, sample_context):
+def test_html_not_escaped(render, sample_context):
     """
     Test that HTML content in dynamic sections is not escaped.
     
     Ensures that markdown-generated HTML and raw HTML strings
     are rendered correctly without &lt; &gt; escaping.
     """
-    html = mailer.render_content("email_template.html", sample_context, render_mode="email")
+    html = render(sample_context, render_mode="email")
     
     # Check for common escaped HTML patterns
     assert "&lt;p" not in html, "Found escaped <p> tag"
@@ -86,14 +110,14 @@ def test_html_not_escaped(mailer, sample_context):
     assert "<strong>" in html, "Expected strong tag not found"
 
 
-def test_pdf_mode_no_color_scheme(mailer, sample_context):
+def test_pdf_mode_no_color_scheme(render, sample_context):
     """
     Test that PDF mode does not include color-scheme meta tags.
     
     Ensures that dark mode meta tags are excluded to prevent
     white-on-white text in PDF rendering.
     """
-    pdf_html = mailer.render_content("email_template.html", sample_context, render_mode="pdf")
+    pdf_html = render(sample_context, render_mode="pdf")
     
     # Check that color-scheme meta tags are NOT present
     assert 'name="color-scheme"' not in pdf_html, "PDF mode should not have color-scheme meta tag"
@@ -103,27 +127,27 @@ def test_pdf_mode_no_color_scheme(mailer, sample_context):
     assert 'color: #111827 !important' in pdf_html, "PDF mode should have explicit body text color"
 
 
-def test_email_mode_has_color_scheme(mailer, sample_context):
+def test_email_mode_has_color_scheme(render, sample_context):
     """
     Test that email mode includes color-scheme meta tags.
     
     Ensures that email clients receive proper dark mode support.
     """
-    email_html = mailer.render_content("email_template.html", sample_context, render_mode="email")
+    email_html = render(sample_context, render_mode="email")
     
     # Check that color-scheme meta tags ARE present in email mode
     assert 'name="color-scheme"' in email_html, "Email mode should have color-scheme meta tag"
     assert 'name="supported-color-schemes"' in email_html, "Email mode should have supported-color-schemes meta tag"
 
 
-def test_both_modes_have_valid_structure(mailer, sample_context):
+def test_both_modes_have_valid_structure(render, sample_context):
     """
     Test that both email and PDF modes produce valid HTML structure.
     
     Ensures basic HTML structure is present in both rendering modes.
     """
     for mode in ["email", "pdf"]:
-        html = mailer.render_content("email_template.html", sample_context, render_mode=mode)
+        html = render(sample_context, render_mode=mode)
         
         # Check basic HTML structure
         assert "<!doctype html>" in html.lower(), f"{mode} mode: Missing doctype"
@@ -154,13 +178,70 @@ def test_markdown_to_html_conversion(formatter):
     assert "style=" in html, "No inline styles found (required for email clients)"
 
 
-def test_sentiment_html_injection(mailer, sample_context):
+def test_bullets_become_div_bullets(formatter):
+    """
+    Test that list items are rewritten to Outlook-friendly div bullets.
+    """
+    markdown = "**AAPL:**\n\n- Beats estimates [Reuters](https://reuters.com)\n- Raises guidance"
+    html = formatter.md_to_html(markdown)
+    
+    assert html.count("•</span>") == 2, "Bullets not converted to div bullets"
+    assert "<li" not in html and "<ul" not in html, "List tags should be replaced"
+    assert '<a href="https://reuters.com"' in html, "Link not converted"
+    assert "<strong style=" in html, "Bold not styled"
+
+
+def test_tables_rendered_with_styles(formatter):
+    """
+    Test that Markdown tables are rendered with inline-styled cells.
+    """
+    markdown = "| Asset | Status |\n|---|---|\n| Market Data | Unavailable |"
+    html = formatter.md_to_html(markdown)
+
+    assert "<table style=" in html, "Table not rendered/styled"
+    assert "<td style=" in html, "Table cells not styled"
+
+
+def test_md_to_html_many_matches_md_to_html():
+    """
+    Test that batched conversion matches per-document conversion, including
+    inputs that need markdown2 (tables, ordered lists).
+    """
+    batch_formatter = EmailFormatter()
+    docs = [
+        "| Asset | Status |\n|---|---|\n| Market Data | Unavailable |",
+        "",
+        "**AAPL:**\n\n- Beats estimates [Reuters](https://reuters.com)",
+        "1. First\n2. Second with **bold**",
+        "| A | B |\n|---|---|\n| 1 | 2 |",
+    ]
+    expected = [EmailFormatter().md_to_html(doc) for doc in docs]
+    
+    assert batch_formatter.md_to_html_many(docs) == expected
+
+
+def test_md_to_html_many_keeps_sections_separate():
+    """
+    Test that a reference-style link definition in one section does not
+    resolve a link in another, and that repeat renders hit the cache.
+    """
+    batch_formatter = EmailFormatter()
+    docs = ["See [the report][1] for details.", "[1]: https://example.com/report"]
+    
+    first = batch_formatter.md_to_html_many(docs)
+    assert "https://example.com/report" not in first[0]
+    
+    assert batch_formatter.md_to_html_many(docs) == first
+    assert batch_formatter.md_cache_info().hits == len(docs)
+
+
+def test_sentiment_html_injection(render, sample_context):
     """
     Test that raw HTML in sentiment_html is properly rendered without escaping.
     
     Ensures that the sentiment gauge HTML is injected correctly.
     """
-    html = mailer.render_content("email_template.html", sample_context, render_mode="email")
+    html = render(sample_context, render_mode="email")
     
     # Verify sentiment HTML is present and not escaped
     assert "🟢 Risk-On" in html, "Sentiment text not found"
@@ -168,7 +249,7 @@ def test_sentiment_html_injection(mailer, sample_context):
     assert '<div style="background-color:#ecfdf5' in html, "Sentiment HTML not properly injected"
 
 
-def test_empty_optional_sections(mailer):
+def test_empty_optional_sections(render):
     """
     Test that optional sections (like sentiment) can be omitted without errors.
     """
@@ -187,7 +268,7 @@ def test_empty_optional_sections(mailer):
         "preferences_url": "#"
     }
     
-    html = mailer.render_content("email_template.html", minimal_context, render_mode="email")
+    html = render(minimal_context, render_mode="email")
     
     # Should render without errors
     assert "Test" in html
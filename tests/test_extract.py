@@ -70,13 +70,12 @@ def test_fact_card_validation():
         )
 
 @patch("src.extract.OpenAIClient")
-def test_extract_fact_cards_success(mock_ai_class, mock_settings, sample_cluster):
+def test_extract_fact_cards_success(mock_ai_class, mock_settings, sample_cluster, mock_response_factory):
     # Mock AI response
-    mock_ai_instance = MagicMock()
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock(message=MagicMock(content='{"fact_cards": [{"story_id": "fed_cluster_123", "entity": "Federal Reserve", "trend": "Raised rates", "data_point": "0.25%", "why_it_matters": "Higher borrowing costs", "confidence": 0.9, "tickers": ["SPY"], "sources": ["Reuters"], "urls": ["https://reuters.com/fed-rates"]}]}'))]
-    mock_ai_instance.responses_create.return_value = mock_response
-    mock_ai_class.return_value = mock_ai_instance
+    mock_ai_instance = mock_ai_class.return_value
+    mock_ai_instance.responses_create.return_value = mock_response_factory(
+        '{"fact_cards": [{"story_id": "fed_cluster_123", "entity": "Federal Reserve", "trend": "Raised rates", "data_point": "0.25%", "why_it_matters": "Higher borrowing costs", "confidence": 0.9, "tickers": ["SPY"], "sources": ["Reuters"], "urls": ["https://reuters.com/fed-rates"]}]}'
+    )
     
     extractor = FactCardExtractor(mock_settings)
     clusters = [sample_cluster]
@@ -95,16 +94,13 @@ def test_extract_fact_cards_empty_clusters(mock_ai_class, mock_settings):
     assert result == []
 
 @patch("src.extract.OpenAIClient")
-def test_extract_fact_cards_max_clusters_limit(mock_ai_class, mock_settings, sample_cluster):
+def test_extract_fact_cards_max_clusters_limit(mock_ai_class, mock_settings, sample_cluster, mock_response_factory):
     # Set max_clusters to 1
     mock_settings.daily.max_clusters = 1
     
     # Mock AI response
-    mock_ai_instance = MagicMock()
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock(message=MagicMock(content='{"fact_cards": []}'))]
-    mock_ai_instance.responses_create.return_value = mock_response
-    mock_ai_class.return_value = mock_ai_instance
+    mock_ai_instance = mock_ai_class.return_value
+    mock_ai_instance.responses_create.return_value = mock_response_factory({"fact_cards": []})
     
     extractor = FactCardExtractor(mock_settings)
     
@@ -8,13 +8,66 @@ phases execute correctly and handle failures gracefully.
 
 import pytest
 import json
-from unittest.mock import patch, MagicMock
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
 from pathlib import Path
 
-# Import workflow function
+# Import workflow functions
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from run_daily import run_daily_workflow
+from run_weekly import run_weekly_workflow
+from src.storage import NewsStorage
+
+
+def _openai_response(content: str, prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    """OpenAI chat completion stub with message content and token usage."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+    )
+
+
+@pytest.fixture
+def patched_externals(test_settings, temp_run_dir, mock_sendgrid_client):
+    """
+    Patch every external dependency of the workflows in one place.
+    
+    Yields the mocked Perplexity and OpenAI client instances and the
+    SendGrid client; tests configure their return values/side effects.
+    The client classes are autospecced, so misspelled methods or wrong
+    call signatures fail the test. Patches are undone when the test finishes.
+    """
+    with ExitStack() as stack:
+        MockPerplexity = stack.enter_context(patch('src.retrieval.PerplexityClient', autospec=True))
+        MockOpenAI = stack.enter_context(patch('src.openai_client.OpenAIClient', autospec=True))
+        stack.enter_context(patch('src.mailer.SendGridAPIClient', return_value=mock_sendgrid_client))
+        # The workflows build their own NewsMailer, which picks up time.sleep
+        stack.enter_context(patch('src.mailer.time.sleep'))
+        stack.enter_context(patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)))
+        stack.enter_context(patch('src.config.Settings.load', return_value=test_settings))
+        yield SimpleNamespace(
+            pplx=MockPerplexity.return_value,
+            openai=MockOpenAI.return_value,
+            sendgrid=mock_sendgrid_client
+        )
+
+
+@pytest.fixture
+def short_retry_settings(test_settings, monkeypatch):
+    """
+    test_settings with a single SendGrid retry, for tests that only need
+    the send to fail (the full retry count is covered in test_mailer).
+    """
+    monkeypatch.setattr(test_settings.email, "max_retries", 1)
+    return test_settings
+
 
 @pytest.mark.integration
 class TestDailyWorkflowIntegration:
@@ -22,261 +75,171 @@ class TestDailyWorkflowIntegration:
     
     def test_daily_workflow_e2e_success(
         self,
-        test_settings,
+        patched_externals,
         temp_db,
-        temp_run_dir,
         mock_perplexity_response,
-        mock_openai_extraction_response,
-        mock_openai_composition_response,
-        mock_sendgrid_client
+        openai_extraction_json,
+        openai_composition_json
     ):
         """
         Test successful end-to-end daily workflow execution.
         All phases should complete successfully.
         """
-        from run_daily import run_daily_workflow
-        
-        # Mock all external dependencies
-        with patch('src.retrieval.PerplexityClient') as MockPerplexity, \
-             patch('src.openai_client.OpenAIClient') as MockOpenAI, \
-             patch('src.mailer.SendGridAPIClient', return_value=mock_sendgrid_client), \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Configure Perplexity mock
-            mock_pplx_instance = MockPerplexity.return_value
-            mock_pplx_instance.chat.return_value = mock_perplexity_response
-            
-            # Configure OpenAI mock
-            mock_openai_instance = MockOpenAI.return_value
-            
-            # Mock extraction response
-            extraction_response = MagicMock()
-            extraction_response.choices = [MagicMock()]
-            extraction_response.choices[0].message.content = json.dumps(mock_openai_extraction_response)
-            extraction_response.usage = MagicMock(prompt_tokens=100, completion_tokens=200, total_tokens=300)
-            
-            # Mock composition response
-            composition_response = MagicMock()
-            composition_response.choices = [MagicMock()]
-            composition_response.choices[0].message.content = json.dumps(mock_openai_composition_response)
-            composition_response.usage = MagicMock(prompt_tokens=150, completion_tokens=250, total_tokens=400)
-            
-            mock_openai_instance.responses_create.side_effect = [extraction_response, composition_response]
-            
-            # Execute workflow in dry-run mode (no actual email send)
-            success = run_daily_workflow(dry_run=True)
+        # Configure Perplexity mock
+        patched_externals.pplx.chat.return_value = mock_perplexity_response
+        
+        # Mock extraction and composition responses
+        extraction_response = _openai_response(openai_extraction_json, 100, 200)
+        composition_response = _openai_response(openai_composition_json, 150, 250)
+        
+        patched_externals.openai.responses_create.side_effect = [extraction_response, composition_response]
+        
+        # Execute workflow in dry-run mode (no actual email send)
+        success = run_daily_workflow(dry_run=True)
         
         # Verify workflow completed successfully
         assert success is True
         
         # Verify Perplexity was called for all 6 queries
-        assert mock_pplx_instance.chat.call_count == 6
+        assert patched_externals.pplx.chat.call_count == 6
         
         # Verify OpenAI was called for extraction and composition
-        assert mock_openai_instance.responses_create.call_count == 2
+        assert patched_externals.openai.responses_create.call_count == 2
         
         # Verify email was not sent (dry-run mode)
-        mock_sendgrid_client.send.assert_not_called()
+        assert not patched_externals.sendgrid.sent
     
     def test_daily_workflow_circuit_breaker(
         self,
-        test_settings,
-        temp_db,
-        temp_run_dir
+        patched_externals,
+        temp_db
     ):
         """
         Test circuit breaker stops workflow after 2 consecutive failures.
         """
-        from run_daily import run_daily_workflow
-        
-        with patch('src.retrieval.PerplexityClient') as MockPerplexity, \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Configure first 2 queries to fail
-            mock_pplx_instance = MockPerplexity.return_value
-            mock_pplx_instance.chat.side_effect = [
-                Exception("API Error 1"),
-                Exception("API Error 2")
-            ]
-            
-            # Execute workflow
-            success = run_daily_workflow(dry_run=True)
+        # Configure first 2 queries to fail
+        patched_externals.pplx.chat.side_effect = [
+            Exception("API Error 1"),
+            Exception("API Error 2")
+        ]
+        
+        # Execute workflow
+        success = run_daily_workflow(dry_run=True)
         
         # Workflow should abort due to circuit breaker
         assert success is False
         
         # Should only attempt 2 queries (circuit breaker triggers)
-        assert mock_pplx_instance.chat.call_count == 2
+        assert patched_externals.pplx.chat.call_count == 2
     
     def test_daily_workflow_insufficient_queries(
         self,
-        test_settings,
+        patched_externals,
         temp_db,
-        temp_run_dir,
         mock_perplexity_response
     ):
         """
         Test workflow aborts when only 2/6 queries succeed (below threshold).
         """
-        from run_daily import run_daily_workflow
-        
-        with patch('src.retrieval.PerplexityClient') as MockPerplexity, \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Configure 2 successes, 4 failures (non-consecutive to avoid circuit breaker)
-            call_count = [0]
-            def mock_chat_side_effect(*args, **kwargs):
-                call_count[0] += 1
-                if call_count[0] in [1, 3]:  # Queries 1 and 3 succeed
-                    return mock_perplexity_response
-                raise Exception("API Error")
-            
-            mock_pplx_instance = MockPerplexity.return_value
-            mock_pplx_instance.chat.side_effect = mock_chat_side_effect
-            
-            # Execute workflow
-            success = run_daily_workflow(dry_run=True)
+        # Configure 2 successes, 4 failures (non-consecutive to avoid circuit breaker)
+        api_error = Exception("API Error")
+        patched_externals.pplx.chat.side_effect = [
+            mock_perplexity_response, api_error,
+            mock_perplexity_response, api_error,
+            api_error, api_error
+        ]
+        
+        # Execute workflow
+        success = run_daily_workflow(dry_run=True)
         
         # Workflow should abort (insufficient queries)
         assert success is False
     
     def test_daily_workflow_extraction_failure(
         self,
-        test_settings,
+        patched_externals,
         temp_db,
-        temp_run_dir,
         mock_perplexity_response
     ):
         """
         Test workflow handles extraction failure gracefully.
         """
-        from run_daily import run_daily_workflow
-        
-        with patch('src.retrieval.PerplexityClient') as MockPerplexity, \
-             patch('src.openai_client.OpenAIClient') as MockOpenAI, \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Retrieval succeeds
-            mock_pplx_instance = MockPerplexity.return_value
-            mock_pplx_instance.chat.return_value = mock_perplexity_response
-            
-            # Extraction fails
-            mock_openai_instance = MockOpenAI.return_value
-            mock_openai_instance.responses_create.side_effect = Exception("OpenAI API Error")
-            
-            # Execute workflow
-            success = run_daily_workflow(dry_run=True)
+        # Retrieval succeeds
+        patched_externals.pplx.chat.return_value = mock_perplexity_response
+        
+        # Extraction fails
+        patched_externals.openai.responses_create.side_effect = Exception("OpenAI API Error")
+        
+        # Execute workflow
+        success = run_daily_workflow(dry_run=True)
         
         # Workflow should abort after extraction failure
         assert success is False
     
     def test_daily_workflow_email_failure(
         self,
-        test_settings,
+        short_retry_settings,
+        patched_externals,
         temp_db,
-        temp_run_dir,
         mock_perplexity_response,
-        mock_openai_extraction_response,
-        mock_openai_composition_response
+        openai_extraction_json,
+        openai_composition_json
     ):
         """
         Test workflow handles email send failure in production mode.
         """
-        from run_daily import run_daily_workflow
-        
-        with patch('src.retrieval.PerplexityClient') as MockPerplexity, \
-             patch('src.openai_client.OpenAIClient') as MockOpenAI, \
-             patch('src.mailer.SendGridAPIClient') as MockSendGrid, \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Retrieval succeeds
-            mock_pplx_instance = MockPerplexity.return_value
-            mock_pplx_instance.chat.return_value = mock_perplexity_response
-            
-            # Extraction and composition succeed
-            mock_openai_instance = MockOpenAI.return_value
-            extraction_response = MagicMock()
-            extraction_response.choices = [MagicMock()]
-            extraction_response.choices[0].message.content = json.dumps(mock_openai_extraction_response)
-            extraction_response.usage = MagicMock(prompt_tokens=100, completion_tokens=200, total_tokens=300)
-            
-            composition_response = MagicMock()
-            composition_response.choices = [MagicMock()]
-            composition_response.choices[0].message.content = json.dumps(mock_openai_composition_response)
-            composition_response.usage = MagicMock(prompt_tokens=150, completion_tokens=250, total_tokens=400)
-            
-            mock_openai_instance.responses_create.side_effect = [extraction_response, composition_response]
-            
-            # Email fails (all retries exhausted)
-            mock_sg_instance = MockSendGrid.return_value
-            mock_response = MagicMock()
-            mock_response.status_code = 503
-            mock_sg_instance.send.return_value = mock_response
-            
-            # Execute workflow in production mode
-            success = run_daily_workflow(dry_run=False)
+        # Retrieval succeeds
+        patched_externals.pplx.chat.return_value = mock_perplexity_response
+        
+        # Extraction and composition succeed
+        extraction_response = _openai_response(openai_extraction_json, 100, 200)
+        composition_response = _openai_response(openai_composition_json, 150, 250)
+        
+        patched_externals.openai.responses_create.side_effect = [extraction_response, composition_response]
+        
+        # Email fails (all retries exhausted)
+        patched_externals.sendgrid.response = SimpleNamespace(status_code=503, body="")
+        
+        # Execute workflow in production mode
+        success = run_daily_workflow(dry_run=False)
         
         # Workflow should fail due to email error
         assert success is False
         
-        # Email should have been attempted with retries (4 total: 1 initial + 3 retries)
-        assert mock_sg_instance.send.call_count == 4
+        # Email should have been attempted with retries (1 initial + 1 retry)
+        assert len(patched_externals.sendgrid.sent) == 2
     
     def test_daily_workflow_dry_run_mode(
         self,
-        test_settings,
+        patched_externals,
         temp_db,
-        temp_run_dir,
         mock_perplexity_response,
-        mock_openai_extraction_response,
-        mock_openai_composition_response,
-        mock_sendgrid_client
+        openai_extraction_json,
+        openai_composition_json
     ):
         """
         Test dry-run mode generates artifacts but doesn't send email.
         """
-        from run_daily import run_daily_workflow
-        
-        with patch('src.retrieval.PerplexityClient') as MockPerplexity, \
-             patch('src.openai_client.OpenAIClient') as MockOpenAI, \
-             patch('src.mailer.SendGridAPIClient', return_value=mock_sendgrid_client), \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Configure mocks for success
-            mock_pplx_instance = MockPerplexity.return_value
-            mock_pplx_instance.chat.return_value = mock_perplexity_response
-            
-            mock_openai_instance = MockOpenAI.return_value
-            extraction_response = MagicMock()
-            extraction_response.choices = [MagicMock()]
-            extraction_response.choices[0].message.content = json.dumps(mock_openai_extraction_response)
-            extraction_response.usage = MagicMock(prompt_tokens=100, completion_tokens=200, total_tokens=300)
-            
-            composition_response = MagicMock()
-            composition_response.choices = [MagicMock()]
-            composition_response.choices[0].message.content = json.dumps(mock_openai_composition_response)
-            composition_response.usage = MagicMock(prompt_tokens=150, completion_tokens=250, total_tokens=400)
-            
-            mock_openai_instance.responses_create.side_effect = [extraction_response, composition_response]
-            
-            # Execute in dry-run mode
-            success = run_daily_workflow(dry_run=True)
+        # Configure mocks for success
+        patched_externals.pplx.chat.return_value = mock_perplexity_response
+        
+        extraction_response = _openai_response(openai_extraction_json, 100, 200)
+        composition_response = _openai_response(openai_composition_json, 150, 250)
+        
+        patched_externals.openai.responses_create.side_effect = [extraction_response, composition_response]
+        
+        # Execute in dry-run mode
+        success = run_daily_workflow(dry_run=True)
         
         # Workflow should succeed
         assert success is True
         
         # Email should NOT be sent
-        mock_sendgrid_client.send.assert_not_called()
+        assert not patched_externals.sendgrid.sent
         
         # Verify other phases executed
-        assert mock_pplx_instance.chat.call_count == 6
-        assert mock_openai_instance.responses_create.call_count == 2
+        assert patched_externals.pplx.chat.call_count == 6
+        assert patched_externals.openai.responses_create.call_count == 2
 
 
 @pytest.mark.integration
@@ -286,22 +249,16 @@ class TestWeeklyWorkflowIntegration:
     
     def test_weekly_workflow_metadata_save_order(
         self,
-        test_settings,
-        temp_db,
-        temp_run_dir,
-        mock_openai_composition_response,
-        mock_sendgrid_client
+        short_retry_settings,
+        patched_externals,
+        temp_db
     ):
         """
         Test that metadata is saved BEFORE email send attempt.
         This ensures metadata isn't lost if email fails.
         """
-        from run_weekly import run_weekly_workflow
-        
         # Create some test fact cards in database
-        from src.storage import NewsStorage
         db = NewsStorage(temp_db)
-        db.init_db()
         
         # Insert sample fact cards
         db.insert_fact_cards([
@@ -319,37 +276,26 @@ class TestWeeklyWorkflowIntegration:
             }
         ])
         
-        with patch('src.openai_client.OpenAIClient') as MockOpenAI, \
-             patch('src.mailer.SendGridAPIClient', return_value=mock_sendgrid_client), \
-             patch('src.logging_utils.setup_logging', return_value=("test_run", temp_run_dir)), \
-             patch('src.config.Settings.load', return_value=test_settings):
-            
-            # Mock OpenAI composition
-            mock_openai_instance = MockOpenAI.return_value
-            composition_response = MagicMock()
-            composition_response.choices = [MagicMock()]
-            
-            # Create weekly-specific response
-            weekly_response = {
-                "headline": "Weekly Recap",
-                "preheader": "Test",
-                "intro": "Test intro",
-                "theme_of_week": "Test theme",
-                "top_developments": [{"headline": "Dev 1", "explanation": "Explanation"}],
-                "next_week_outlook": "Outlook"
-            }
-            
-            composition_response.choices[0].message.content = json.dumps(weekly_response)
-            composition_response.usage = MagicMock(prompt_tokens=150, completion_tokens=250, total_tokens=400)
-            mock_openai_instance.responses_create.return_value = composition_response
-            
-            # Configure email to fail
-            mock_sendgrid_client.send.return_value = MagicMock(status_code=503)
-            
-            # Execute workflow (should fail on email but metadata should be saved)
-            # Note: We expect this to exit with sys.exit(1), so we catch that
-            with pytest.raises(SystemExit):
-                run_weekly_workflow(dry_run=False)
+        # Mock OpenAI composition with a weekly-specific response
+        weekly_response = {
+            "headline": "Weekly Recap",
+            "preheader": "Test",
+            "intro": "Test intro",
+            "theme_of_week": "Test theme",
+            "top_developments": [{"headline": "Dev 1", "explanation": "Explanation"}],
+            "next_week_outlook": "Outlook"
+        }
+        
+        composition_response = _openai_response(json.dumps(weekly_response), 150, 250)
+        patched_externals.openai.responses_create.return_value = composition_response
+        
+        # Configure email to fail
+        patched_externals.sendgrid.response = SimpleNamespace(status_code=503, body="")
+        
+        # Execute workflow (should fail on email but metadata should be saved)
+        # Note: We expect this to exit with sys.exit(1), so we catch that
+        with pytest.raises(SystemExit):
+            run_weekly_workflow(dry_run=False)
         
         # Verify metadata was saved before email failure
         # (This validates the order fix from Issue 19)
@@ -0,0 +1,47 @@
+"""
+Unit tests for the LLM response cache.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.llm_cache import LLMCache
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / "llm_cache"), ttl_seconds=60)
+
+
+@pytest.mark.unit
+class TestLLMCache:
+    """Test suite for LLMCache."""
+
+    def test_cache_key_is_stable_and_request_sensitive(self):
+        key = LLMCache.cache_key("gpt-4o", MESSAGES, 0, max_output_tokens=100)
+        assert key == LLMCache.cache_key("gpt-4o", list(MESSAGES), 0, max_output_tokens=100)
+        assert key != LLMCache.cache_key("gpt-4o-mini", MESSAGES, 0, max_output_tokens=100)
+        assert key != LLMCache.cache_key("gpt-4o", MESSAGES, 0, max_output_tokens=200)
+
+    def test_set_then_get(self, cache):
+        key = LLMCache.cache_key("gpt-4o", MESSAGES, 0)
+        assert cache.get(key) is None
+        cache.set(key, '{"headline": "Test"}')
+        assert cache.get(key) == '{"headline": "Test"}'
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_expired_entry_is_a_miss(self, cache):
+        key = LLMCache.cache_key("gpt-4o", MESSAGES, 0)
+        with patch("src.llm_cache.time.time", return_value=1000.0):
+            cache.set(key, "stale")
+        with patch("src.llm_cache.time.time", return_value=1000.0 + 61):
+            assert cache.get(key) is None
+        assert not list(cache.cache_dir.glob("*.json"))
+
+    def test_clear(self, cache):
+        cache.set(LLMCache.cache_key("gpt-4o", MESSAGES, 0), "x")
+        cache.clear()
+        assert not list(cache.cache_dir.glob("*.json"))
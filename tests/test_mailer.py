@@ -6,18 +6,40 @@ backoff, template rendering, and error handling.
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 from src.mailer import NewsMailer
 
+# SendGrid responses: send_email only reads status_code and body
+RESP_202 = SimpleNamespace(status_code=202, body="Accepted")
+RESP_400 = SimpleNamespace(status_code=400, body="Bad request")
+RESP_429 = SimpleNamespace(status_code=429, body="Rate limit")
+RESP_503 = SimpleNamespace(status_code=503, body="")
+
+
+@pytest.fixture(scope="module")
+def mailer(session_settings):
+    """
+    One NewsMailer (and Jinja environment) for the module.
+    Tests monkeypatch their own sg_client; template tests patch jinja_env.
+    Retries never sleep for real.
+    """
+    return NewsMailer(session_settings, sleep_fn=lambda _: None)
+
 
 @pytest.mark.unit
 class TestNewsMailer:
     """Test suite for NewsMailer class."""
     
-    def test_render_content_success(self, test_settings):
+    @pytest.fixture(autouse=True)
+    def sleeps(self, mailer, monkeypatch):
+        """Skip real backoff sleeps; records each requested delay."""
+        durations = []
+        monkeypatch.setattr(mailer, "sleep_fn", durations.append)
+        return durations
+    
+    def test_render_content_success(self, mailer):
         """Test successful template rendering."""
-        mailer = NewsMailer(test_settings)
-        
         context = {
             "headline": "Test Headline",
             "intro": "Test intro paragraph"
@@ -36,18 +58,15 @@ class TestNewsMailer:
         call_context = mock_template.render.call_args[1]
         assert "brand_name" in call_context
     
-    def test_render_content_missing_template(self, test_settings):
+    def test_render_content_missing_template(self, mailer):
         """Test error handling for missing template."""
-        mailer = NewsMailer(test_settings)
-        
         with patch.object(mailer.jinja_env, 'get_template', side_effect=Exception("Template not found")):
             with pytest.raises(Exception):
                 mailer.render_content("nonexistent.html", {})
     
-    def test_send_email_success(self, test_settings, mock_sendgrid_client):
+    def test_send_email_success(self, mailer, monkeypatch, mock_sendgrid_client):
         """Test successful email sending without retries."""
-        mailer = NewsMailer(test_settings)
-        mailer.sg_client = mock_sendgrid_client
+        monkeypatch.setattr(mailer, "sg_client", mock_sendgrid_client)
         
         result = mailer.send_email(
             subject="Test Subject",
@@ -55,12 +74,11 @@ class TestNewsMailer:
         )
         
         assert result is True
-        mock_sendgrid_client.send.assert_called_once()
+        assert len(mock_sendgrid_client.sent) == 1
     
-    def test_send_email_with_subject_prefix(self, test_settings, mock_sendgrid_client):
+    def test_send_email_with_subject_prefix(self, mailer, monkeypatch, mock_sendgrid_client):
         """Test that subject prefix is added."""
-        mailer = NewsMailer(test_settings)
-        mailer.sg_client = mock_sendgrid_client
+        monkeypatch.setattr(mailer, "sg_client", mock_sendgrid_client)
         
         mailer.send_email(
             subject="Daily Brief",
@@ -68,226 +86,80 @@ class TestNewsMailer:
         )
         
         # Verify subject includes prefix
-        call_args = mock_sendgrid_client.send.call_args
-        message = call_args[0][0]
-        assert test_settings.email.subject_prefix in message.subject.get()
+        message = mock_sendgrid_client.sent[-1]
+        assert mailer.settings.email.subject_prefix in message.subject.get()
     
-    def test_send_email_rate_limit_retry(self, test_settings):
-        """Test retry on rate limit (429) error."""
-        mailer = NewsMailer(test_settings)
-        
-        # First call returns 429, second succeeds
-        mock_response_429 = MagicMock()
-        mock_response_429.status_code = 429
-        mock_response_429.body = "Rate limit"
-        
-        mock_response_success = MagicMock()
-        mock_response_success.status_code = 202
-        mock_response_success.body = "Accepted"
-        
-        call_count = [0]
-        def side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return mock_response_429
-            return mock_response_success
-        
+    @pytest.mark.parametrize("responses,expected_result,expected_calls", [
+        # Rate limit (429), then success: retried once
+        ([RESP_429, RESP_202], True, 2),
+        # 5xx server error, then success
+        ([RESP_503, RESP_202], True, 2),
+        # Network exception, then success
+        ([Exception("Network error"), RESP_202], True, 2),
+        # Persistent 5xx: 1 initial + 3 retries, then give up
+        ([RESP_503] * 4, False, 4),
+        # 4xx client errors (except 429) are not retried
+        ([RESP_400], False, 1),
+    ], ids=["rate_limit", "server_error", "exception", "max_retries", "client_error"])
+    def test_send_email_retry_behavior(self, mailer, monkeypatch, responses, expected_result, expected_calls):
+        """Test which SendGrid failures are retried and when send_email gives up."""
         mock_client = MagicMock()
-        mock_client.send.side_effect = side_effect
-        mailer.sg_client = mock_client
-        
-        with patch('time.sleep'):  # Skip actual sleep
-            result = mailer.send_email("Test", "<html>Test</html>")
-        
-        assert result is True
-        assert call_count[0] == 2  # Retried once
-    
-    def test_send_email_server_error_retry(self, test_settings):
-        """Test retry on 5xx server error."""
-        mailer = NewsMailer(test_settings)
-        
-        # First call returns 503, second succeeds
-        mock_response_503 = MagicMock()
-        mock_response_503.status_code = 503
-        
-        mock_response_success = MagicMock()
-        mock_response_success.status_code = 202
-        
-        call_count = [0]
-        def side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return mock_response_503
-            return mock_response_success
-        
-        mock_client = MagicMock()
-        mock_client.send.side_effect = side_effect
-        mailer.sg_client = mock_client
-        
-        with patch('time.sleep'):
-            result = mailer.send_email("Test", "<html>Test</html>")
-        
-        assert result is True
-        assert call_count[0] == 2
-    
-    def test_send_email_max_retries_exceeded(self, test_settings):
-        """Test failure after max retries exhausted."""
-        mailer = NewsMailer(test_settings)
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 503
-        
-        mock_client = MagicMock()
-        mock_client.send.return_value = mock_response
-        mailer.sg_client = mock_client
-        
-        with patch('time.sleep'):
-            result = mailer.send_email("Test", "<html>Test</html>")
-        
-        assert result is False
-        # Should attempt 4 times (1 initial + 3 retries)
-        assert mock_client.send.call_count == 4
-    
-    def test_send_email_client_error_no_retry(self, test_settings):
-        """Test that 4xx client errors (except 429) are not retried."""
-        mailer = NewsMailer(test_settings)
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 400  # Bad request
-        mock_response.body = "Bad request"
-        
-        call_count = [0]
-        def side_effect(*args, **kwargs):
-            call_count[0] += 1
-            return mock_response
-        
-        mock_client = MagicMock()
-        mock_client.send.side_effect = side_effect
-        mailer.sg_client = mock_client
+        mock_client.send.side_effect = responses
+        monkeypatch.setattr(mailer, "sg_client", mock_client)
         
         result = mailer.send_email("Test", "<html>Test</html>")
         
-        assert result is False
-        # Should not retry on 4xx (except 429)
-        assert call_count[0] == 1
-    
-    def test_send_email_exception_retry(self, test_settings):
-        """Test retry on network exceptions."""
-        mailer = NewsMailer(test_settings)
-        
-        # First call raises exception, second succeeds
-        mock_response_success = MagicMock()
-        mock_response_success.status_code = 202
-        
-        call_count = [0]
-        def side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                raise Exception("Network error")
-            return mock_response_success
-        
-        mock_client = MagicMock()
-        mock_client.send.side_effect = side_effect
-        mailer.sg_client = mock_client
-        
-        with patch('time.sleep'):
-            result = mailer.send_email("Test", "<html>Test</html>")
-        
-        assert result is True
-        assert call_count[0] == 2
+        assert result is expected_result
+        assert mock_client.send.call_count == expected_calls
     
-    def test_send_email_exponential_backoff(self, test_settings):
+    def test_send_email_exponential_backoff(self, mailer, monkeypatch, sleeps):
         """Test exponential backoff progression."""
-        mailer = NewsMailer(test_settings)
-        
-        mock_response = MagicMock()
-        mock_response.status_code = 503
-        
         mock_client = MagicMock()
-        mock_client.send.return_value = mock_response
-        mailer.sg_client = mock_client
+        mock_client.send.return_value = RESP_503
+        monkeypatch.setattr(mailer, "sg_client", mock_client)
         
-        sleep_durations = []
-        def mock_sleep(duration):
-            sleep_durations.append(duration)
-        
-        with patch('time.sleep', side_effect=mock_sleep):
-            mailer.send_email("Test", "<html>Test</html>")
+        mailer.send_email("Test", "<html>Test</html>")
         
         # Should have 3 retries
-        assert len(sleep_durations) == 3
+        assert len(sleeps) == 3
         
         # Check exponential backoff with jitter
         # Initial: 2s, then 4s, then 8s (with ±25% jitter)
-        assert 1.5 <= sleep_durations[0] <= 2.5
-        assert 3.0 <= sleep_durations[1] <= 5.0
-        assert 6.0 <= sleep_durations[2] <= 10.0
+        assert 1.5 <= sleeps[0] <= 2.5
+        assert 3.0 <= sleeps[1] <= 5.0
+        assert 6.0 <= sleeps[2] <= 10.0
     
-    def test_send_email_jitter_applied(self, test_settings):
+    def test_send_email_jitter_applied(self, mailer, monkeypatch, sleeps):
         """Test that jitter is applied to backoff delays."""
-        mailer = NewsMailer(test_settings)
-        
-        mock_response_503 = MagicMock()
-        mock_response_503.status_code = 503
-        
-        mock_response_success = MagicMock()
-        mock_response_success.status_code = 202
-        
-        sleep_duration = [0]
-        def mock_sleep(duration):
-            sleep_duration[0] = duration
-        
-        call_count = [0]
-        def side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                return mock_response_503
-            return mock_response_success
-        
         mock_client = MagicMock()
-        mock_client.send.side_effect = side_effect
-        mailer.sg_client = mock_client
+        mock_client.send.side_effect = [RESP_503, RESP_202]
+        monkeypatch.setattr(mailer, "sg_client", mock_client)
         
-        with patch('time.sleep', side_effect=mock_sleep):
-            mailer.send_email("Test", "<html>Test</html>")
+        mailer.send_email("Test", "<html>Test</html>")
         
         # Jitter should make it not exactly 2.0
-        assert sleep_duration[0] != 2.0
-        assert 1.5 <= sleep_duration[0] <= 2.5
+        assert len(sleeps) == 1
+        assert sleeps[0] != 2.0
+        assert 1.5 <= sleeps[0] <= 2.5
     
-    def test_send_email_custom_recipients(self, test_settings, mock_sendgrid_client):
-        """Test sending email with custom from/to addresses."""
-        mailer = NewsMailer(test_settings)
-        mailer.sg_client = mock_sendgrid_client
+    @pytest.mark.parametrize("recipients", [
+        {},  # defaults from config
+        {"from_email": "custom-from@example.com", "to_email": "custom-to@example.com"},
+    ], ids=["default", "custom"])
+    def test_send_email_recipients(self, mailer, monkeypatch, mock_sendgrid_client, recipients):
+        """Test that from/to addresses come from the call, else from config."""
+        monkeypatch.setattr(mailer, "sg_client", mock_sendgrid_client)
         
         mailer.send_email(
             subject="Test",
             html_content="<html>Test</html>",
-            from_email="custom-from@example.com",
-            to_email="custom-to@example.com"
-        )
-        
-        call_args = mock_sendgrid_client.send.call_args
-        message = call_args[0][0]
-        
-        # Verify custom addresses were used
-        assert message.from_email.email == "custom-from@example.com"
-        # to_emails is a list of Personalization objects, check first one
-        assert any("custom-to@example.com" in str(p.tos) for p in message.personalizations)
-    
-    def test_send_email_default_recipients(self, test_settings, mock_sendgrid_client):
-        """Test that default recipients are used when not specified."""
-        mailer = NewsMailer(test_settings)
-        mailer.sg_client = mock_sendgrid_client
-        
-        mailer.send_email(
-            subject="Test",
-            html_content="<html>Test</html>"
+            **recipients
         )
         
-        call_args = mock_sendgrid_client.send.call_args
-        message = call_args[0][0]
+        message = mock_sendgrid_client.sent[-1]
+        expected_from = recipients.get("from_email", mailer.settings.email.from_email)
+        expected_to = recipients.get("to_email", mailer.settings.email.to_email)
         
-        # Should use config defaults
-        assert message.from_email.email == test_settings.email.from_email
-        assert any(test_settings.email.to_email in str(p.tos) for p in message.personalizations)
+        assert message.from_email.email == expected_from
+        # to_emails is a list of Personalization objects
+        assert any(expected_to in str(p.tos) for p in message.personalizations)
@@ -1,16 +1,21 @@
 import pytest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
-from src.openai_client import OpenAIClient
+from pydantic import SecretStr
+from src.openai_client import OpenAIClient, shared_openai_client
 from src.config import Settings
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_settings():
-    settings = MagicMock()
-    settings.openai_api_key.get_secret_value.return_value = "fake-key"
-    settings.models.extract_model = "gpt-5-mini"
-    settings.models.write_model = "gpt-5-mini"
-    settings.models.fallback_model = "gpt-4o-mini"
-    return settings
+    """The settings OpenAIClient reads, as a plain read-only namespace."""
+    return SimpleNamespace(
+        openai_api_key=SecretStr("fake-key"),
+        models=SimpleNamespace(
+            extract_model="gpt-5-mini",
+            write_model="gpt-5-mini",
+            fallback_model="gpt-4o-mini"
+        )
+    )
 
 def test_openai_client_initialization(mock_settings):
     client = OpenAIClient(mock_settings)
@@ -18,6 +23,15 @@ def test_openai_client_initialization(mock_settings):
     assert client.write_model == "gpt-5-mini"
     assert client.fallback == "gpt-4o-mini"
 
+def test_openai_clients_share_connection_pool(mock_settings):
+    shared_openai_client.cache_clear()
+    try:
+        first = OpenAIClient(mock_settings)
+        second = OpenAIClient(mock_settings)
+        assert first.client is second.client
+    finally:
+        shared_openai_client.cache_clear()
+
 @patch("openai.resources.chat.completions.Completions.create")
 def test_responses_create_success(mock_create, mock_settings):
     client = OpenAIClient(mock_settings)
@@ -9,12 +9,17 @@ class MockItem:
     def __init__(self, region):
         self.region = region
 
-def test_ranker_us_priority():
-    settings = Settings.model_construct(
-        watchlist_tickers=[],
-        coverage={"US": 0.7, "EU": 0.2, "China": 0.1}
-    )
-    ranker = FactCardRanker(settings)
+@pytest.fixture(scope="module")
+def base_settings():
+    """Settings built once per module; tests needing overrides use model_copy."""
+    return Settings.model_construct(watchlist_tickers=[], coverage={})
+
+@pytest.fixture
+def ranker(base_settings):
+    return FactCardRanker(base_settings)
+
+def test_ranker_us_priority(ranker):
+    # Empty coverage falls back to the default US 0.7 / EU 0.2 / China 0.1 weights
     
     # 1. A stronger US story should win over a slightly weaker EU story
     # Test US vs EU priority with sentiment scoring enabled
@@ -69,16 +74,14 @@ def test_ranker_us_priority():
     buckets_2 = ranker.rank_cards([card_us_mid, card_eu_strong], [cluster_us_mid, cluster_eu_strong])
     assert buckets_2["top_stories"][0].entity == "ECB Major"
 
-def test_ranker_global_other_support():
+def test_ranker_global_other_support(base_settings):
     """Verify that non-core regions (Japan/Taiwan etc) are supported and boosted.
     Sentiment boost is disabled for this test to isolate regional boost behavior.
     """
-    from src.config import RankingConfig, SentimentBoostRange
-    settings = Settings.model_construct(
-        watchlist_tickers=[], 
-        coverage={},
-        ranking=RankingConfig(use_sentiment_boost=False)  # Disable sentiment for pure regional test
-    )
+    from src.config import RankingConfig
+    settings = base_settings.model_copy(update={
+        "ranking": RankingConfig(use_sentiment_boost=False)  # Disable sentiment for pure regional test
+    })
     ranker = FactCardRanker(settings)
     
     # Taiwan Semiconductor story (Global region)
@@ -102,10 +105,7 @@ def test_ranker_global_other_support():
     # GLOBAL story gets 1.1x boost, so 0.85 * 1.1 = 0.935 > 0.85
     assert buckets["top_stories"][0].entity == "TSMC"
 
-def test_ranker_diversity():
-    settings = Settings.model_construct(watchlist_tickers=[], coverage={})
-    ranker = FactCardRanker(settings)
-    
+def test_ranker_diversity(ranker):    
     # Two stories about NVIDIA
     card1 = FactCard(
         story_id="nv1", entity="NVIDIA", trend="Earnings beat", 
@@ -131,10 +131,7 @@ def test_ranker_diversity():
     # The other should be in company_markets
     assert buckets["company_markets"][0].story_id == "nv2"
 
-def test_macro_detection():
-    settings = Settings.model_construct(watchlist_tickers=[], coverage={})
-    ranker = FactCardRanker(settings)
-    
+def test_macro_detection(ranker):    
     macro_card = FactCard(
         story_id="macro", entity="Central Bank", trend="Rate cut", 
         why_it_matters="Stimulus", confidence=0.9, 
@@ -12,10 +12,17 @@ Tests the RetrievalPlanner including:
 import pytest
 import json
 from unittest.mock import patch, MagicMock
-from src.retrieval import RetrievalPlanner, RetrievalResult, MarketNewsItem
+from pydantic import ValidationError
+from src.retrieval import RetrievalPlanner, RetrievalResult, MarketNewsItem, QueryOutcome
 from src.clustering import StoryCluster
 
 
+@pytest.fixture(scope="module")
+def planner(session_settings):
+    """Planner shared by read-only tests (parsing); others build their own."""
+    return RetrievalPlanner(session_settings)
+
+
 @pytest.mark.unit
 class TestRetrievalPlanner:
     """Test suite for RetrievalPlanner class."""
@@ -37,51 +44,33 @@ class TestRetrievalPlanner:
         assert "AAPL" in queries["watchlist"]
         assert "NVDA" in queries["watchlist"]
     
-    def test_parse_json_items_success(self, test_settings, sample_news_items):
-        """Test successful parsing of valid JSON array."""
-        planner = RetrievalPlanner(test_settings)
-        json_text = json.dumps(sample_news_items)
-        
-        items = planner._parse_json_items(json_text)
-        
-        assert len(items) == 5
-        assert items[0]["title"] == "Fed Signals Rate Pause Amid Cooling Inflation"
-        assert items[0]["region"] == "us"
-    
-    def test_parse_json_items_with_markdown_wrapper(self, test_settings, sample_news_items):
-        """Test parsing JSON wrapped in markdown code block."""
+    def test_query_plan_built_once(self, test_settings):
+        """Test the query plan is cached on the planner and rebuilt on invalidation."""
         planner = RetrievalPlanner(test_settings)
-        json_text = f"```json\n{json.dumps(sample_news_items)}\n```"
+        assert planner._generate_queries() is planner._generate_queries()
         
-        items = planner._parse_json_items(json_text)
-        
-        assert len(items) == 5
-        assert items[0]["title"] == "Fed Signals Rate Pause Amid Cooling Inflation"
-    
-    def test_parse_json_items_with_preamble(self, test_settings, sample_news_items):
-        """Test parsing JSON with text preamble before array."""
-        planner = RetrievalPlanner(test_settings)
-        json_text = f"Here are the news items:\n{json.dumps(sample_news_items)}"
-        
-        items = planner._parse_json_items(json_text)
-        
-        assert len(items) == 5
-    
-    def test_parse_json_items_invalid(self, test_settings):
-        """Test parsing invalid JSON returns empty list."""
-        planner = RetrievalPlanner(test_settings)
-        
-        items = planner._parse_json_items("This is not JSON")
+        test_settings.watchlist_tickers = ["ZZZZ"]
+        planner.invalidate_query_plan()
+        queries = planner._generate_queries()
         
-        assert items == []
+        assert "ZZZZ" in queries["watchlist_batch_1"]
+        assert "watchlist_batch_2" not in queries
     
-    def test_parse_json_items_empty(self, test_settings):
-        """Test parsing empty JSON array."""
-        planner = RetrievalPlanner(test_settings)
-        
-        items = planner._parse_json_items("[]")
-        
-        assert items == []
+    @pytest.mark.parametrize("wrap, expected_len", [
+        (lambda text: text, 5),
+        (lambda text: f"```json\n{text}\n```", 5),
+        (lambda text: f"Here are the news items:\n{text}", 5),
+        (lambda _: "This is not JSON", 0),
+        (lambda _: "[]", 0),
+    ], ids=["clean", "markdown_wrapper", "preamble", "invalid", "empty"])
+    def test_parse_json_items(self, planner, sample_news_items, wrap, expected_len):
+        """Test JSON array extraction from the reply shapes Perplexity returns."""
+        items = planner._parse_json_items(wrap(json.dumps(sample_news_items)))
+        
+        assert len(items) == expected_len
+        if expected_len:
+            assert items[0]["title"] == "Fed Signals Rate Pause Amid Cooling Inflation"
+            assert items[0]["region"] == "us"
     
     @patch('src.retrieval.cluster_items')
     def test_fetch_and_normalize_success(self, mock_cluster, test_settings, mock_perplexity_response, sample_clusters):
@@ -100,29 +89,68 @@ class TestRetrievalPlanner:
         assert len(result.clusters) > 0
         assert all(result.query_details.values())  # All True
     
+    def test_run_query_returns_outcome(self, test_settings):
+        """Test client errors come back as a failed QueryOutcome instead of raising."""
+        planner = RetrievalPlanner(test_settings)
+        
+        with patch.object(planner.perplexity, 'chat', side_effect=["[]", Exception("API Error")]):
+            ok = planner._run_query("q")
+            failed = planner._run_query("q")
+        
+        assert ok == QueryOutcome(ok=True, text="[]")
+        assert failed == QueryOutcome(ok=False, error="API Error")
+    
     @patch('src.retrieval.cluster_items')
     def test_fetch_and_normalize_circuit_breaker(self, mock_cluster, test_settings):
-        """Test circuit breaker stops after 2 consecutive failures."""
+        """Test circuit breaker skips remaining queries after 2 consecutive failures."""
         planner = RetrievalPlanner(test_settings)
+        planner.max_concurrent_queries = 1  # Dispatch in plan order
         mock_cluster.return_value = []
         
         # Mock first 2 queries to fail
-        call_count = [0]
-        def mock_chat_side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] <= 2:
-                raise Exception("API Error")
-            return "[]"
-        
-        with patch.object(planner.perplexity, 'chat', side_effect=mock_chat_side_effect):
+        api_error = Exception("API Error")
+        side_effect = [api_error, api_error] + ["[]"] * 4
+        
+        with patch.object(planner.perplexity, 'chat', side_effect=side_effect) as mock_chat:
             result = planner.fetch_and_normalize()
         
-        # Should stop after 2 failures, not attempt all 6 queries
-        assert call_count[0] == 2
+        # Should stop after 2 failures, not attempt the other queries or the fallback
+        assert mock_chat.call_count == 2
         assert result.successful_queries == 0
-        assert result.failed_queries == 6  # Remaining marked as failed
+        assert result.failed_queries == len(result.query_details)  # Remaining marked as failed
         assert result.is_sufficient is False
     
+    @patch('src.retrieval.cluster_items')
+    def test_circuit_breaker_trips_at_default_concurrency(self, mock_cluster, test_settings):
+        """Test a failing provider trips the breaker before a concurrent batch is sent."""
+        planner = RetrievalPlanner(test_settings)
+        assert planner.max_concurrent_queries > planner.circuit_breaker_window
+        mock_cluster.return_value = []
+        
+        with patch.object(planner.perplexity, 'chat', side_effect=Exception("API Error")) as mock_chat:
+            result = planner.fetch_and_normalize()
+        
+        assert mock_chat.call_count == planner.circuit_breaker_window
+        assert result.successful_queries == 0
+        assert result.failed_queries == len(result.query_details)
+    
+    @patch('src.retrieval.cluster_items')
+    def test_circuit_breaker_ignores_non_consecutive_failures(self, mock_cluster, test_settings):
+        """Test alternating failures never trip the circuit breaker."""
+        planner = RetrievalPlanner(test_settings)
+        planner.max_concurrent_queries = 1  # Dispatch in plan order
+        mock_cluster.return_value = []
+        query_count = len(planner._generate_queries())
+        
+        api_error = Exception("API Error")
+        side_effect = [api_error, "[]"] * query_count
+        
+        with patch.object(planner.perplexity, 'chat', side_effect=side_effect) as mock_chat:
+            result = planner.fetch_and_normalize()
+        
+        assert mock_chat.call_count >= query_count  # All queries sent (plus the fallback)
+        assert result.successful_queries == query_count // 2
+    
     @patch('src.retrieval.cluster_items')
     def test_fetch_and_normalize_insufficient_queries(self, mock_cluster, test_settings, mock_perplexity_response):
         """Test insufficient queries (only 2/6 succeed)."""
@@ -130,14 +158,14 @@ class TestRetrievalPlanner:
         mock_cluster.return_value = []
         
         # Mock 2 successes, 4 failures (non-consecutive to avoid circuit breaker)
-        call_count = [0]
-        def mock_chat_side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] in [1, 3]:  # Queries 1 and 3 succeed
-                return mock_perplexity_response
-            raise Exception("API Error")
-        
-        with patch.object(planner.perplexity, 'chat', side_effect=mock_chat_side_effect):
+        api_error = Exception("API Error")
+        side_effect = [
+            mock_perplexity_response, api_error,
+            mock_perplexity_response, api_error,
+            api_error, api_error
+        ]
+        
+        with patch.object(planner.perplexity, 'chat', side_effect=side_effect):
             result = planner.fetch_and_normalize()
         
         assert result.successful_queries == 2
@@ -150,15 +178,11 @@ class TestRetrievalPlanner:
         planner = RetrievalPlanner(test_settings)
         mock_cluster.return_value = []
         
-        # Mock exactly 3 successes
-        call_count = [0]
-        def mock_chat_side_effect(*args, **kwargs):
-            call_count[0] += 1
-            if call_count[0] in [1, 3, 5]:  # Non-consecutive to avoid circuit breaker
-                return mock_perplexity_response
-            raise Exception("API Error")
+        # Mock exactly 3 successes (non-consecutive to avoid circuit breaker)
+        api_error = Exception("API Error")
+        side_effect = [mock_perplexity_response, api_error] * 3
         
-        with patch.object(planner.perplexity, 'chat', side_effect=mock_chat_side_effect):
+        with patch.object(planner.perplexity, 'chat', side_effect=side_effect):
             result = planner.fetch_and_normalize()
         
         assert result.successful_queries == 3
@@ -223,11 +247,14 @@ class TestRetrievalPlanner:
         }
         
         with patch.object(planner.perplexity, 'chat', return_value=json.dumps([long_snippet_item])):
-            with patch('src.retrieval.cluster_items', return_value=[]):
+            with patch('src.retrieval.cluster_items', return_value=[]) as mock_cluster:
                 result = planner.fetch_and_normalize()
         
         # Should succeed and truncate
         assert result.successful_queries > 0
+        snippet = mock_cluster.call_args[0][0][0].snippet
+        assert snippet.endswith("...")
+        assert len(snippet.split()) == test_settings.daily.snippet_words
 
 
 @pytest.mark.unit
@@ -268,3 +295,16 @@ class TestRetrievalResult:
         )
         
         assert result.is_sufficient is True  # Exactly at threshold
+
+
+@pytest.mark.unit
+class TestMarketNewsItem:
+    """Test suite for MarketNewsItem."""
+    
+    def test_market_news_item_frozen_and_hashable(self, sample_market_news_items):
+        """Test that items are immutable and usable in sets."""
+        item = sample_market_news_items[0]
+        
+        with pytest.raises(ValidationError):
+            item.title = "Changed"
+        assert len({item, item.model_copy()}) == 1
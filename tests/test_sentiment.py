@@ -2,71 +2,122 @@
 Tests for sentiment analysis module.
 """
 
+import time
 import pytest
+from dataclasses import dataclass
+from typing import Optional
 from unittest.mock import MagicMock
 
+from src import sentiment
+from src.sentiment import analyze_text, compute_market_mood
+
+
+@dataclass(slots=True)
+class StubCard:
+    """Plain stand-in for a FactCard: just the fields sentiment scoring reads."""
+    entity: str = ""
+    trend: str = ""
+    why_it_matters: str = ""
+    data_point: Optional[str] = None
+
+
+# Reference headlines shared by the text-level tests
+BULLISH_TEXT = "NVIDIA surges 15% on blockbuster earnings, AI boom continues"
+BEARISH_TEXT = "Tesla stock plunges after disappointing delivery numbers, investors flee"
+
+# Expected compound-score bands; a VADER/lexicon upgrade that moves the
+# scores of the reference headlines out of these bands fails loudly
+BULLISH_COMPOUND = pytest.approx(0.65, abs=0.35)
+BEARISH_COMPOUND = pytest.approx(-0.65, abs=0.35)
+NEUTRAL_COMPOUND = pytest.approx(0.0, abs=0.2)
+
+# Generous wall-clock ceiling for scoring one headline (guards against
+# pathological slow paths in polarity_scores)
+ANALYZE_TIME_LIMIT_S = 2.0
+
+# Wall-clock ceiling for a realistic-size mood computation (100 cards)
+MOOD_100_TIME_LIMIT_S = 2.0
+
+# Read-only card sets shared by the market mood tests
+BULLISH_CARDS = tuple(
+    StubCard(
+        entity=f"Company{i}",
+        trend="Surges higher on strong results",
+        why_it_matters="Bullish outlook ahead",
+        data_point="+10%",
+    )
+    for i in range(5)
+)
+BEARISH_CARDS = tuple(
+    StubCard(
+        entity=f"Company{i}",
+        trend="Plunges on disappointing results",
+        why_it_matters="Weak demand concerns investors",
+        data_point="-10%",
+    )
+    for i in range(5)
+)
+POSITIVE_CARDS = tuple(
+    StubCard(
+        entity=f"Entity{i}",
+        trend="Positive development",
+        why_it_matters="Good news",
+    )
+    for i in range(3)
+)
+
 
 class TestSentimentAnalyzer:
     """Tests for SentimentAnalyzer class."""
     
     @pytest.fixture
-    def analyzer(self):
-        """Create a SentimentAnalyzer instance."""
-        from src.sentiment import SentimentAnalyzer
-        return SentimentAnalyzer()
+    def analyzer(self, sentiment_analyzer):
+        """The session-wide SentimentAnalyzer (it holds no per-call state)."""
+        return sentiment_analyzer
     
     @pytest.mark.unit
-    def test_analyze_bullish_text(self, analyzer):
-        """Test sentiment analysis on bullish financial text."""
-        text = "NVIDIA surges 15% on blockbuster earnings, AI boom continues"
+    @pytest.mark.parametrize("text, expected_compound, label, signal", [
+        (BULLISH_TEXT, BULLISH_COMPOUND, "positive", "Bullish"),
+        (BEARISH_TEXT, BEARISH_COMPOUND, "negative", "Bearish"),
+        ("Company reports quarterly earnings results today",
+         NEUTRAL_COMPOUND, None, None),
+    ], ids=["bullish", "bearish", "neutral"])
+    def test_analyze_text(self, analyzer, text, expected_compound, label, signal):
+        """Test sentiment analysis on bullish, bearish and neutral financial text."""
+        start = time.perf_counter()
         result = analyzer.analyze(text)
+        elapsed = time.perf_counter() - start
         
         assert result is not None
-        assert result.compound > 0.3
-        assert result.label == "positive"
-        assert "Bullish" in result.market_signal
+        assert result.compound == expected_compound
+        assert elapsed < ANALYZE_TIME_LIMIT_S
+        if label:
+            assert result.label == label
+        if signal:
+            assert signal in result.market_signal
     
     @pytest.mark.unit
-    def test_analyze_bearish_text(self, analyzer):
-        """Test sentiment analysis on bearish financial text."""
-        text = "Tesla stock plunges after disappointing delivery numbers, investors flee"
-        result = analyzer.analyze(text)
+    def test_analyze_batch_matches_analyze(self, analyzer):
+        """Test batched analysis returns the same scores as per-text calls, in order."""
+        texts = [BULLISH_TEXT, "", BEARISH_TEXT]
         
-        assert result is not None
-        assert result.compound < -0.3
-        assert result.label == "negative"
-        assert "Bearish" in result.market_signal
+        assert analyzer.analyze_batch(texts) == [analyzer.analyze(text) for text in texts]
     
     @pytest.mark.unit
-    def test_analyze_neutral_text(self, analyzer):
-        """Test sentiment analysis on neutral text."""
-        text = "Company reports quarterly earnings results today"
-        result = analyzer.analyze(text)
-        
-        assert result is not None
-        assert -0.2 <= result.compound <= 0.2  # Slightly wider range for neutral
-    
-    @pytest.mark.unit
-    def test_analyze_empty_text(self, analyzer):
-        """Test handling of empty text."""
-        result = analyzer.analyze("")
-        assert result is None
-    
-    @pytest.mark.unit
-    def test_analyze_none_text(self, analyzer):
-        """Test handling of None text."""
-        result = analyzer.analyze(None)
-        assert result is None
+    @pytest.mark.parametrize("text", ["", None], ids=["empty", "none"])
+    def test_analyze_falsy_text(self, analyzer, text):
+        """Test handling of empty and None text."""
+        assert analyzer.analyze(text) is None
     
     @pytest.mark.unit
     def test_analyze_fact_card(self, analyzer):
         """Test sentiment analysis on a fact card object."""
-        # Create a mock fact card
-        card = MagicMock()
-        card.entity = "Apple"
-        card.trend = "Record earnings beat expectations"
-        card.why_it_matters = "Strong consumer demand drives revenue growth"
-        card.data_point = "+15%"
+        card = StubCard(
+            entity="Apple",
+            trend="Record earnings beat expectations",
+            why_it_matters="Strong consumer demand drives revenue growth",
+            data_point="+15%",
+        )
         
         result = analyzer.analyze_fact_card(card)
         
@@ -76,38 +127,40 @@ class TestSentimentAnalyzer:
     @pytest.mark.unit
     def test_compute_market_mood_bullish(self, analyzer):
         """Test market mood computation with mostly bullish cards."""
-        cards = []
-        for i in range(5):
-            card = MagicMock()
-            card.entity = f"Company{i}"
-            card.trend = "Surges higher on strong results"
-            card.why_it_matters = "Bullish outlook ahead"
-            card.data_point = "+10%"
-            cards.append(card)
-        
-        mood = analyzer.compute_market_mood(cards)
+        mood = analyzer.compute_market_mood(BULLISH_CARDS)
         
         assert mood["overall_score"] > 0
         assert mood["bullish_count"] > mood["bearish_count"]
         assert "Risk-On" in mood["signal"] or "Optimistic" in mood["signal"]
+        
+        # One joined string per card, scored in a single batch call
+        scores = analyzer.analyze_batch([f"{c.trend}. {c.why_it_matters}" for c in BULLISH_CARDS])
+        assert all(score.compound > 0 for score in scores)
     
     @pytest.mark.unit
     def test_compute_market_mood_bearish(self, analyzer):
         """Test market mood computation with mostly bearish cards."""
-        cards = []
-        for i in range(5):
-            card = MagicMock()
-            card.entity = f"Company{i}"
-            card.trend = "Plunges on disappointing results"
-            card.why_it_matters = "Weak demand concerns investors"
-            card.data_point = "-10%"
-            cards.append(card)
-        
-        mood = analyzer.compute_market_mood(cards)
+        mood = analyzer.compute_market_mood(BEARISH_CARDS)
         
         assert mood["overall_score"] < 0
         assert mood["bearish_count"] > mood["bullish_count"]
         assert "Risk-Off" in mood["signal"] or "Pessimistic" in mood["signal"]
+        
+        # One joined string per card, scored in a single batch call
+        scores = analyzer.analyze_batch([f"{c.trend}. {c.why_it_matters}" for c in BEARISH_CARDS])
+        assert all(score.compound < 0 for score in scores)
+    
+    @pytest.mark.slow
+    def test_compute_market_mood_100_cards(self, analyzer):
+        """Test mood computation on a production-size batch stays fast."""
+        cards = BULLISH_CARDS * 20
+        
+        start = time.perf_counter()
+        mood = analyzer.compute_market_mood(cards)
+        elapsed = time.perf_counter() - start
+        
+        assert mood["bullish_count"] == len(cards)
+        assert elapsed < MOOD_100_TIME_LIMIT_S
     
     @pytest.mark.unit
     def test_compute_market_mood_empty(self, analyzer):
@@ -118,33 +171,25 @@ class TestSentimentAnalyzer:
         assert mood["label"] == "neutral"
     
     @pytest.mark.unit
-    def test_sentiment_boost_strong_positive(self, analyzer):
-        """Test sentiment boost for strongly positive content."""
-        card = MagicMock()
-        card.entity = "Tech Giant"
-        card.trend = "Surges to all-time high on amazing results"
-        card.why_it_matters = "Exceptional growth exceeds all expectations"
-        card.data_point = "+25%"
-        
-        boost = analyzer.get_sentiment_boost(card)
-        
-        # Strong sentiment should get boost >= 1.05
-        assert boost >= 1.05
-    
-    @pytest.mark.unit
-    def test_sentiment_boost_neutral(self, analyzer):
-        """Test sentiment boost for neutral content."""
-        card = MagicMock()
-        card.entity = "Company"
-        card.trend = "Reports quarterly results"
-        card.why_it_matters = "Numbers in line with expectations"
-        card.data_point = "0%"
-        
-        boost = analyzer.get_sentiment_boost(card)
-        
+    @pytest.mark.parametrize("card, low, high", [
+        # Strong sentiment gets at least a +5% boost (capped at boost_max)
+        (StubCard(
+            entity="Tech Giant",
+            trend="Surges to all-time high on amazing results",
+            why_it_matters="Exceptional growth exceeds all expectations",
+            data_point="+25%",
+        ), 1.05, 1.15),
         # Neutral sentiment may get slight penalty
-        assert 0.9 <= boost <= 1.05
-
+        (StubCard(
+            entity="Company",
+            trend="Reports quarterly results",
+            why_it_matters="Numbers in line with expectations",
+            data_point="0%",
+        ), 0.9, 1.05),
+    ], ids=["strong_positive", "neutral"])
+    def test_sentiment_boost(self, analyzer, card, low, high):
+        """Test sentiment boost for strongly positive and neutral content."""
+        assert low <= analyzer.get_sentiment_boost(card) <= high
 
 class TestSentimentConvenienceFunctions:
     """Tests for module-level convenience functions."""
@@ -152,8 +197,6 @@ class TestSentimentConvenienceFunctions:
     @pytest.mark.unit
     def test_analyze_text_function(self):
         """Test the analyze_text convenience function."""
-        from src.sentiment import analyze_text
-        
         result = analyze_text("Markets rally on positive news")
         assert result is not None
         assert hasattr(result, 'compound')
@@ -161,17 +204,21 @@ class TestSentimentConvenienceFunctions:
     @pytest.mark.unit
     def test_compute_market_mood_function(self):
         """Test the compute_market_mood convenience function."""
-        from src.sentiment import compute_market_mood
-        
-        cards = []
-        for i in range(3):
-            card = MagicMock()
-            card.entity = f"Entity{i}"
-            card.trend = "Positive development"
-            card.why_it_matters = "Good news"
-            card.data_point = None
-            cards.append(card)
-        
-        mood = compute_market_mood(cards)
+        mood = compute_market_mood(POSITIVE_CARDS)
         assert "overall_score" in mood
         assert "signal" in mood
+
+
+@pytest.mark.unit
+def test_missing_nltk_checked_and_logged_once(monkeypatch, caplog):
+    """Test that a missing NLTK is detected once, not on every VADER access."""
+    nltk_available = MagicMock(return_value=False)
+    monkeypatch.setattr(sentiment, "_nltk_available", nltk_available)
+    monkeypatch.setattr(sentiment, "_vader_analyzer", None)
+    monkeypatch.setattr(sentiment, "_vader_unavailable", False)
+    
+    with caplog.at_level("WARNING", logger="src.sentiment"):
+        assert [sentiment._get_vader() for _ in range(3)] == [None, None, None]
+    
+    nltk_available.assert_called_once()
+    assert caplog.text.count("NLTK not installed") == 1
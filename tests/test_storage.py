@@ -1,17 +1,16 @@
-import os
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from src.storage import NewsStorage
 
+# Shared read-only payloads (NewsStorage doesn't mutate payload_json/meta)
+NVDA_PAYLOAD = {"fact": "Nvidia up 5%", "ticker": "NVDA"}
+REPORT_META = {"top_ticker": "AAPL"}
+
 @pytest.fixture
 def db():
-    # Use a temporary test database
-    db_path = "test_news.db"
-    storage = NewsStorage(db_path)
-    yield storage
-    # Cleanup after tests
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    # In-memory SQLite: nothing touches disk and there is no file to clean up
+    return NewsStorage(":memory:")
 
 def test_insert_items_deduplication(db):
     items = [
@@ -28,7 +27,11 @@ def test_insert_items_deduplication(db):
             "source": "Reuters"
         }
     ]
-    db.insert_items(items)
+    with patch.object(db.items, 'upsert_many', wraps=db.items.upsert_many) as upsert_many:
+        db.insert_items(items)
+    
+    # The batch is written with one bulk upsert (single transaction), not per row
+    upsert_many.assert_called_once()
     
     # Verify only one item exists
     count = db.items.count()
@@ -38,11 +41,23 @@ def test_insert_items_deduplication(db):
     item = db.items.find_one(url="https://example.com/1")
     assert item['title'] == "News 1 Updated"
 
+def test_insert_items_merges_duplicate_columns(db):
+    items = [
+        {"url": "https://example.com/1", "title": "News 1", "snippet": "Only on the first row"},
+        {"url": "https://example.com/1", "title": "News 1 Updated"},
+    ]
+    db.insert_items(items)
+    
+    # Like per-row upserts: later values win, earlier-only fields survive
+    item = db.items.find_one(url="https://example.com/1")
+    assert item['title'] == "News 1 Updated"
+    assert item['snippet'] == "Only on the first row"
+
 def test_fact_card_roundtrip(db):
     cards = [
         {
             "story_id": "story_123",
-            "payload_json": {"fact": "Nvidia up 5%", "ticker": "NVDA"}
+            "payload_json": NVDA_PAYLOAD
         }
     ]
     db.insert_fact_cards(cards)
@@ -58,37 +73,70 @@ def test_fact_card_roundtrip(db):
     assert retrieved[0]['payload_json']['ticker'] == "NVDA"
 
 def test_delete_obsolete_cards(db):
-    old_date = datetime.now() - timedelta(days=10)
+    # One clock read: ages and the cutoff are all relative to the same instant
+    now = datetime.now()
     cards = [
         {
             "story_id": "old_story",
-            "created_at": old_date,
+            "entity": "Old Co",  # distinct content, so the cards don't share a dedup hash
+            "created_at": now - timedelta(days=10),
             "payload_json": {"fact": "old"}
         },
         {
             "story_id": "new_story",
-            "created_at": datetime.now(),
+            "entity": "New Co",
+            "created_at": now,
             "payload_json": {"fact": "new"}
         }
     ]
-    db.insert_fact_cards(cards)
+    with patch.object(db.fact_cards, 'upsert_many', wraps=db.fact_cards.upsert_many) as upsert_many:
+        db.insert_fact_cards(cards)
+    
+    upsert_many.assert_called_once()
+    assert db.fact_cards.count() == 2
     
     # Delete cards older than 1 day
-    db.delete_obsolete_fact_cards(datetime.now() - timedelta(days=1))
+    db.delete_obsolete_fact_cards(now - timedelta(days=1))
     
     assert db.fact_cards.count() == 1
     assert db.fact_cards.find_one(story_id="new_story") is not None
     assert db.fact_cards.find_one(story_id="old_story") is None
 
 def test_insert_report(db):
-    meta = {"top_ticker": "AAPL"}
     report_id = db.insert_report(
         kind="daily",
         subject="Markets Today",
         body_html="<html>test</html>",
-        meta=meta
+        meta=REPORT_META
     )
     
     report = db.reports.find_one(id=report_id)
     assert report['kind'] == "daily"
     assert "AAPL" in report['meta_json']
+
+def test_iter_fact_cards_between_selected_fields(db):
+    cards = [
+        {
+            "story_id": "story_456",
+            "entity": "Nvidia",
+            "payload_json": NVDA_PAYLOAD
+        }
+    ]
+    db.insert_fact_cards(cards)
+    
+    now = datetime.now()
+    rows = db.iter_fact_cards_between(
+        now - timedelta(hours=1),
+        now + timedelta(hours=1),
+        fields=["entity", "ticker"]
+    )
+    
+    # Lazy: nothing is fetched until iterated
+    assert not isinstance(rows, list)
+    rows = list(rows)
+    assert len(rows) == 1
+    assert rows[0]['entity'] == "Nvidia"  # table column
+    assert rows[0]['ticker'] == "NVDA"  # json_extract from payload_json
+    
+    with pytest.raises(ValueError):
+        list(db.iter_fact_cards_between(now, now, fields=["ticker; DROP TABLE fact_cards"]))
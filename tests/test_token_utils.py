@@ -0,0 +1,148 @@
+"""
+Tests for token estimation and cost utilities.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src import token_utils
+from src.token_utils import (
+    PRICING,
+    DEFAULT_PRICING,
+    clear_token_cache,
+    count_tokens,
+    count_tokens_batch,
+    count_message_tokens,
+    estimate_cost,
+    estimate_perplexity_tokens,
+    format_usage,
+    truncate_to_words,
+)
+
+
+@pytest.fixture
+def fake_encoding():
+    """Whitespace 'tokenizer' standing in for tiktoken (no BPE download needed)."""
+    encoding = MagicMock()
+    encoding.encode.side_effect = lambda text: text.split()
+    encoding.encode_batch.side_effect = lambda texts, num_threads=1: [t.split() for t in texts]
+    clear_token_cache()
+    with patch.object(token_utils, "_get_encoding", return_value=encoding):
+        yield encoding
+    clear_token_cache()
+
+
+@pytest.mark.unit
+def test_get_encoding_is_memoized():
+    """Encodings are resolved once per model."""
+    token_utils._get_encoding.cache_clear()
+    with patch("tiktoken.encoding_for_model") as mock_for_model:
+        first = token_utils._get_encoding("gpt-4o")
+        second = token_utils._get_encoding("gpt-4o")
+
+    assert first is second
+    mock_for_model.assert_called_once_with("gpt-4o")
+    token_utils._get_encoding.cache_clear()
+
+
+@pytest.mark.unit
+def test_get_encoding_unknown_model_falls_back():
+    """Unknown models use the default encoding."""
+    token_utils._get_encoding.cache_clear()
+    with patch("tiktoken.encoding_for_model", side_effect=KeyError("pplx")), \
+         patch("tiktoken.get_encoding") as mock_get:
+        token_utils._get_encoding("pplx-70b-online")
+
+    mock_get.assert_called_once_with(token_utils.DEFAULT_ENCODING)
+    token_utils._get_encoding.cache_clear()
+
+
+@pytest.mark.unit
+def test_count_tokens_without_tiktoken():
+    """Counting degrades to a character estimate when tiktoken is unavailable."""
+    clear_token_cache()
+    with patch.object(token_utils, "_get_encoding", return_value=None):
+        assert count_tokens("abcdefgh") == 2
+        assert count_tokens_batch(["abcde"]) == [2]
+    clear_token_cache()
+
+
+@pytest.mark.unit
+def test_count_tokens(fake_encoding):
+    assert count_tokens("one two three") == 3
+    assert count_tokens("") == 0
+
+
+@pytest.mark.unit
+def test_count_tokens_cached(fake_encoding):
+    """Repeated texts are encoded once."""
+    assert count_tokens("same prompt") == 2
+    assert count_tokens("same prompt") == 2
+    fake_encoding.encode.assert_called_once_with("same prompt")
+
+
+@pytest.mark.unit
+def test_count_tokens_long_text_bypasses_cache(fake_encoding):
+    long_text = "word " * (token_utils.MAX_CACHED_TEXT_LENGTH // 5 + 1)
+    count_tokens(long_text)
+    count_tokens(long_text)
+    assert fake_encoding.encode.call_count == 2
+
+
+@pytest.mark.unit
+def test_count_tokens_batch(fake_encoding):
+    assert count_tokens_batch(["a b", "", "c d e"]) == [2, 0, 3]
+    assert count_tokens_batch([]) == []
+    fake_encoding.encode_batch.assert_called_once()
+
+
+@pytest.mark.unit
+def test_count_message_tokens_includes_overhead(fake_encoding):
+    messages = [
+        {"role": "system", "content": "be brief"},
+        {"role": "user", "content": "hello"},
+    ]
+    # 3 priming + (4 + 2) + (4 + 1)
+    assert count_message_tokens(messages) == 14
+
+
+@pytest.mark.unit
+def test_count_tokens_approximate_skips_encoding(fake_encoding):
+    """exact=False and Perplexity models use the character estimate."""
+    assert count_tokens("abcdefgh", exact=False) == 2
+    assert count_tokens("abcdefgh", model="pplx-70b-online") == 2
+    assert count_tokens_batch(["abcde"], exact=False) == [2]
+    fake_encoding.encode.assert_not_called()
+    fake_encoding.encode_batch.assert_not_called()
+
+
+@pytest.mark.unit
+def test_estimate_perplexity_tokens_applies_margin(fake_encoding):
+    messages = [{"role": "user", "content": "hello"}]
+    # (3 + 4 + ceil(5 / 4) + 1000) * 1.2
+    assert estimate_perplexity_tokens(messages, estimated_output=1000) == int(1009 * 1.2)
+    fake_encoding.encode_batch.assert_not_called()
+
+
+@pytest.mark.unit
+def test_estimate_cost_known_model():
+    cost = estimate_cost("gpt-4o", input_tokens=1_000_000, output_tokens=1_000_000)
+    assert cost == pytest.approx(PRICING["gpt-4o"]["input"] + PRICING["gpt-4o"]["output"])
+
+
+@pytest.mark.unit
+def test_estimate_cost_unknown_model_uses_default():
+    cost = estimate_cost("mystery-model", input_tokens=500_000)
+    assert cost == pytest.approx(DEFAULT_PRICING["input"] / 2)
+
+
+@pytest.mark.unit
+def test_truncate_to_words():
+    assert truncate_to_words("a b c", 5) == ("a b c", False)
+    assert truncate_to_words("a b c d", 2) == ("a b...", True)
+
+
+@pytest.mark.unit
+def test_format_usage():
+    line = format_usage("compose", "gpt-4o-mini", 1200, 34, cost=0.0001)
+    assert line == "compose (gpt-4o-mini): 1,234 tokens | Cost: $0.000100"